@@ -0,0 +1,151 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List
+
+import chess
+
+import engine
+from movepick import MovePicker
+from timeman import SearchLimits, TimeManager
+from transposition import TranspositionTable
+
+BOUND_EXACT = 'exact'
+BOUND_UPPER = 'upper'  # Failed low against the null window: score <= reported value
+
+_worker = None  # Per-process SearchWorker attached to the shared table
+
+
+@dataclass
+class RootMove:
+    move: chess.Move
+    score: int
+    bound: str
+    pv: List[chess.Move] = field(default_factory=list)
+    nodes: int = 0
+
+
+def _init_worker(shm_name: str):
+    global _worker
+    _worker = engine.SearchWorker(TranspositionTable.attach_shared(shm_name))
+
+
+def _search_root_move(fen, game_moves, move_uci, depth, alpha, beta, generation):
+    """Search one root move in a pool process; returns (move_uci, score, pv_ucis, nodes).
+
+    game_moves lead from fen (the last irreversible position) to the root.
+    """
+    board = engine.EvalBoard(fen)
+    for game_move in game_moves:
+        board.push(chess.Move.from_uci(game_move))
+    _worker.tt.generation = generation
+    _worker.time_manager = TimeManager(SearchLimits(), board.turn)
+    _worker.root_ply = len(board.move_stack)
+    move = chess.Move.from_uci(move_uci)
+    board.push(move)
+    score, _ = _worker.pvs_search(board, depth - 1, -beta, -alpha)
+    pv = [move] + engine.principal_variation(board, tt=_worker.tt)
+    return move_uci, -score, [m.uci() for m in pv], _worker.time_manager.nodes
+
+
+def _search_root(pool, board, depth, ordered_moves, generation) -> List[RootMove]:
+    """Root split at one depth: first move full window, the rest null-window in parallel, fail-highs re-searched."""
+    fen = board.root().fen()
+    game_moves = [move.uci() for move in board.move_stack]
+
+    def run(move, alpha, beta):
+        return pool.submit(_search_root_move, fen, game_moves, move.uci(), depth, alpha, beta, generation)
+
+    def to_root_move(result, bound):
+        move_uci, score, pv, nodes = result
+        return RootMove(chess.Move.from_uci(move_uci), score, bound,
+                        [chess.Move.from_uci(m) for m in pv], nodes)
+
+    # The first (best-ordered) move establishes alpha
+    first = to_root_move(run(ordered_moves[0], -engine.INFINITE, engine.INFINITE).result(), BOUND_EXACT)
+    results = [first]
+    alpha = first.score
+
+    # Remaining moves only need to prove they are no better than alpha
+    futures = [(move, run(move, alpha, alpha + 1)) for move in ordered_moves[1:]]
+    fail_highs = []
+    for move, future in futures:
+        root_move = to_root_move(future.result(), BOUND_UPPER)
+        if root_move.score > alpha:
+            fail_highs.append(root_move)
+        else:
+            results.append(root_move)
+
+    # Re-search fail-highs with a full window above the best score so far, best candidates first
+    fail_highs.sort(key=lambda root_move: root_move.score, reverse=True)
+    # All of them search the window (alpha, INFINITE): a score above that alpha is exact
+    researches = [(root_move, run(root_move.move, alpha, engine.INFINITE)) for root_move in fail_highs]
+    for root_move, future in researches:
+        researched = to_root_move(future.result(), BOUND_EXACT)
+        researched.nodes += root_move.nodes
+        if researched.score <= alpha:
+            researched.bound = BOUND_UPPER
+        results.append(researched)
+
+    # Exact scores first (best first), then the moves that only failed low
+    results.sort(key=lambda r: (r.bound == BOUND_EXACT, r.score), reverse=True)
+    return results
+
+
+def analyse(board: chess.Board, depth: int, workers: int = None, tt_size_mb: float = engine.TT_SIZE_MB,
+            on_depth=None) -> List[RootMove]:
+    """Deep analysis of one position, spreading root moves over a process pool.
+
+    Iterates depth 1..depth, ordering root moves by the previous iteration.
+    Returns root moves best first; moves that only failed low carry an upper bound.
+    on_depth, if given, is called as on_depth(depth, results, elapsed) per iteration.
+    """
+    workers = workers or os.cpu_count() or 1
+    search_board = engine.EvalBoard.from_game(board)
+    ordered_moves = [move for move, _ in MovePicker(search_board)]
+    if not ordered_moves:
+        return []
+
+    tt = TranspositionTable.create_shared(tt_size_mb)
+    tt.new_search()
+    start = time.monotonic()
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tt.shm.name,)) as pool:
+            for d in range(1, depth + 1):
+                results = _search_root(pool, search_board, d, ordered_moves, tt.generation)
+                ordered_moves = [root_move.move for root_move in results]
+                if on_depth is not None:
+                    on_depth(d, results, time.monotonic() - start)
+    finally:
+        tt.close(unlink=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Root-split parallel analysis of a single position.")
+    parser.add_argument("--fen", default=chess.STARTING_FEN, help="Position to analyse")
+    parser.add_argument("--depth", type=int, default=4, help="Analysis depth")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--hash", type=float, default=engine.TT_SIZE_MB, help="Shared transposition table size in MB")
+    args = parser.parse_args()
+
+    board = chess.Board(args.fen)
+
+    def report(d, results, elapsed):
+        nodes = sum(root_move.nodes for root_move in results)
+        best = results[0]
+        print(f"depth {d:>2}  {elapsed:7.2f}s  {nodes:>9} nodes  best {best.move.uci()} {best.score}")
+
+    results = analyse(board, args.depth, args.workers, args.hash, on_depth=report)
+    print()
+    for root_move in results:
+        score = f"{root_move.score}" if root_move.bound == BOUND_EXACT else f"<= {root_move.score}"
+        pv = board.variation_san(root_move.pv) if root_move.pv else root_move.move.uci()
+        print(f"{root_move.move.uci():>6}  {score:>12}  {pv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import chess
+
+# KING_ZONES[square]: the 5x5 block centred on the square, clipped at the board edges
+KING_ZONES = [0] * 64
+for _sq in chess.SQUARES:
+    _file, _rank = chess.square_file(_sq), chess.square_rank(_sq)
+    for _f in range(max(0, _file - 2), min(8, _file + 3)):
+        for _r in range(max(0, _rank - 2), min(8, _rank + 3)):
+            KING_ZONES[_sq] |= chess.BB_SQUARES[chess.square(_f, _r)]
+
+# Weight of one attacked king-zone square per attacker type (indexed by piece type)
+ATTACK_UNITS = [0, 1, 2, 2, 3, 5, 1]
+
+# Mobility counts knight, bishop, rook and queen targets; squares attacked by enemy pawns don't count
+MOBILITY_PIECES = (chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN)
+MOBILITY_EXCLUDE_PAWN_ATTACKS = True
+
+NOT_FILE_A = chess.BB_ALL & ~chess.BB_FILE_A
+NOT_FILE_H = chess.BB_ALL & ~chess.BB_FILE_H
+
+
+def pawn_attacks(pawns: int, color: chess.Color):
+    """(west, east) capture targets of a set of pawns; each pawn contributes at most one square to each."""
+    if color == chess.WHITE:
+        return (pawns << 7) & NOT_FILE_H & chess.BB_ALL, (pawns << 9) & NOT_FILE_A & chess.BB_ALL
+    return (pawns >> 9) & NOT_FILE_H, (pawns >> 7) & NOT_FILE_A
+
+
+def piece_attacks(piece_type: chess.PieceType, square: int, occupied: int) -> int:
+    """Attack mask of a non-pawn piece, sliders stopping at the first blocker."""
+    if piece_type == chess.KNIGHT:
+        return chess.BB_KNIGHT_ATTACKS[square]
+    if piece_type == chess.KING:
+        return chess.BB_KING_ATTACKS[square]
+    attacks = 0
+    if piece_type == chess.BISHOP or piece_type == chess.QUEEN:
+        attacks = chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied]
+    if piece_type == chess.ROOK or piece_type == chess.QUEEN:
+        attacks |= (chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied]
+                    | chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied])
+    return attacks
+
+
+class AttackMap:
+    """Per-side attack bitboards, built once per evaluation.
+
+    For each color: pieces lists (square, piece_type, attacks) for every non-pawn
+    piece, by_type the union per piece type, all every attacked square and double
+    the squares attacked at least twice. Counts are the same as summing
+    board.attackers() over squares, so terms can switch over without changing
+    their values; SEE and other eval terms can read the same maps.
+    """
+
+    __slots__ = ('pieces', 'pawn_west', 'pawn_east', 'by_type', 'all', 'double')
+
+    def __init__(self, board: chess.Board):
+        occupied = board.occupied
+        self.pieces = [[], []]
+        self.pawn_west = [0, 0]
+        self.pawn_east = [0, 0]
+        self.by_type = [[0] * 7, [0] * 7]
+        self.all = [0, 0]
+        self.double = [0, 0]
+        for color in chess.COLORS:
+            west, east = pawn_attacks(board.pawns & board.occupied_co[color], color)
+            self.pawn_west[color] = west
+            self.pawn_east[color] = east
+            by_type = self.by_type[color]
+            by_type[chess.PAWN] = attacked = west | east
+            double = west & east
+            pieces = self.pieces[color]
+            for piece_type in (chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN, chess.KING):
+                for square in chess.scan_forward(board.pieces_mask(piece_type, color)):
+                    attacks = piece_attacks(piece_type, square, occupied)
+                    pieces.append((square, piece_type, attacks))
+                    by_type[piece_type] |= attacks
+                    double |= attacked & attacks
+                    attacked |= attacks
+            self.all[color] = attacked
+            self.double[color] = double
+
+    def zone_attacks(self, color: chess.Color, zone: int):
+        """(count, units) of attacks by color on zone: count sums attackers over
+        the zone's squares, units weights each one by ATTACK_UNITS."""
+        pawn_hits = chess.popcount(self.pawn_west[color] & zone) + chess.popcount(self.pawn_east[color] & zone)
+        count = pawn_hits
+        units = pawn_hits * ATTACK_UNITS[chess.PAWN]
+        for _, piece_type, attacks in self.pieces[color]:
+            hits = chess.popcount(attacks & zone)
+            if hits:
+                count += hits
+                units += hits * ATTACK_UNITS[piece_type]
+        return count, units
+
+    def mobility(self, board: chess.Board, color: chess.Color,
+                 exclude_pawn_attacks: bool = MOBILITY_EXCLUDE_PAWN_ATTACKS) -> int:
+        """Pseudo-legal mobility of color's minor and major pieces: attacked squares
+        not holding an own piece (nor, optionally, covered by an enemy pawn)."""
+        area = ~board.occupied_co[color]
+        if exclude_pawn_attacks:
+            area &= ~self.by_type[not color][chess.PAWN]
+        total = 0
+        for _, piece_type, attacks in self.pieces[color]:
+            if piece_type != chess.KING:
+                total += chess.popcount(attacks & area)
+        return total
+
+
+# Piece values for static exchange evaluation (indexed by piece type)
+SEE_VALUES = [0, 100, 300, 300, 500, 900, 20000]
+
+
+def attackers_to(board: chess.Board, square: int, occupied: int) -> int:
+    """Pieces of both colors attacking square, given an occupancy (pieces not in it are ignored)."""
+    diagonal = chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied]
+    orthogonal = (chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied]
+                  | chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied])
+    queens = board.queens
+    return ((chess.BB_PAWN_ATTACKS[chess.BLACK][square] & board.pawns & board.occupied_co[chess.WHITE])
+            | (chess.BB_PAWN_ATTACKS[chess.WHITE][square] & board.pawns & board.occupied_co[chess.BLACK])
+            | (chess.BB_KNIGHT_ATTACKS[square] & board.knights)
+            | (chess.BB_KING_ATTACKS[square] & board.kings)
+            | (diagonal & (board.bishops | queens))
+            | (orthogonal & (board.rooks | queens))) & occupied
+
+
+def see(board: chess.Board, move: chess.Move) -> int:
+    """Static exchange evaluation: material the side to move nets from move after the best
+    sequence of recaptures on its target square, least valuable attacker first.
+
+    Sliders behind a capturing piece join in as it leaves (x-rays). A king only
+    recaptures onto an undefended square.
+    """
+    from_square, to_square = move.from_square, move.to_square
+    if board.is_castling(move):
+        return 0
+    attacker = board.piece_type_at(from_square)
+    occupied = board.occupied ^ chess.BB_SQUARES[from_square]
+    victim = board.piece_type_at(to_square)
+    if victim is None and attacker == chess.PAWN and to_square == board.ep_square:
+        victim = chess.PAWN
+        occupied ^= chess.BB_SQUARES[to_square - 8 if board.turn == chess.WHITE else to_square + 8]
+    gain = [SEE_VALUES[victim] if victim else 0]
+    on_square = SEE_VALUES[attacker]
+    if move.promotion:
+        gain[0] += SEE_VALUES[move.promotion] - SEE_VALUES[chess.PAWN]
+        on_square = SEE_VALUES[move.promotion]
+
+    diagonal_sliders = board.bishops | board.queens
+    orthogonal_sliders = board.rooks | board.queens
+    attackers = attackers_to(board, to_square, occupied)
+    side = not board.turn
+    while True:
+        ours = attackers & board.occupied_co[side]
+        if not ours:
+            break
+        for piece_type in chess.PIECE_TYPES:
+            candidates = ours & board.pieces_mask(piece_type, side)
+            if candidates:
+                break
+        if piece_type == chess.KING and attackers & board.occupied_co[not side]:
+            break  # Recapturing with the king would walk into check
+        gain.append(on_square - gain[-1])
+        on_square = SEE_VALUES[piece_type]
+        occupied ^= candidates & -candidates
+        # Uncover sliders behind the piece that just captured
+        attackers |= chess.BB_DIAG_ATTACKS[to_square][chess.BB_DIAG_MASKS[to_square] & occupied] & diagonal_sliders
+        attackers |= (chess.BB_RANK_ATTACKS[to_square][chess.BB_RANK_MASKS[to_square] & occupied]
+                      | chess.BB_FILE_ATTACKS[to_square][chess.BB_FILE_MASKS[to_square] & occupied]) & orthogonal_sliders
+        attackers &= occupied
+        side = not side
+
+    # Each side may stop capturing when continuing loses material
+    for i in range(len(gain) - 1, 0, -1):
+        gain[i - 1] = -max(-gain[i - 1], gain[i])
+    return gain[0]
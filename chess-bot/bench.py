@@ -0,0 +1,146 @@
+import argparse
+import time
+
+import engine
+from timeman import SearchLimits
+from transposition import TranspositionTable
+
+# Opening, middlegame and endgame positions outside the opening book
+BENCH_FENS = [
+    "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4",
+    "r2q1rk1/ppp2ppp/2np1n2/2b1p1B1/2B1P1b1/2NP1N2/PPP2PPP/R2Q1RK1 w - - 0 8",
+    "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8",
+    "2r2rk1/pp1bqppp/2n1pn2/3p4/3P4/2PBPN2/P1Q2PPP/R4RK1 w - - 0 14",
+    "8/pp3pk1/2p3p1/3p3p/3P3P/2P3P1/PP3PK1/8 w - - 0 30",
+    "8/5pk1/6p1/3R3p/7P/6P1/r4PK1/8 b - - 0 40",
+]
+
+
+def eval_benchmark(fens, iterations: int = 200, evaluate=None) -> float:
+    """Evaluations per second over the given positions (each evaluated iterations times)."""
+    evaluate = evaluate or engine.evaluate
+    boards = [engine.EvalBoard(fen) for fen in fens]
+    start = time.perf_counter()
+    for board in boards:
+        for _ in range(iterations):
+            evaluate(board)
+    elapsed = time.perf_counter() - start
+    return len(boards) * iterations / elapsed if elapsed > 0 else 0.0
+
+
+def search_suite(fens, depth: int):
+    """Fixed-depth search of each position with a fresh worker and table.
+
+    Returns (results, elapsed, totals) with results a list of (move, score, nodes) and
+    totals the eval and quiescence counters summed over the positions.
+    """
+    results = []
+    totals = {}
+    start = time.perf_counter()
+    for fen in fens:
+        worker = engine.SearchWorker(TranspositionTable(engine.TT_SIZE_MB))
+        move, score, _ = worker.iterative_deepening(engine.EvalBoard(fen), SearchLimits(depth=depth))
+        results.append((move, score, worker.time_manager.nodes))
+        for name, value in list(worker.eval_stats().items()) + list(worker.qsearch_stats().items()):
+            if isinstance(value, list):
+                total = totals.setdefault(name, [0] * len(value))
+                for i, count in enumerate(value):
+                    total[i] += count
+            elif not name.endswith('_share'):
+                totals[name] = totals.get(name, 0) + value
+    return results, time.perf_counter() - start, totals
+
+
+def lazy_eval_report(fens, depth: int, margins=(None, 0, 100)) -> None:
+    """Effect of the lazy eval margin and the light quiescence tier on fixed-depth searches.
+
+    The first configuration (no lazy exits, full tier) is the reference for
+    best moves and scores.
+    """
+    saved = engine.LAZY_EVAL_MARGIN, engine.QSEARCH_EVAL_TIER
+    configs = [(margin, engine.EVAL_FULL) for margin in margins] + [(None, engine.EVAL_LIGHT)]
+    reference = None
+    print(f"{'margin':>7} {'qs tier':>7} {'time':>8} {'nodes':>9} {'lazy':>6} {'light':>6} {'same move':>9} {'score diff':>10}")
+    try:
+        for margin, tier in configs:
+            engine.LAZY_EVAL_MARGIN, engine.QSEARCH_EVAL_TIER = margin, tier
+            results, elapsed, totals = search_suite(fens, depth)
+            if reference is None:
+                reference = results
+            same = sum(r[0] == ref[0] for r, ref in zip(results, reference))
+            diff = sum(abs(r[1] - ref[1]) for r, ref in zip(results, reference)) / len(fens)
+            evals = totals['evals'] + totals['lazy_exits'] + totals['light_evals']
+            print(f"{str(margin):>7} {'light' if tier == engine.EVAL_LIGHT else 'full':>7} {elapsed:>7.2f}s "
+                  f"{sum(r[2] for r in results):>9} {totals['lazy_exits'] / evals:>6.1%} "
+                  f"{totals['light_evals'] / evals:>6.1%} {same:>5}/{len(fens):<3} {diff:>10.1f}")
+    finally:
+        engine.LAZY_EVAL_MARGIN, engine.QSEARCH_EVAL_TIER = saved
+
+
+def see_report(fens, depth: int) -> None:
+    """Quiescence nodes, time and best moves with and without delta and SEE pruning.
+
+    The first configuration (neither) is the reference for best moves and scores.
+    """
+    saved = engine.DELTA_MARGIN, engine.QSEARCH_SEE_PRUNING
+    configs = [(None, False), (engine.DELTA_MARGIN, False), (None, True), (engine.DELTA_MARGIN, True)]
+    reference = None
+    print(f"{'delta':>6} {'see':>5} {'time':>8} {'nodes':>9} {'qnodes':>9} {'qnode cut':>9} "
+          f"{'same move':>9} {'score diff':>10}")
+    try:
+        for margin, see_pruning in configs:
+            engine.DELTA_MARGIN, engine.QSEARCH_SEE_PRUNING = margin, see_pruning
+            results, elapsed, totals = search_suite(fens, depth)
+            if reference is None:
+                reference = results, totals['qnodes']
+            same = sum(r[0] == ref[0] for r, ref in zip(results, reference[0]))
+            diff = sum(abs(r[1] - ref[1]) for r, ref in zip(results, reference[0])) / len(fens)
+            cut = 1 - totals['qnodes'] / reference[1] if reference[1] else 0.0
+            print(f"{str(margin):>6} {'on' if see_pruning else 'off':>5} {elapsed:>7.2f}s "
+                  f"{sum(r[2] for r in results):>9} {totals['qnodes']:>9} {cut:>9.1%} "
+                  f"{same:>5}/{len(fens):<3} {diff:>10.1f}")
+    finally:
+        engine.DELTA_MARGIN, engine.QSEARCH_SEE_PRUNING = saved
+
+
+def qsearch_report(fens, depth: int) -> None:
+    """Quiescence nodes by plies into quiescence, summed over fixed-depth searches."""
+    results, elapsed, totals = search_suite(fens, depth)
+    by_depth = totals['qnodes_by_depth']
+    print(f"{sum(r[2] for r in results)} nodes, {totals['qnodes']} quiescence nodes, "
+          f"{totals['qsearch_tt_cutoffs']} TT cutoffs in {elapsed:.2f}s")
+    for qdepth, count in enumerate(by_depth):
+        print(f"{qdepth:>3} {count:>9} {count / totals['qnodes'] if totals['qnodes'] else 0.0:>7.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluation microbenchmark (evaluations per second).")
+    parser.add_argument("--iterations", type=int, default=200, help="Evaluations per position")
+    parser.add_argument("--fen", action="append", help="Position(s) to evaluate (default: built-in set)")
+    parser.add_argument("--no-pawn-hash", action="store_true", help="Disable the pawn hash table")
+    parser.add_argument("--lazy-report", type=int, metavar="DEPTH",
+                        help="Compare lazy eval margins and quiescence tiers with searches to DEPTH")
+    parser.add_argument("--see-report", type=int, metavar="DEPTH",
+                        help="Compare quiescence delta and SEE pruning with searches to DEPTH")
+    parser.add_argument("--qsearch-report", type=int, metavar="DEPTH",
+                        help="Quiescence nodes per quiescence ply in searches to DEPTH")
+    args = parser.parse_args()
+
+    engine.pawn_hash.enabled = not args.no_pawn_hash
+    fens = args.fen or BENCH_FENS
+    if args.lazy_report:
+        lazy_eval_report(fens, args.lazy_report)
+        return
+    if args.see_report:
+        see_report(fens, args.see_report)
+        return
+    if args.qsearch_report:
+        qsearch_report(fens, args.qsearch_report)
+        return
+    for fen in fens:
+        print(f"{eval_benchmark([fen], args.iterations):>10.0f} evals/s  {fen}")
+    print(f"{eval_benchmark(fens, args.iterations):>10.0f} evals/s  overall")
+
+
+if __name__ == "__main__":
+    main()
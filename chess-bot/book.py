@@ -0,0 +1,174 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+
+import chess
+import chess.polyglot
+
+# Polyglot opening books: 16-byte big-endian entries sorted by key
+#   key u64     chess.polyglot.zobrist_hash of the position (the keys SearchBoard keeps)
+#   move u16    to | from << 6 | promotion << 12 (knight 1 .. queen 4)
+#   weight u16  relative frequency of the move; 0 marks a deleted entry
+#   learn u32   unused here, written as 0
+# Castling is stored as the king taking its own rook (e1h1), as in every Polyglot book.
+# Move counters are not part of the key, so transpositions share entries.
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'book.bin')
+ENTRY = struct.Struct('>QHHI')
+MAX_WEIGHT = 0xFFFF
+
+
+def encode_move(board: chess.Board, move: chess.Move) -> int:
+    """Polyglot move word of a legal move on board."""
+    to_square = move.to_square
+    if board.is_castling(move):
+        to_square = chess.square(7 if board.is_kingside_castling(move) else 0, chess.square_rank(move.from_square))
+    promotion = move.promotion - 1 if move.promotion else 0
+    return to_square | (move.from_square << 6) | (promotion << 12)
+
+
+def decode_move(board: chess.Board, raw: int) -> chess.Move:
+    """Move of a Polyglot move word on board, turning king-takes-rook into castling."""
+    from_square = (raw >> 6) & 63
+    to_square = raw & 63
+    promotion = (raw >> 12) & 7
+    if (board.kings & chess.BB_SQUARES[from_square] and board.rooks & chess.BB_SQUARES[to_square]
+            and board.color_at(from_square) == board.color_at(to_square)):
+        to_square = chess.square(6 if to_square > from_square else 2, chess.square_rank(from_square))
+    return chess.Move(from_square, to_square, promotion + 1 if promotion else None)
+
+
+def write_book(path: str, entries, presorted: bool = False) -> int:
+    """Write (key, move word, weight) entries as a Polyglot book, heaviest move first
+    within a position. presorted entries are streamed as they come, already in that
+    order. Returns the number of entries written."""
+    if not presorted:
+        entries = sorted(entries, key=lambda e: (e[0], -e[2], e[1]))
+    count = 0
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        for key, raw, weight in entries:
+            f.write(ENTRY.pack(key, raw, min(weight, MAX_WEIGHT), 0))
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+class PolyglotBook:
+    """Memory-mapped Polyglot book, opened on first use; a missing file is an empty book.
+
+    choose(board) picks a legal book move at random in proportion to the weights,
+    or None when the position is not in the book.
+    """
+
+    def __init__(self, path: str = BOOK_PATH, enabled: bool = True, seed=None):
+        self.path = path
+        self.enabled = enabled
+        self.random = random.Random(seed)
+        self.mapped = None
+        self.opened = False
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+
+    def close(self):
+        if self.mapped is not None:
+            self.mapped.close()
+        self.mapped = None
+        self.opened = False
+
+    def _open(self):
+        if not self.opened:
+            self.opened = True
+            try:
+                with open(self.path, 'rb') as f:
+                    if os.fstat(f.fileno()).st_size % ENTRY.size == 0:
+                        self.mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                self.mapped = None  # Missing or empty file
+        return self.mapped
+
+    def __len__(self) -> int:
+        mapped = self._open()
+        return len(mapped) // ENTRY.size if mapped is not None else 0
+
+    def entries(self, board: chess.Board) -> list:
+        """(move, weight) of the legal book moves with a nonzero weight, in file order."""
+        mapped = self._open() if self.enabled else None
+        if mapped is None:
+            return []
+        self.probes += 1
+        key = chess.polyglot.zobrist_hash(board)
+        # Binary search for the first entry with this key
+        lo, hi = 0, len(mapped) // ENTRY.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ENTRY.unpack_from(mapped, mid * ENTRY.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = []
+        for offset in range(lo * ENTRY.size, len(mapped), ENTRY.size):
+            entry_key, raw, weight, _ = ENTRY.unpack_from(mapped, offset)
+            if entry_key != key:
+                break
+            if weight:
+                move = decode_move(board, raw)
+                if board.is_legal(move):
+                    found.append((move, weight))
+        if found:
+            self.hits += 1
+        return found
+
+    def choose(self, board: chess.Board):
+        """Weighted random book move, or None."""
+        found = self.entries(board)
+        if not found:
+            return None
+        moves, weights = zip(*found)
+        return self.random.choices(moves, weights)[0]
+
+
+def convert_fen_book(fen_book: dict, path: str = BOOK_PATH) -> int:
+    """Write a FEN -> UCI move dict as a Polyglot book, one weight-1 entry per
+    position and move. Returns the number of entries written."""
+    entries = set()
+    for fen, uci in fen_book.items():
+        board = chess.Board(fen)
+        move = chess.Move.from_uci(uci)
+        if not board.is_legal(move):
+            print(f"skipping illegal book move {uci} in {fen}")
+            continue
+        entries.add((chess.polyglot.zobrist_hash(board), encode_move(board, move), 1))
+    return write_book(path, entries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or inspect Polyglot opening books.")
+    parser.add_argument("--out", default=BOOK_PATH, help="Book file to write or read")
+    parser.add_argument("--from-fens", action="store_true",
+                        help="Convert the FEN-keyed book in fen_book.py into a Polyglot book")
+    parser.add_argument("--fen", help="List the book moves of a position")
+    args = parser.parse_args()
+
+    if args.from_fens:
+        from fen_book import opening_book
+        count = convert_fen_book(opening_book, args.out)
+        print(f"{args.out}: {count} entries from {len(opening_book)} positions")
+    if args.fen:
+        board = chess.Board(args.fen)
+        book = PolyglotBook(args.out)
+        found = book.entries(board)
+        total = sum(weight for _, weight in found)
+        for move, weight in sorted(found, key=lambda e: -e[1]):
+            print(f"{board.san(move):8} {weight:6} {100 * weight / total:5.1f}%")
+        if not found:
+            print("not in book")
+
+
+if __name__ == "__main__":
+    main()
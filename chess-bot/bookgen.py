@@ -0,0 +1,251 @@
+import argparse
+import heapq
+import io
+import itertools
+import os
+import shutil
+import struct
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import chess
+import chess.pgn
+import chess.polyglot
+
+from book import BOOK_PATH, MAX_WEIGHT, encode_move, write_book
+from train_weights import is_rapid_or_classical, outcome_from_headers, rating_band_ok
+
+# Compile a Polyglot book from PGN collections.
+#
+# The PGN is cut into shards of about SHARD_BYTES at game boundaries. Worker processes
+# count each (position, move) of the first max_ply plies of every game that passes the
+# filters and write the counts sorted by key to a temporary shard file. The shard files
+# are then merged as sorted streams, at most MERGE_FAN_IN files at a time, so memory
+# stays bounded by one shard per worker and open files by the fan-in.
+
+SHARD_BYTES = 16 << 20
+SHARD_RECORD = struct.Struct('<QHII')  # key, move word, games, points (2 per win, 1 per draw)
+READ_RECORDS = 1024  # Records per read while merging
+MERGE_FAN_IN = 256  # Shard files open at once while merging; more are merged in passes
+GAME_START = b'[Event '
+
+
+class _OpeningCounter(chess.pgn.BaseVisitor):
+    """Collects (key, move word) for the first max_ply plies of a game that passes the
+    filters; moves after that aren't even parsed. result() gives (moves, outcome), the
+    outcome None for a game the filters skip."""
+
+    def __init__(self, max_ply: int, rmin: int, rmax: int):
+        self.max_ply = max_ply
+        self.rmin = rmin
+        self.rmax = rmax
+
+    def begin_game(self):
+        self.headers = {}
+        self.moves = []
+        self.outcome = None
+
+    def visit_header(self, tagname, tagvalue):
+        self.headers[tagname] = tagvalue
+
+    def end_headers(self):
+        headers = self.headers
+        self.outcome = outcome_from_headers(headers)
+        if (self.outcome is None or not is_rapid_or_classical(headers)
+                or not rating_band_ok(headers, self.rmin, self.rmax)):
+            self.outcome = None
+            return chess.pgn.SKIP
+
+    def begin_variation(self):
+        return chess.pgn.SKIP
+
+    def begin_parse_san(self, board, san):
+        if len(self.moves) >= self.max_ply:
+            return chess.pgn.SKIP
+
+    def visit_move(self, board, move):
+        self.moves.append((chess.polyglot.zobrist_hash(board), encode_move(board, move)))
+
+    def handle_error(self, error):
+        pass  # Keep the moves read so far
+
+    def result(self):
+        return self.moves, self.outcome
+
+
+def shard_offsets(path: str, shard_bytes: int = SHARD_BYTES) -> list:
+    """(start, end) byte ranges of the file, each starting at a game's [Event tag."""
+    size = os.path.getsize(path)
+    starts = [0]
+    with open(path, 'rb') as f:
+        for boundary in range(shard_bytes, size, shard_bytes):
+            if boundary <= starts[-1]:
+                continue
+            f.seek(boundary)
+            f.readline()  # Finish the line the boundary fell in
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                if line.startswith(GAME_START):
+                    starts.append(offset)
+                    break
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def count_shard(path: str, start: int, end: int, max_ply: int, rmin: int, rmax: int, shard_path: str):
+    """Count one shard in a pool process into shard_path; returns (shard_path, games read, games kept)."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8', errors='ignore')
+    handle = io.StringIO(text)
+    counts = {}  # (key, move word) -> [games, points]
+    games = kept = 0
+    while True:
+        counted = chess.pgn.read_game(handle, Visitor=lambda: _OpeningCounter(max_ply, rmin, rmax))
+        if counted is None:
+            break
+        games += 1
+        moves, outcome = counted
+        if outcome is None:
+            continue
+        kept += 1
+        for ply, entry in enumerate(moves):
+            # outcome is from White's side; points are for the side that played the move
+            points = 1 + int(outcome if ply % 2 == 0 else -outcome)
+            stats = counts.get(entry)
+            if stats is None:
+                counts[entry] = [1, points]
+            else:
+                stats[0] += 1
+                stats[1] += points
+
+    with open(shard_path, 'wb') as f:
+        for (key, raw), (n, points) in sorted(counts.items()):
+            f.write(SHARD_RECORD.pack(key, raw, n, points))
+    return shard_path, games, kept
+
+
+def _read_shard(path: str):
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(SHARD_RECORD.size * READ_RECORDS)
+            if not data:
+                return
+            yield from SHARD_RECORD.iter_unpack(data)
+
+
+def _combine_shards(paths: list, out_path: str):
+    """Merge sorted shard files into one, adding up the counts of equal (key, move word)."""
+    merged = heapq.merge(*(_read_shard(path) for path in paths))
+    with open(out_path, 'wb') as f:
+        for (key, raw), records in itertools.groupby(merged, key=lambda r: r[:2]):
+            n = points = 0
+            for record in records:
+                n += record[2]
+                points += record[3]
+            f.write(SHARD_RECORD.pack(key, raw, n, points))
+    for path in paths:
+        os.remove(path)
+
+
+def reduce_shards(paths: list, fan_in: int = MERGE_FAN_IN) -> list:
+    """Merge shard files in passes of fan_in until at most fan_in are left; returns those."""
+    paths = list(paths)
+    merge_pass = 0
+    while len(paths) > fan_in:
+        merged = []
+        for i in range(0, len(paths), fan_in):
+            group = paths[i:i + fan_in]
+            if len(group) == 1:
+                merged.append(group[0])
+                continue
+            out_path = f'{group[0]}.m{merge_pass}'
+            _combine_shards(group, out_path)
+            merged.append(out_path)
+        paths = merged
+        merge_pass += 1
+    return paths
+
+
+def merge_shards(paths: list, min_games: int, fan_in: int = MERGE_FAN_IN):
+    """Yield (key, move word, weight) in book order from sorted shard files. Moves played
+    in fewer than min_games games are dropped; weights are points scaled to fit 16 bits."""
+    merged = heapq.merge(*(_read_shard(path) for path in reduce_shards(paths, fan_in)))
+    for key, records in itertools.groupby(merged, key=lambda r: r[0]):
+        totals = {}  # move word -> [games, points]
+        for _, raw, n, points in records:
+            stats = totals.setdefault(raw, [0, 0])
+            stats[0] += n
+            stats[1] += points
+        moves = [(raw, points) for raw, (n, points) in totals.items() if n >= min_games and points > 0]
+        if not moves:
+            continue
+        top = max(points for _, points in moves)
+        scale = MAX_WEIGHT / top if top > MAX_WEIGHT else 1
+        for raw, points in sorted(moves, key=lambda m: (-m[1], m[0])):
+            yield key, raw, max(1, int(points * scale))
+
+
+def compile_book(pgn_paths: list, out_path: str = BOOK_PATH, max_ply: int = 20, rmin: int = 0,
+                 rmax: int = 4000, min_games: int = 3, workers: int = None,
+                 shard_bytes: int = SHARD_BYTES, verbose: bool = True) -> dict:
+    """Build a Polyglot book from PGN files; returns counts and timings."""
+    workers = workers or os.cpu_count() or 1
+    start = time.monotonic()
+    shards = [(path, first, last) for path in pgn_paths for first, last in shard_offsets(path, shard_bytes)]
+    games = kept = 0
+    tmp_dir = tempfile.mkdtemp(prefix='bookgen-')
+    try:
+        shard_paths = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(count_shard, path, first, last, max_ply, rmin, rmax,
+                                   os.path.join(tmp_dir, f'{i:06d}.shard'))
+                       for i, (path, first, last) in enumerate(shards)]
+            for done, future in enumerate(as_completed(futures), 1):
+                shard_path, shard_games, shard_kept = future.result()
+                shard_paths.append(shard_path)
+                games += shard_games
+                kept += shard_kept
+                if verbose:
+                    elapsed = time.monotonic() - start
+                    print(f"shard {done}/{len(shards)}  {games} games  {games / elapsed:8.0f} games/s")
+        count_time = time.monotonic() - start
+        entries = write_book(out_path, merge_shards(shard_paths, min_games), presorted=True)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    elapsed = time.monotonic() - start
+    return {
+        'games': games,
+        'kept': kept,
+        'entries': entries,
+        'count_time': count_time,
+        'time': elapsed,
+        'games_per_sec': games / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile a Polyglot opening book from PGN files.")
+    parser.add_argument("pgn", nargs="+", help="PGN files")
+    parser.add_argument("--out", default=BOOK_PATH, help="Book file to write")
+    parser.add_argument("--max-ply", type=int, default=20, help="Count moves of the first N plies")
+    parser.add_argument("--min-games", type=int, default=3, help="Drop moves played in fewer games")
+    parser.add_argument("--rating-min", type=int, default=0, help="Minimum player rating")
+    parser.add_argument("--rating-max", type=int, default=4000, help="Maximum player rating")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--shard-mb", type=float, default=SHARD_BYTES / (1 << 20), help="PGN bytes per shard")
+    args = parser.parse_args()
+
+    stats = compile_book(args.pgn, args.out, args.max_ply, args.rating_min, args.rating_max,
+                         args.min_games, args.workers, int(args.shard_mb * (1 << 20)))
+    print(f"{stats['games']} games read, {stats['kept']} kept, {stats['entries']} book entries")
+    print(f"counting {stats['count_time']:.1f}s, total {stats['time']:.1f}s, "
+          f"{stats['games_per_sec']:.0f} games/s")
+    print(f"Saved book to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
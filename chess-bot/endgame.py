@@ -0,0 +1,120 @@
+import chess
+
+# Material key: a 4-bit count per side and piece type (pawn to queen), White in the low 20 bits.
+# Captures and promotions only add or subtract MATERIAL_DELTAS, so EvalBoard keeps it incrementally.
+MATERIAL_DELTAS = [[0] * 7, [0] * 7]  # [color][piece_type]
+for _color in chess.COLORS:
+    for _piece_type in (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+        MATERIAL_DELTAS[_color][_piece_type] = 1 << ((0 if _color == chess.WHITE else 20) + (_piece_type - 1) * 4)
+
+SCALE_NORMAL = 64  # Scale factors are out of this
+
+KNOWN_WIN = 5000  # Base score of endings evaluated as won without search
+
+# ENDGAMES[material key] = (evaluate, scale), one of them None:
+#   evaluate(board) replaces the whole evaluation (White's point of view),
+#   scale(board) returns a factor out of SCALE_NORMAL applied to the normal one.
+ENDGAMES = {}
+
+
+def material_key(board: chess.Board) -> int:
+    """From-scratch material key, as EvalBoard keeps it incrementally."""
+    key = 0
+    for color in chess.COLORS:
+        deltas = MATERIAL_DELTAS[color]
+        for piece_type in (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+            key += chess.popcount(board.pieces_mask(piece_type, color)) * deltas[piece_type]
+    return key
+
+
+def signature_key(white: str, black: str) -> int:
+    """Material key of piece letters per side, e.g. signature_key('KBN', 'K')."""
+    key = 0
+    for color, pieces in ((chess.WHITE, white), (chess.BLACK, black)):
+        for symbol in pieces.upper().replace('K', ''):
+            key += MATERIAL_DELTAS[color][chess.PIECE_SYMBOLS.index(symbol.lower())]
+    return key
+
+
+def edge_distance(square: int) -> int:
+    file, rank = square & 7, square >> 3
+    return min(file, 7 - file, rank, 7 - rank)
+
+
+def center_distance(square: int) -> float:
+    return abs((square & 7) - 3.5) + abs((square >> 3) - 3.5)
+
+
+def relative_rank(square: int, color: chess.Color) -> int:
+    return square >> 3 if color == chess.WHITE else 7 - (square >> 3)
+
+
+# Endgame scorers take the strong side and return its score
+
+def kqk(board: chess.Board, strong: chess.Color) -> int:
+    """Drive the bare king to the edge."""
+    return KNOWN_WIN + (3 - edge_distance(board.king(not strong))) * 200
+
+
+def krk(board: chess.Board, strong: chess.Color) -> int:
+    """Drive the bare king to the edge with our king in the centre."""
+    edge_bonus = (7 - edge_distance(board.king(not strong))) * 100
+    center_bonus = (7 - center_distance(board.king(strong))) * 50
+    return KNOWN_WIN + edge_bonus + center_bonus
+
+
+def kpk(board: chess.Board, strong: chess.Color) -> int:
+    """Push the pawn."""
+    return 1000 + relative_rank(chess.lsb(board.pawns), strong) * 100
+
+
+def kbnk(board: chess.Board, strong: chess.Color) -> int:
+    """Mate only works in a corner of the bishop's color: drive the king there, ours close behind."""
+    weak_king = board.king(not strong)
+    if board.bishops & chess.BB_DARK_SQUARES:
+        corners = (chess.A1, chess.H8)
+    else:
+        corners = (chess.A8, chess.H1)
+    corner = min(chess.square_distance(weak_king, c) for c in corners)
+    kings = chess.square_distance(weak_king, board.king(strong))
+    return KNOWN_WIN + (7 - corner) * 100 + (3 - edge_distance(weak_king)) * 50 + (7 - kings) * 20
+
+
+# Scale factors take the strong side (the one the table was registered for)
+
+def drawish(factor: int):
+    """Scale factor for material that is usually drawn whatever the rest of the evaluation says."""
+    def scale(board: chess.Board, strong: chess.Color) -> int:
+        return factor
+    return scale
+
+
+def opposite_bishops(board: chess.Board, strong: chess.Color) -> int:
+    """Opposite-colored bishops with only pawns otherwise: the defender holds a blockade."""
+    bishops = board.bishops
+    if bishops & chess.BB_DARK_SQUARES and bishops & chess.BB_LIGHT_SQUARES:
+        return SCALE_NORMAL // 2
+    return SCALE_NORMAL
+
+
+def register(strong: str, weak: str, evaluate=None, scale=None) -> None:
+    """Add an ending for both colors: strong and weak are piece letters, e.g. 'KBN', 'K'."""
+    for color in chess.COLORS:
+        white, black = (strong, weak) if color == chess.WHITE else (weak, strong)
+        if evaluate is not None:
+            sign = 1 if color == chess.WHITE else -1
+            ENDGAMES[signature_key(white, black)] = (
+                lambda board, color=color, sign=sign: sign * evaluate(board, color), None)
+        else:
+            ENDGAMES[signature_key(white, black)] = (None, lambda board, color=color: scale(board, color))
+
+
+register('KQ', 'K', evaluate=kqk)
+register('KR', 'K', evaluate=krk)
+register('KP', 'K', evaluate=kpk)
+register('KBN', 'K', evaluate=kbnk)
+register('KR', 'KB', scale=drawish(SCALE_NORMAL // 4))
+register('KR', 'KN', scale=drawish(SCALE_NORMAL // 4))
+for _white_pawns in range(9):
+    for _black_pawns in range(_white_pawns, 9):
+        register('KB' + 'P' * _black_pawns, 'KB' + 'P' * _white_pawns, scale=opposite_bishops)
@@ -1,5 +1,17 @@
+import itertools
+
 import chess
-import math
+
+from transposition import EvalCache, TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, DEPTH_QS
+from zobrist import PIECE_KEYS, SearchBoard
+import movepick
+from movepick import MVV_LVA, MovePicker, is_good_capture
+from attacks import KING_ZONES, SEE_VALUES, AttackMap
+from book import PolyglotBook
+from endgame import ENDGAMES, MATERIAL_DELTAS, SCALE_NORMAL, material_key
+from pawns import PAWN_HASH_ENTRIES, PawnHashTable, advancement, open_file, pawn_king_key
+from tablebase import MAX_PIECES as TB_MAX_PIECES, WDL_LOSS, WDL_WIN, Tablebases
+from timeman import SearchAborted, SearchLimits, TimeManager
 
 # Tunable search parameters (can be optimized)
 NULL_MOVE_R = 3
@@ -11,152 +23,28 @@ LMR_REDUCTION_1 = 1
 LMR_REDUCTION_2 = 2
 ASPIRATION_WINDOW = 50
 LATE_MOVE_PRUNING_BASE = 3
+TT_SIZE_MB = 16
+MAX_PV_LENGTH = 32
+LAZY_EVAL_MARGIN = 0  # Slack on top of lazy_eval_bound before skipping the last eval terms (None disables)
 
-transposition_table = {}
-killer_moves = {}  # Depth -> list of killer moves
-history_moves = {}  # (from_square, to_square) -> count
+# Evaluation tiers: EVAL_LIGHT stops after the cheap terms
+EVAL_LIGHT = 0
+EVAL_FULL = 1
+QSEARCH_EVAL_TIER = EVAL_FULL  # EVAL_LIGHT is much faster but changes best moves (bench.py --lazy-report)
+QSEARCH_MAX_DEPTH = 6  # Deepest quiescence ply searched; beyond it the static eval is returned
+QSEARCH_SEE_PRUNING = True  # Skip captures that lose material by static exchange evaluation
+DELTA_MARGIN = 200  # Skip a capture if even winning its victim plus this leaves us below alpha (None disables)
 
-# Opening book: FEN to UCI move - Comprehensive opening coverage
-opening_book = {
-    # Starting position
-    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1': 'e2e4',
-    
-    # King's Pawn Openings (1.e4)
-    'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1': 'e7e5',
-    'rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2': 'g1f3',
-    'rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2': 'b8c6',
-    
-    # Italian Game
-    'r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3': 'f1c4',
-    'r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4': 'd2d3',
-    'r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/3P1N2/PPP2PPP/RNBQK2R b KQkq - 0 4': 'f8c5',
-    'r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQK2R w KQkq - 5 5': 'c2c3',
-    'r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/2PP1N2/PP3PPP/RNBQK2R b KQkq - 0 5': 'd7d6',
-    
-    # Spanish Opening (Ruy Lopez)
-    'r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3': 'f1b5',
-    'r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3': 'a7a6',
-    'r1bqkbnr/1ppp1ppp/p1n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 0 4': 'b5a4',
-    'r1bqkbnr/1ppp1ppp/p1n5/4p3/B3P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 1 4': 'g8f6',
-    'r1bqkb1r/1ppp1ppp/p1n2n2/4p3/B3P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 2 5': 'e1g1',
-    'r1bqkb1r/1ppp1ppp/p1n2n2/4p3/B3P3/5N2/PPPP1PPP/RNBQ1RK1 b kq - 3 5': 'f8e7',
-    'r1bqk2r/1pppbppp/p1n2n2/4p3/B3P3/5N2/PPPP1PPP/RNBQ1RK1 w kq - 4 6': 'f1e1',
-    'r1bqk2r/1pppbppp/p1n2n2/4p3/B3P3/5N2/PPPP1PPP/RNBQR1K1 b kq - 5 6': 'b7b5',
-    'r1bqk2r/2ppbppp/p1n2n2/1p2p3/B3P3/5N2/PPPP1PPP/RNBQR1K1 w kq - 0 7': 'a4b3',
-    'r1bqk2r/2ppbppp/p1n2n2/1p2p3/4P3/1B3N2/PPPP1PPP/RNBQR1K1 b kq - 1 7': 'd7d6',
-    
-    # Scotch Game
-    'r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3': 'd2d4',
-    'r1bqkbnr/pppp1ppp/2n5/4p3/3PP3/5N2/PPP2PPP/RNBQKB1R b KQkq - 0 3': 'e5d4',
-    'r1bqkbnr/pppp1ppp/2n5/8/3pP3/5N2/PPP2PPP/RNBQKB1R w KQkq - 0 4': 'f3d4',
-    
-    # Two Knights Defense
-    'r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3': 'b1c3',
-    'r1bqkb1r/pppp1ppp/2n2n2/4p3/4P3/2N2N2/PPPP1PPP/R1BQKB1R w KQkq - 4 4': 'f1c4',
-    
-    # Petrov Defense
-    'rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2': 'g8f6',
-    'rnbqkb1r/pppp1ppp/5n2/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3': 'f3e5',
-    'rnbqkb1r/pppp1ppp/5n2/4N3/4P3/8/PPPP1PPP/RNBQKB1R b KQkq - 0 3': 'd7d6',
-    'rnbqkb1r/ppp2ppp/3p1n2/4N3/4P3/8/PPPP1PPP/RNBQKB1R w KQkq - 0 4': 'e5f3',
-    'rnbqkb1r/ppp2ppp/3p1n2/8/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 4': 'f6e4',
-    
-    # Sicilian Defense - Main Lines
-    'rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2': 'g1f3',
-    'rnbqkbnr/pp1ppppp/8/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2': 'd7d6',
-    'rnbqkbnr/pp2pppp/3p4/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 0 3': 'd2d4',
-    'rnbqkbnr/pp2pppp/3p4/2p5/3PP3/5N2/PPP2PPP/RNBQKB1R b KQkq - 0 3': 'c5d4',
-    'rnbqkbnr/pp2pppp/3p4/8/3pP3/5N2/PPP2PPP/RNBQKB1R w KQkq - 0 4': 'f3d4',
-    'rnbqkbnr/pp2pppp/3p4/8/3NP3/8/PPP2PPP/RNBQKB1R b KQkq - 0 4': 'g8f6',
-    'rnbqkb1r/pp2pppp/3p1n2/8/3NP3/8/PPP2PPP/RNBQKB1R w KQkq - 1 5': 'b1c3',
-    
-    # Sicilian - Najdorf Variation
-    'rnbqkb1r/pp2pppp/3p1n2/8/3NP3/2N5/PPP2PPP/R1BQKB1R b KQkq - 2 5': 'a7a6',
-    'rnbqkb1r/1p2pppp/p2p1n2/8/3NP3/2N5/PPP2PPP/R1BQKB1R w KQkq - 0 6': 'f1e2',
-    'rnbqkb1r/1p2pppp/p2p1n2/8/3NP3/2N5/PPP1BPPP/R1BQK2R b KQkq - 1 6': 'e7e5',
-    'rnbqkb1r/1p3ppp/p2p1n2/4p3/3NP3/2N5/PPP1BPPP/R1BQK2R w KQkq - 0 7': 'd4b3',
-    
-    # Sicilian - Dragon Variation
-    'rnbqkb1r/pp2pppp/3p1n2/8/3NP3/2N5/PPP2PPP/R1BQKB1R b KQkq - 2 5': 'g7g6',
-    'rnbqkb1r/pp2pp1p/3p1np1/8/3NP3/2N5/PPP2PPP/R1BQKB1R w KQkq - 0 6': 'f1e3',
-    'rnbqkb1r/pp2pp1p/3p1np1/8/3NP3/2N1B3/PPP2PPP/R2QKB1R b KQkq - 1 6': 'f8g7',
-    'rnbqk2r/pp2ppbp/3p1np1/8/3NP3/2N1B3/PPP2PPP/R2QKB1R w KQkq - 2 7': 'f2f3',
-    
-    # French Defense
-    'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1': 'e7e6',
-    'rnbqkbnr/pppp1ppp/4p3/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2': 'd2d4',
-    'rnbqkbnr/pppp1ppp/4p3/8/3PP3/8/PPP2PPP/RNBQKBNR b KQkq - 0 2': 'd7d5',
-    'rnbqkbnr/ppp2ppp/4p3/3p4/3PP3/8/PPP2PPP/RNBQKBNR w KQkq - 0 3': 'b1c3',
-    'rnbqkbnr/ppp2ppp/4p3/3p4/3PP3/2N5/PPP2PPP/R1BQKBNR b KQkq - 1 3': 'g8f6',
-    'rnbqkb1r/ppp2ppp/4pn2/3p4/3PP3/2N5/PPP2PPP/R1BQKBNR w KQkq - 2 4': 'c1g5',
-    'rnbqkb1r/ppp2ppp/4pn2/3p2B1/3PP3/2N5/PPP2PPP/R2QKBNR b KQkq - 3 4': 'f8e7',
-    'rnbqk2r/ppp1bppp/4pn2/3p2B1/3PP3/2N5/PPP2PPP/R2QKBNR w KQkq - 4 5': 'e4e5',
-    
-    # Caro-Kann Defense
-    'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1': 'c7c6',
-    'rnbqkbnr/pp1ppppp/2p5/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2': 'd2d4',
-    'rnbqkbnr/pp1ppppp/2p5/8/3PP3/8/PPP2PPP/RNBQKBNR b KQkq - 0 2': 'd7d5',
-    'rnbqkbnr/pp2pppp/2p5/3p4/3PP3/8/PPP2PPP/RNBQKBNR w KQkq - 0 3': 'b1c3',
-    'rnbqkbnr/pp2pppp/2p5/3p4/3PP3/2N5/PPP2PPP/R1BQKBNR b KQkq - 1 3': 'd5e4',
-    'rnbqkbnr/pp2pppp/2p5/8/3Pp3/2N5/PPP2PPP/R1BQKBNR w KQkq - 0 4': 'c3e4',
-    'rnbqkbnr/pp2pppp/2p5/8/3PN3/8/PPP2PPP/R1BQKBNR b KQkq - 0 4': 'c8f5',
-    'rn1qkbnr/pp2pppp/2p5/5b2/3PN3/8/PPP2PPP/R1BQKBNR w KQkq - 1 5': 'e4g3',
-    
-    # Pirc Defense
-    'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1': 'd7d6',
-    'rnbqkbnr/ppp1pppp/3p4/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2': 'd2d4',
-    'rnbqkbnr/ppp1pppp/3p4/8/3PP3/8/PPP2PPP/RNBQKBNR b KQkq - 0 2': 'g8f6',
-    'rnbqkb1r/ppp1pppp/3p1n2/8/3PP3/8/PPP2PPP/RNBQKBNR w KQkq - 1 3': 'b1c3',
-    'rnbqkb1r/ppp1pppp/3p1n2/8/3PP3/2N5/PPP2PPP/R1BQKBNR b KQkq - 2 3': 'g7g6',
-    'rnbqkb1r/ppp1pp1p/3p1np1/8/3PP3/2N5/PPP2PPP/R1BQKBNR w KQkq - 0 4': 'f1e2',
-    
-    # Queen's Gambit
-    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1': 'd2d4',
-    'rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR b KQkq - 0 1': 'd7d5',
-    'rnbqkbnr/ppp1pppp/8/3p4/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 0 2': 'c2c4',
-    'rnbqkbnr/ppp1pppp/8/3p4/2PP4/8/PP2PPPP/RNBQKBNR b KQkq - 0 2': 'e7e6',
-    'rnbqkbnr/ppp2ppp/4p3/3p4/2PP4/8/PP2PPPP/RNBQKBNR w KQkq - 0 3': 'b1c3',
-    'rnbqkbnr/ppp2ppp/4p3/3p4/2PP4/2N5/PP2PPPP/R1BQKBNR b KQkq - 1 3': 'g8f6',
-    'rnbqkb1r/ppp2ppp/4pn2/3p4/2PP4/2N5/PP2PPPP/R1BQKBNR w KQkq - 2 4': 'c1g5',
-    'rnbqkb1r/ppp2ppp/4pn2/3p2B1/2PP4/2N5/PP2PPPP/R2QKBNR b KQkq - 3 4': 'f8e7',
-    'rnbqk2r/ppp1bppp/4pn2/3p2B1/2PP4/2N5/PP2PPPP/R2QKBNR w KQkq - 4 5': 'e2e3',
-    
-    # Queen's Gambit Accepted
-    'rnbqkbnr/ppp1pppp/8/3p4/2PP4/8/PP2PPPP/RNBQKBNR b KQkq - 0 2': 'd5c4',
-    'rnbqkbnr/ppp1pppp/8/8/2pP4/8/PP2PPPP/RNBQKBNR w KQkq - 0 3': 'g1f3',
-    'rnbqkbnr/ppp1pppp/8/8/2pP4/5N2/PP2PPPP/RNBQKB1R b KQkq - 1 3': 'g8f6',
-    'rnbqkb1r/ppp1pppp/5n2/8/2pP4/5N2/PP2PPPP/RNBQKB1R w KQkq - 2 4': 'e2e3',
-    
-    # Slav Defense
-    'rnbqkbnr/ppp1pppp/8/3p4/2PP4/8/PP2PPPP/RNBQKBNR b KQkq - 0 2': 'c7c6',
-    'rnbqkbnr/pp2pppp/2p5/3p4/2PP4/8/PP2PPPP/RNBQKBNR w KQkq - 0 3': 'g1f3',
-    'rnbqkbnr/pp2pppp/2p5/3p4/2PP4/5N2/PP2PPPP/RNBQKB1R b KQkq - 1 3': 'g8f6',
-    'rnbqkb1r/pp2pppp/2p2n2/3p4/2PP4/5N2/PP2PPPP/RNBQKB1R w KQkq - 2 4': 'b1c3',
-    
-    # Nimzo-Indian Defense
-    'rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR b KQkq - 0 1': 'g8f6',
-    'rnbqkb1r/pppppppp/5n2/8/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 1 2': 'c2c4',
-    'rnbqkb1r/pppppppp/5n2/8/2PP4/8/PP2PPPP/RNBQKBNR b KQkq - 0 2': 'e7e6',
-    'rnbqkb1r/pppp1ppp/4pn2/8/2PP4/8/PP2PPPP/RNBQKBNR w KQkq - 0 3': 'b1c3',
-    'rnbqkb1r/pppp1ppp/4pn2/8/2PP4/2N5/PP2PPPP/R1BQKBNR b KQkq - 1 3': 'f8b4',
-    'rnbqk2r/pppp1ppp/4pn2/8/1bPP4/2N5/PP2PPPP/R1BQKBNR w KQkq - 2 4': 'e2e3',
-    'rnbqk2r/pppp1ppp/4pn2/8/1bPP4/2N1P3/PP3PPP/R1BQKBNR b KQkq - 0 4': 'e8g8',
-    
-    # King's Indian Defense
-    'rnbqkb1r/pppppppp/5n2/8/2PP4/8/PP2PPPP/RNBQKBNR b KQkq - 0 2': 'g7g6',
-    'rnbqkb1r/pppppp1p/5np1/8/2PP4/8/PP2PPPP/RNBQKBNR w KQkq - 0 3': 'b1c3',
-    'rnbqkb1r/pppppp1p/5np1/8/2PP4/2N5/PP2PPPP/R1BQKBNR b KQkq - 1 3': 'f8g7',
-    'rnbqk2r/ppppppbp/5np1/8/2PP4/2N5/PP2PPPP/R1BQKBNR w KQkq - 2 4': 'e2e4',
-    'rnbqk2r/ppppppbp/5np1/8/2PPP3/2N5/PP3PPP/R1BQKBNR b KQkq - 0 4': 'd7d6',
-    'rnbqk2r/ppp1ppbp/3p1np1/8/2PPP3/2N5/PP3PPP/R1BQKBNR w KQkq - 0 5': 'g1f3',
-    
-    # English Opening
-    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1': 'c2c4',
-    'rnbqkbnr/pppppppp/8/8/2P5/8/PP1PPPPP/RNBQKBNR b KQkq - 0 1': 'e7e5',
-    'rnbqkbnr/pppp1ppp/8/4p3/2P5/8/PP1PPPPP/RNBQKBNR w KQkq - 0 2': 'b1c3',
-    'rnbqkbnr/pppp1ppp/8/4p3/2P5/2N5/PP1PPPPP/R1BQKBNR b KQkq - 1 2': 'g8f6',
-    'rnbqkb1r/pppp1ppp/5n2/4p3/2P5/2N5/PP1PPPPP/R1BQKBNR w KQkq - 2 3': 'g1f3',
-}
+# Integer score domain: a mate found n plies from the root scores MATE - n
+MATE = 100000
+MAX_PLY = 256
+MATE_BOUND = MATE - MAX_PLY  # Scores at or beyond this are mates
+INFINITE = MATE + 1
+
+transposition_table = TranspositionTable(TT_SIZE_MB)
+pawn_hash = PawnHashTable(PAWN_HASH_ENTRIES)  # Set pawn_hash.enabled = False for A/B runs
+tablebases = Tablebases()  # Endgame tables built by tablebase.py; positions without a file are searched
+opening_book = PolyglotBook()  # book.bin, see book.py; without the file every move is searched
 
 PIECE_VALUES = {
     chess.PAWN: 100,
@@ -300,52 +188,166 @@ KING_EG = [
     -50,-30,-30,-30,-30,-30,-30,-50
 ]
 
+MG_TABLES = {
+    chess.PAWN: PAWN_MG,
+    chess.KNIGHT: KNIGHT_MG,
+    chess.BISHOP: BISHOP_MG,
+    chess.ROOK: ROOK_MG,
+    chess.QUEEN: QUEEN_MG,
+    chess.KING: KING_MG,
+}
+EG_TABLES = {
+    chess.PAWN: PAWN_EG,
+    chess.KNIGHT: KNIGHT_EG,
+    chess.BISHOP: BISHOP_EG,
+    chess.ROOK: ROOK_EG,
+    chess.QUEEN: QUEEN_EG,
+    chess.KING: KING_EG,
+}
+
+# Game phase: minor pieces count 1, rooks 2, queens 4 (24 with all pieces on)
+PHASE_WEIGHTS = [0, 0, 1, 1, 2, 4, 0]
+TOTAL_PHASE = 24
+
+# Material + PST per piece from White's point of view, indexed [color][piece_type][square].
+# Black pieces read the tables at 63 - square.
+MG_SCORES = [[None] * 7, [None] * 7]
+EG_SCORES = [[None] * 7, [None] * 7]
+for _piece_type in chess.PIECE_TYPES:
+    _value = PIECE_VALUES[_piece_type]
+    MG_SCORES[chess.WHITE][_piece_type] = [_value + MG_TABLES[_piece_type][sq] for sq in chess.SQUARES]
+    EG_SCORES[chess.WHITE][_piece_type] = [_value + EG_TABLES[_piece_type][sq] for sq in chess.SQUARES]
+    MG_SCORES[chess.BLACK][_piece_type] = [-_value - MG_TABLES[_piece_type][63 - sq] for sq in chess.SQUARES]
+    EG_SCORES[chess.BLACK][_piece_type] = [-_value - EG_TABLES[_piece_type][63 - sq] for sq in chess.SQUARES]
+
+
 def get_game_phase(board: chess.Board) -> float:
     """Calculate game phase (0.0 = endgame, 1.0 = opening/middlegame)."""
-    knight_phase = 1
-    bishop_phase = 1
-    rook_phase = 2
-    queen_phase = 4
-    total_phase = knight_phase * 4 + bishop_phase * 4 + rook_phase * 4 + queen_phase * 2
-    
     phase = 0
-    phase += len(board.pieces(chess.KNIGHT, chess.WHITE)) * knight_phase
-    phase += len(board.pieces(chess.KNIGHT, chess.BLACK)) * knight_phase
-    phase += len(board.pieces(chess.BISHOP, chess.WHITE)) * bishop_phase
-    phase += len(board.pieces(chess.BISHOP, chess.BLACK)) * bishop_phase
-    phase += len(board.pieces(chess.ROOK, chess.WHITE)) * rook_phase
-    phase += len(board.pieces(chess.ROOK, chess.BLACK)) * rook_phase
-    phase += len(board.pieces(chess.QUEEN, chess.WHITE)) * queen_phase
-    phase += len(board.pieces(chess.QUEEN, chess.BLACK)) * queen_phase
-    
-    phase = min(phase, total_phase)
-    return phase / total_phase
+    for piece_type in (chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+        phase += chess.popcount(board.pieces_mask(piece_type, chess.WHITE) |
+                                board.pieces_mask(piece_type, chess.BLACK)) * PHASE_WEIGHTS[piece_type]
+    return min(phase, TOTAL_PHASE) / TOTAL_PHASE
 
 def get_pst_value(piece_type: chess.PieceType, square: int, phase: float) -> int:
     """Get piece-square table value with phase interpolation."""
-    mg_tables = {
-        chess.PAWN: PAWN_MG,
-        chess.KNIGHT: KNIGHT_MG,
-        chess.BISHOP: BISHOP_MG,
-        chess.ROOK: ROOK_MG,
-        chess.QUEEN: QUEEN_MG,
-        chess.KING: KING_MG,
-    }
-    eg_tables = {
-        chess.PAWN: PAWN_EG,
-        chess.KNIGHT: KNIGHT_EG,
-        chess.BISHOP: BISHOP_EG,
-        chess.ROOK: ROOK_EG,
-        chess.QUEEN: QUEEN_EG,
-        chess.KING: KING_EG,
-    }
-    
-    mg_value = mg_tables[piece_type][square]
-    eg_value = eg_tables[piece_type][square]
+    mg_value = MG_TABLES[piece_type][square]
+    eg_value = EG_TABLES[piece_type][square]
     
     # Linear interpolation between middlegame and endgame
     return int(mg_value * phase + eg_value * (1 - phase))
 
+def material_pst(board: chess.Board):
+    """From-scratch (mg, eg, phase) sums of material + PST, as EvalBoard keeps them incrementally."""
+    mg = eg = phase = 0
+    for color in chess.COLORS:
+        for piece_type in chess.PIECE_TYPES:
+            mg_scores = MG_SCORES[color][piece_type]
+            eg_scores = EG_SCORES[color][piece_type]
+            for square in chess.scan_forward(board.pieces_mask(piece_type, color)):
+                mg += mg_scores[square]
+                eg += eg_scores[square]
+                phase += PHASE_WEIGHTS[piece_type]
+    return mg, eg, phase
+
+def tapered(mg: int, eg: int, phase: int) -> int:
+    """Interpolate between the middlegame and endgame sums by game phase."""
+    phase = min(phase, TOTAL_PHASE)
+    return (mg * phase + eg * (TOTAL_PHASE - phase)) // TOTAL_PHASE
+
+
+class EvalBoard(SearchBoard):
+    """SearchBoard that also keeps evaluation inputs up to date on push/pop.
+
+    mg, eg and phase always equal material_pst(self), pawn_key equals
+    pawn_king_key(self) and material_key equals material_key(self); evaluate
+    reads them in O(1).
+    """
+
+    def reset_keys(self):
+        super().reset_keys()
+        self.mg, self.eg, self.phase = material_pst(self)
+        self.pawn_key = pawn_king_key(self)
+        self.material_key = material_key(self)
+        self.eval_stack = []
+
+    def push(self, move: chess.Move) -> None:
+        self.eval_stack.append((self.mg, self.eg, self.phase, self.pawn_key, self.material_key))
+        if move:
+            turn = self.turn
+            from_sq = move.from_square
+            to_sq = move.to_square
+            piece_type = self.piece_type_at(from_sq)
+            mg_ours = MG_SCORES[turn]
+            eg_ours = EG_SCORES[turn]
+            keys_ours = PIECE_KEYS[turn]
+            mg = self.mg - mg_ours[piece_type][from_sq]
+            eg = self.eg - eg_ours[piece_type][from_sq]
+            if piece_type == chess.PAWN or piece_type == chess.KING:
+                self.pawn_key ^= keys_ours[piece_type][from_sq]
+
+            if piece_type == chess.KING and (abs(to_sq - from_sq) == 2 or
+                                             self.rooks & self.occupied_co[turn] & chess.BB_SQUARES[to_sq]):
+                # Castling: move both the king and the rook
+                rank_base = from_sq & ~7
+                kingside = to_sq > from_sq
+                if self.rooks & self.occupied_co[turn] & chess.BB_SQUARES[to_sq]:
+                    rook_from = to_sq
+                else:
+                    rook_from = rank_base + (7 if kingside else 0)
+                king_to = rank_base + (6 if kingside else 2)
+                rook_to = rank_base + (5 if kingside else 3)
+                mg += mg_ours[chess.KING][king_to] - mg_ours[chess.ROOK][rook_from] + mg_ours[chess.ROOK][rook_to]
+                eg += eg_ours[chess.KING][king_to] - eg_ours[chess.ROOK][rook_from] + eg_ours[chess.ROOK][rook_to]
+                self.pawn_key ^= keys_ours[chess.KING][king_to]
+            else:
+                captured = self.piece_type_at(to_sq)
+                capture_sq = to_sq
+                if not captured and piece_type == chess.PAWN and to_sq == self.ep_square:
+                    captured = chess.PAWN
+                    capture_sq = to_sq - 8 if turn else to_sq + 8
+                if captured:
+                    mg -= MG_SCORES[not turn][captured][capture_sq]
+                    eg -= EG_SCORES[not turn][captured][capture_sq]
+                    self.phase -= PHASE_WEIGHTS[captured]
+                    self.material_key -= MATERIAL_DELTAS[not turn][captured]
+                    if captured == chess.PAWN:
+                        self.pawn_key ^= PIECE_KEYS[not turn][chess.PAWN][capture_sq]
+                new_type = move.promotion or piece_type
+                mg += mg_ours[new_type][to_sq]
+                eg += eg_ours[new_type][to_sq]
+                self.phase += PHASE_WEIGHTS[new_type] - PHASE_WEIGHTS[piece_type]
+                if move.promotion:
+                    self.material_key += MATERIAL_DELTAS[turn][new_type] - MATERIAL_DELTAS[turn][chess.PAWN]
+                if new_type == chess.PAWN or new_type == chess.KING:
+                    self.pawn_key ^= keys_ours[new_type][to_sq]
+            self.mg = mg
+            self.eg = eg
+
+        super().push(move)
+        if self.verify_keys:
+            self._check_eval(move)
+
+    def pop(self) -> chess.Move:
+        move = super().pop()
+        if self.eval_stack:
+            self.mg, self.eg, self.phase, self.pawn_key, self.material_key = self.eval_stack.pop()
+        else:
+            # Popping past the position the sums were seeded from
+            self.mg, self.eg, self.phase = material_pst(self)
+            self.pawn_key = pawn_king_key(self)
+            self.material_key = material_key(self)
+        if self.verify_keys:
+            self._check_eval(move)
+        return move
+
+    def _check_eval(self, move):
+        expected = material_pst(self) + (pawn_king_key(self), material_key(self))
+        actual = (self.mg, self.eg, self.phase, self.pawn_key, self.material_key)
+        if actual != expected:
+            raise AssertionError(f"Incremental eval mismatch after {move} in {self.fen()}: "
+                                 f"{actual} != {expected}")
+
 # Tunable evaluation weights
 WEIGHTS = {
     'bishop_pair': 50,
@@ -377,150 +379,152 @@ except FileNotFoundError:
 
 def is_endgame(board: chess.Board) -> bool:
     """Detect endgame phase (few pieces left)."""
-    total_pieces = len(board.piece_map()) - 2  # Exclude kings
+    total_pieces = chess.popcount(board.occupied) - 2  # Exclude kings
     return total_pieces <= 8
 
 
-def evaluate_basic_mates(board: chess.Board) -> int:
-    """Recognize and handle famous endgame patterns."""
-    pieces = board.piece_map()
-    white_pieces = [p for p in pieces.values() if p.color == chess.WHITE]
-    black_pieces = [p for p in pieces.values() if p.color == chess.BLACK]
-    
-    white_material = sum(PIECE_VALUES.get(p.piece_type, 0) for p in white_pieces)
-    black_material = sum(PIECE_VALUES.get(p.piece_type, 0) for p in black_pieces)
-    material_diff = white_material - black_material
-    
-    # K+Q vs K: Chase enemy king to edge and corner
-    if material_diff > 800 and len(white_pieces) == 2 and any(p.piece_type == chess.QUEEN for p in white_pieces):
-        black_king_sq = board.king(chess.BLACK)
-        if black_king_sq:
-            file = chess.square_file(black_king_sq)
-            rank = chess.square_rank(black_king_sq)
-            edge_distance = min(file, 7-file, rank, 7-rank)
-            return 5000 + (3 - edge_distance) * 200
-    
-    if material_diff < -800 and len(black_pieces) == 2 and any(p.piece_type == chess.QUEEN for p in black_pieces):
-        white_king_sq = board.king(chess.WHITE)
-        if white_king_sq:
-            file = chess.square_file(white_king_sq)
-            rank = chess.square_rank(white_king_sq)
-            edge_distance = min(file, 7-file, rank, 7-rank)
-            return -5000 - (3 - edge_distance) * 200
-    
-    # K+R vs K: Drive to edge
-    if material_diff > 400 and len(white_pieces) == 2 and any(p.piece_type == chess.ROOK for p in white_pieces):
-        black_king_sq = board.king(chess.BLACK)
-        white_king_sq = board.king(chess.WHITE)
-        if black_king_sq and white_king_sq:
-            # Rook and king vs king: push enemy king away and centralize own king
-            bk_file = chess.square_file(black_king_sq)
-            bk_rank = chess.square_rank(black_king_sq)
-            wk_file = chess.square_file(white_king_sq)
-            wk_rank = chess.square_rank(white_king_sq)
-            
-            # Bonus for driving black king to edge
-            edge_bonus = (7 - min(bk_file, 7-bk_file, bk_rank, 7-bk_rank)) * 100
-            # Bonus for centralizing white king
-            center_bonus = (7 - abs(wk_file - 3.5) - abs(wk_rank - 3.5)) * 50
-            return 5000 + edge_bonus + center_bonus
-    
-    if material_diff < -400 and len(black_pieces) == 2 and any(p.piece_type == chess.ROOK for p in black_pieces):
-        white_king_sq = board.king(chess.WHITE)
-        black_king_sq = board.king(chess.BLACK)
-        if white_king_sq and black_king_sq:
-            wk_file = chess.square_file(white_king_sq)
-            wk_rank = chess.square_rank(white_king_sq)
-            bk_file = chess.square_file(black_king_sq)
-            bk_rank = chess.square_rank(black_king_sq)
-            
-            edge_bonus = (7 - min(wk_file, 7-wk_file, wk_rank, 7-wk_rank)) * 100
-            center_bonus = (7 - abs(bk_file - 3.5) - abs(bk_rank - 3.5)) * 50
-            return -5000 - edge_bonus - center_bonus
-    
-    # K+B vs K: Can't mate, but try to maintain advantage
-    # K+N vs K: Can't mate, but try to maintain advantage
-    # K+P vs K: Advance pawn and push enemy king away
-    if len(white_pieces) <= 3:
-        white_pawns = len([p for p in white_pieces if p.piece_type == chess.PAWN])
-        if white_pawns > 0:
-            # Bonus for advancing pawns
-            for pawn_sq in board.pieces(chess.PAWN, chess.WHITE):
-                rank = chess.square_rank(pawn_sq)
-                return 1000 + rank * 100
-    
-    if len(black_pieces) <= 3:
-        black_pawns = len([p for p in black_pieces if p.piece_type == chess.PAWN])
-        if black_pawns > 0:
-            for pawn_sq in board.pieces(chess.PAWN, chess.BLACK):
-                rank = chess.square_rank(pawn_sq)
-                return -1000 - (7 - rank) * 100
-    
-    return 0
+def lazy_eval_bound(board: chess.Board) -> int:
+    """Most the terms after evaluate_lazy's exit (centre, development, rooks) can move the score."""
+    bound = 4 * abs(WEIGHTS['center_control']) + 4 * abs(WEIGHTS['development'])
+    per_rook = abs(WEIGHTS['rook_open_file']) + abs(WEIGHTS['rook_7th'])
+    rook_bound = 0
+    for color in chess.COLORS:
+        rooks = chess.popcount(board.rooks & board.occupied_co[color])
+        rook_bound = max(rook_bound, rooks * per_rook + rooks * (rooks - 1) // 2 * abs(WEIGHTS['rook_connected']))
+    return bound + rook_bound
+
+
+def evaluate(board: chess.Board, position_history=None, alpha: int = None, beta: int = None,
+             tier: int = EVAL_FULL) -> int:
+    """Enhanced evaluation with material, position, pawn structure, and endgame knowledge.
+
+    alpha/beta (White's point of view) and tier are as for evaluate_lazy.
+    """
+    return evaluate_lazy(board, alpha, beta, tier, position_history)[0]
 
 
-def evaluate(board: chess.Board, position_history=None) -> int:
-    """Enhanced evaluation with material, position, pawn structure, and endgame knowledge."""
+def evaluate_lazy(board: chess.Board, alpha: int = None, beta: int = None, tier: int = EVAL_FULL,
+                  position_history=None, pawn_table: PawnHashTable = None):
+    """Return (score, complete), White's point of view.
+
+    Cheap terms (material/PST, pawn hash, bishop pair, castling, tempo, endgame king
+    and passers) come first; the EVAL_LIGHT tier stops there. Mobility and king
+    attacks follow. If the score is then more than lazy_eval_bound (plus
+    LAZY_EVAL_MARGIN) below alpha or above beta, the centre, development and rook
+    terms can't bring it back into the window and are skipped. complete is False
+    for those partial scores, which callers must not cache. pawn_table defaults
+    to the module's pawn_hash.
+    """
     if board.is_checkmate():
-        return -math.inf if board.turn else math.inf
+        return (-MATE if board.turn else MATE), True
     if board.is_stalemate() or board.is_insufficient_material():
         # Contempt factor: treat draws as slightly negative
-        return -WEIGHTS['contempt'] if board.turn == chess.WHITE else WEIGHTS['contempt']
+        return (-WEIGHTS['contempt'] if board.turn == chess.WHITE else WEIGHTS['contempt']), True
     
     # Check for draw by repetition
     if position_history:
         current_pos = board.fen().split(' ')[0]
         if position_history.count(current_pos) >= 2:
-            return -WEIGHTS['contempt'] if board.turn == chess.WHITE else WEIGHTS['contempt']
+            return (-WEIGHTS['contempt'] if board.turn == chess.WHITE else WEIGHTS['contempt']), True
     
     score = 0
     
-    # Check for basic mating patterns
-    mate_score = evaluate_basic_mates(board)
-    if mate_score != 0:
-        return mate_score
+    # Specialised endings by material: one dictionary lookup for everything else
+    endgame = ENDGAMES.get(board.material_key if isinstance(board, EvalBoard) else material_key(board))
+    factor = SCALE_NORMAL
+    if endgame is not None and board.king(chess.WHITE) is not None and board.king(chess.BLACK) is not None:
+        endgame_eval, endgame_scale = endgame
+        if endgame_eval is not None:
+            return int(endgame_eval(board)), True
+        factor = endgame_scale(board)
     
-    # Calculate game phase for smooth PST interpolation
-    phase = get_game_phase(board)
+    # Tapered material + PST: kept incrementally by EvalBoard, otherwise summed from scratch
+    if isinstance(board, EvalBoard):
+        mg, eg, phase_count = board.mg, board.eg, board.phase
+    else:
+        mg, eg, phase_count = material_pst(board)
+    score += tapered(mg, eg, phase_count)
+    phase = min(phase_count, TOTAL_PHASE) / TOTAL_PHASE
     in_endgame = phase < 0.4  # Consider endgame when phase drops below 40%
-    
-    # Material
-    for piece_type in PIECE_VALUES:
-        score += len(board.pieces(piece_type, chess.WHITE)) * PIECE_VALUES[piece_type]
-        score -= len(board.pieces(piece_type, chess.BLACK)) * PIECE_VALUES[piece_type]
 
     # Bishop pair bonus
-    white_bishops = len(board.pieces(chess.BISHOP, chess.WHITE))
-    black_bishops = len(board.pieces(chess.BISHOP, chess.BLACK))
-    if white_bishops >= 2:
+    if chess.popcount(board.bishops & board.occupied_co[chess.WHITE]) >= 2:
         score += WEIGHTS['bishop_pair']
-    if black_bishops >= 2:
+    if chess.popcount(board.bishops & board.occupied_co[chess.BLACK]) >= 2:
         score -= WEIGHTS['bishop_pair']
 
-    # Position with phase-based interpolation
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece:
-            pst_value = get_pst_value(piece.piece_type, square, phase)
-            if piece.color == chess.WHITE:
-                score += pst_value
-            else:
-                score -= get_pst_value(piece.piece_type, 63 - square, phase)
+    # Castling bonus
+    if board.has_castling_rights(chess.WHITE):
+        score += WEIGHTS['castling']
+    if board.has_castling_rights(chess.BLACK):
+        score -= WEIGHTS['castling']
+
+    # Pawn structure and king shelter, cached by the pawn hash
+    pawn_key = board.pawn_key if isinstance(board, EvalBoard) else None
+    white_terms, black_terms = (pawn_hash if pawn_table is None else pawn_table).probe(board, pawn_key)
+    pawn_king = {chess.WHITE: white_terms, chess.BLACK: black_terms}
+    for color in [chess.WHITE, chess.BLACK]:
+        sign = 1 if color == chess.WHITE else -1
+        isolated, doubled, backward, passed, shield_count, open_files = pawn_king[color]
+        score -= sign * (isolated * WEIGHTS['isolated_pawn'] + doubled * WEIGHTS['doubled_pawn']
+                         + backward * WEIGHTS['backward_pawn'])
+        # Stronger bonus for advanced passed pawns
+        score += sign * (chess.popcount(passed) * WEIGHTS['passed_pawn'] + advancement(passed, color) * 10)
+        # Pawn shield and open files near the king
+        if shield_count is not None:
+            score += shield_count * WEIGHTS['pawn_shield'] * sign
+            score -= open_files * WEIGHTS['king_open_file'] * sign
+
+    # Tempo bonus
+    score += WEIGHTS['tempo'] if board.turn == chess.WHITE else -WEIGHTS['tempo']
+
+    # ENDGAME ENHANCEMENTS
+    if is_endgame(board):
+        # King becomes active in endgame
+        white_king = board.king(chess.WHITE)
+        black_king = board.king(chess.BLACK)
+        if white_king and black_king:
+            # Centralize king in endgame
+            white_king_file = chess.square_file(white_king)
+            white_king_rank = chess.square_rank(white_king)
+            black_king_file = chess.square_file(black_king)
+            black_king_rank = chess.square_rank(black_king)
+            
+            # Distance to center (reward central kings)
+            white_center_dist = abs(white_king_file - 3.5) + abs(white_king_rank - 3.5)
+            black_center_dist = abs(black_king_file - 3.5) + abs(black_king_rank - 3.5)
+            score += (black_center_dist - white_center_dist) * 20
+        
+        # Strongly reward passed pawns in endgame, by advancement
+        score += advancement(white_terms[3], chess.WHITE) * 30
+        score -= advancement(black_terms[3], chess.BLACK) * 30
 
-    # Efficient mobility calculation (only count pieces, not all moves)
+    if tier == EVAL_LIGHT:
+        return int(score if factor == SCALE_NORMAL else score * factor / SCALE_NORMAL), False
+
+    # Mobility and king-zone attacks for both sides from one set of attack maps (no move generation)
     if not in_endgame:
-        white_mobility = 0
-        black_mobility = 0
-        for move in board.legal_moves:
-            piece = board.piece_at(move.from_square)
-            if piece:
-                if piece.color == chess.WHITE:
-                    white_mobility += 1
-                else:
-                    black_mobility += 1
+        attack_map = AttackMap(board)
+        white_mobility = attack_map.mobility(board, chess.WHITE)
+        black_mobility = attack_map.mobility(board, chess.BLACK)
         score += WEIGHTS['mobility'] * (white_mobility - black_mobility)
 
+        for color in [chess.WHITE, chess.BLACK]:
+            king_sq = board.king(color)
+            if not king_sq:
+                continue
+            sign = 1 if color == chess.WHITE else -1
+            # King attack zone (count enemy attacks on the 5x5 block around the king)
+            attack_count, _ = attack_map.zone_attacks(not color, KING_ZONES[king_sq])
+            score -= WEIGHTS['king_attack'] * attack_count * sign
 
+    # Lazy exit: centre, development and rooks are all that is left, and they can't move
+    # the score by more than lazy_eval_bound (scale factors only shrink it)
+    partial = score if factor == SCALE_NORMAL else score * factor / SCALE_NORMAL
+    if LAZY_EVAL_MARGIN is not None and (alpha is not None or beta is not None):
+        margin = lazy_eval_bound(board) + LAZY_EVAL_MARGIN
+        if (alpha is not None and partial + margin <= alpha) or (beta is not None and partial - margin >= beta):
+            return int(partial), False
 
     # Center control (squares d4, e4, d5, e5)
     center_squares = [chess.D4, chess.E4, chess.D5, chess.E5]
@@ -550,85 +554,6 @@ def evaluate(board: chess.Board, position_history=None) -> int:
             elif color == chess.BLACK and bishop_sq in [chess.C8, chess.F8]:
                 score -= WEIGHTS['development'] * sign
 
-    # Castling bonus
-    if board.has_castling_rights(chess.WHITE):
-        score += WEIGHTS['castling']
-    if board.has_castling_rights(chess.BLACK):
-        score -= WEIGHTS['castling']
-
-    # Pawn structure
-    for color in [chess.WHITE, chess.BLACK]:
-        pawns = board.pieces(chess.PAWN, color)
-        for pawn_sq in pawns:
-            file = chess.square_file(pawn_sq)
-            rank = chess.square_rank(pawn_sq)
-            
-            # Isolated pawn
-            isolated = True
-            for f in [file-1, file+1]:
-                if 0 <= f < 8 and any(board.piece_at(chess.square(f, r)) == chess.Piece(chess.PAWN, color) for r in range(8)):
-                    isolated = False
-                    break
-            if isolated:
-                score -= WEIGHTS['isolated_pawn'] if color == chess.WHITE else -WEIGHTS['isolated_pawn']
-            
-            # Doubled pawn
-            doubled = False
-            for r in range(8):
-                if r != rank and board.piece_at(chess.square(file, r)) == chess.Piece(chess.PAWN, color):
-                    doubled = True
-                    break
-            if doubled:
-                score -= WEIGHTS['doubled_pawn'] if color == chess.WHITE else -WEIGHTS['doubled_pawn']
-            
-            # Backward pawn (no pawn behind on adjacent files, and can't advance safely)
-            backward = False
-            if not isolated:
-                has_support = False
-                direction = 1 if color == chess.WHITE else -1
-                for f in [file-1, file+1]:
-                    if 0 <= f < 8:
-                        for r in range(rank - direction, -1 if color == chess.WHITE else 8, -direction):
-                            if board.piece_at(chess.square(f, r)) == chess.Piece(chess.PAWN, color):
-                                has_support = True
-                                break
-                        if has_support:
-                            break
-                if not has_support:
-                    # Check if advance square is attacked
-                    advance_rank = rank + direction
-                    if 0 <= advance_rank < 8:
-                        advance_sq = chess.square(file, advance_rank)
-                        # Simplified: check if enemy pawn attacks this square
-                        for f in [file-1, file+1]:
-                            if 0 <= f < 8:
-                                enemy_pawn_rank = advance_rank + direction
-                                if 0 <= enemy_pawn_rank < 8:
-                                    if board.piece_at(chess.square(f, enemy_pawn_rank)) == chess.Piece(chess.PAWN, not color):
-                                        backward = True
-                                        break
-                if backward:
-                    score -= WEIGHTS['backward_pawn'] if color == chess.WHITE else -WEIGHTS['backward_pawn']
-            
-            # Passed pawn
-            passed = True
-            direction = 1 if color == chess.WHITE else -1
-            for r in range(rank + direction, 8 if color == chess.WHITE else -1, direction):
-                for f in [file-1, file, file+1]:
-                    if 0 <= f < 8:
-                        piece = board.piece_at(chess.square(f, r))
-                        if piece and piece.piece_type == chess.PAWN and piece.color != color:
-                            passed = False
-                            break
-                if not passed:
-                    break
-            if passed:
-                bonus = WEIGHTS['passed_pawn']
-                # Stronger bonus for advanced passed pawns
-                advancement = rank if color == chess.WHITE else 7 - rank
-                bonus += advancement * 10
-                score += bonus if color == chess.WHITE else -bonus
-
     # Rooks on open files and 7th rank
     for color in [chess.WHITE, chess.BLACK]:
         rooks = board.pieces(chess.ROOK, color)
@@ -638,13 +563,7 @@ def evaluate(board: chess.Board, position_history=None) -> int:
             rank = chess.square_rank(rook_sq)
             
             # Rook on open file
-            open_file = True
-            for r in range(8):
-                piece = board.piece_at(chess.square(file, r))
-                if piece and piece.piece_type == chess.PAWN:
-                    open_file = False
-                    break
-            if open_file:
+            if open_file(board, file):
                 score += WEIGHTS['rook_open_file'] if color == chess.WHITE else -WEIGHTS['rook_open_file']
             
             # Rook on 7th rank
@@ -659,367 +578,574 @@ def evaluate(board: chess.Board, position_history=None) -> int:
                        chess.square_rank(rook_sq) == chess.square_rank(other_rook):
                         score += WEIGHTS['rook_connected'] if color == chess.WHITE else -WEIGHTS['rook_connected']
 
-    # King safety
-    for color in [chess.WHITE, chess.BLACK]:
-        king_sq = board.king(color)
-        if not king_sq:
-            continue
+    if factor != SCALE_NORMAL:
+        score = score * factor / SCALE_NORMAL
+    return int(score), True
 
-        file = chess.square_file(king_sq)
-        rank = chess.square_rank(king_sq)
-        sign = 1 if color == chess.WHITE else -1
 
-        # Pawn shield (only add squares that are actually on board)
-        shield_squares = []
-        if color == chess.WHITE and rank >= 1:
-            for f in (file - 1, file, file + 1):
-                if 0 <= f < 8:
-                    shield_squares.append(chess.square(f, rank - 1))
-        elif color == chess.BLACK and rank <= 6:
-            for f in (file - 1, file, file + 1):
-                if 0 <= f < 8:
-                    shield_squares.append(chess.square(f, rank + 1))
-
-        shield_count = sum(
-            1
-            for sq in shield_squares
-            if board.piece_at(sq) == chess.Piece(chess.PAWN, color)
-        )
-        score += shield_count * WEIGHTS['pawn_shield'] * sign
-
-        # Open file near king (penalize king on open/semi-open files)
-        for f in (file - 1, file, file + 1):
-            if not (0 <= f < 8):
-                continue
-            open_near = True
-            for r in range(8):
-                piece = board.piece_at(chess.square(f, r))
-                if piece and piece.piece_type == chess.PAWN:
-                    open_near = False
-                    break
-            if open_near:
-                score -= WEIGHTS['king_open_file'] * sign
-        
-        # King attack zone (count enemy pieces attacking near king)
-        if not in_endgame:
-            attack_count = 0
-            for attack_file in range(max(0, file-2), min(8, file+3)):
-                for attack_rank in range(max(0, rank-2), min(8, rank+3)):
-                    attack_sq = chess.square(attack_file, attack_rank)
-                    attackers = board.attackers(not color, attack_sq)
-                    attack_count += len(attackers)
-            score -= WEIGHTS['king_attack'] * attack_count * sign
+def score_to_tt(score: int, ply: int) -> int:
+    """Mate scores are stored relative to the node, not the root, so they stay valid at any ply."""
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
 
 
-    # Tempo bonus
-    score += WEIGHTS['tempo'] if board.turn == chess.WHITE else -WEIGHTS['tempo']
+def tablebase_score(wdl: int, plies: int, ply: int) -> int:
+    """Search score of a table result: mates plies away from a node ply plies from the root."""
+    if wdl == WDL_WIN:
+        return MATE - ply - plies
+    if wdl == WDL_LOSS:
+        return -MATE + ply + plies
+    return 0
 
-    # ENDGAME ENHANCEMENTS
-    if is_endgame(board):
-        # King becomes active in endgame
-        white_king = board.king(chess.WHITE)
-        black_king = board.king(chess.BLACK)
-        if white_king and black_king:
-            # Centralize king in endgame
-            white_king_file = chess.square_file(white_king)
-            white_king_rank = chess.square_rank(white_king)
-            black_king_file = chess.square_file(black_king)
-            black_king_rank = chess.square_rank(black_king)
-            
-            # Distance to center (reward central kings)
-            white_center_dist = abs(white_king_file - 3.5) + abs(white_king_rank - 3.5)
-            black_center_dist = abs(black_king_file - 3.5) + abs(black_king_rank - 3.5)
-            score += (black_center_dist - white_center_dist) * 20
-        
-        # Strongly reward passed pawns in endgame
-        for color in [chess.WHITE, chess.BLACK]:
-            pawns = board.pieces(chess.PAWN, color)
-            for pawn_sq in pawns:
-                file = chess.square_file(pawn_sq)
-                rank = chess.square_rank(pawn_sq)
-                passed = True
-                direction = 1 if color == chess.WHITE else -1
-                for r in range(rank + direction, 8 if color == chess.WHITE else -1, direction):
-                    for f in [file-1, file, file+1]:
-                        if 0 <= f < 8:
-                            piece = board.piece_at(chess.square(f, r))
-                            if piece and piece.piece_type == chess.PAWN and piece.color != color:
-                                passed = False
-                                break
-                    if not passed:
-                        break
-                if passed:
-                    if color == chess.WHITE:
-                        # Reward advancement
-                        score += (rank * 30)
-                    else:
-                        score -= ((7 - rank) * 30)
 
+def score_from_tt(score: int, ply: int) -> int:
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
     return score
 
-def quiescence(board: chess.Board, alpha: int, beta: int, depth: int = 0) -> int:
-    """Quiescence search with delta pruning and stand-pat."""
-    if depth > 6:  # Increased depth for better tactical vision
-        return evaluate(board)
-    
-    stand_pat = evaluate(board)
-    if stand_pat >= beta:
-        return beta
-    
-    # Delta pruning: if we're too far behind even with a queen capture, prune
-    BIG_DELTA = 975  # Queen value + margin
-    if stand_pat < alpha - BIG_DELTA:
-        return alpha
-    
-    if alpha < stand_pat:
-        alpha = stand_pat
-
-    # Order captures by MVV/LVA
-    captures = [m for m in board.legal_moves if board.is_capture(m)]
-    def capture_score(move):
-        victim = board.piece_at(move.to_square)
-        attacker = board.piece_at(move.from_square)
-        victim_value = PIECE_VALUES.get(victim.piece_type, 0) if victim else 0
-        attacker_value = PIECE_VALUES.get(attacker.piece_type, 0) if attacker else 0
-        return victim_value * 10 - attacker_value
-    
-    captures.sort(key=capture_score, reverse=True)
-    
-    for move in captures:
-        board.push(move)
-        score = -quiescence(board, -beta, -alpha, depth + 1)
-        board.pop()
-        if score >= beta:
-            return beta
-        if score > alpha:
-            alpha = score
-    return alpha
-
-def pvs_search(board: chess.Board, depth: int, alpha: int, beta: int, position_history=None, null_move_allowed=True):
-    """Principal Variation Search with null move pruning and check extensions."""
-    global transposition_table, killer_moves, history_moves
-    if position_history is None:
-        position_history = []
-    
-    key = board.fen()
-    
-    # Check transposition table
-    if key in transposition_table and transposition_table[key][0] >= depth:
-        return transposition_table[key][1], None
-    
-    # Check for draw by repetition
-    current_pos = board.fen().split(' ')[0]
-    if position_history.count(current_pos) >= 2:
-        return 0, None  # Draw by repetition
-    
-    # Terminal nodes
-    if board.is_game_over():
-        score = evaluate(board, position_history)
-        transposition_table[key] = (depth, score, None)
-        return score, None
-    
-    # Check extension: extend search if in check
-    in_check = board.is_check()
-    if in_check:
-        depth += 1
-    
-    if depth == 0:
-        score = quiescence(board, alpha, beta)
-        transposition_table[key] = (0, score, None)
-        return score, None
-    
-    # Null move pruning: if we can afford to pass, position is too good
-    if null_move_allowed and depth >= 3 and not in_check:
-        # Don't do null move if we're in zugzwang-prone endgame (only pawns+king)
-        has_pieces = any(board.piece_at(sq) and board.piece_at(sq).piece_type not in [chess.PAWN, chess.KING] 
-                        and board.piece_at(sq).color == board.turn for sq in chess.SQUARES)
-        if has_pieces:
-            board.push(chess.Move.null())
-            null_score, _ = pvs_search(board, depth - NULL_MOVE_R, -beta, -beta + 1, position_history, False)
-            null_score = -null_score
-            board.pop()
-            if null_score >= beta:
-                return beta, None  # Beta cutoff
-    
-    # Razoring: if position is hopeless and depth is low, reduce search
-    if not in_check and depth <= 3:
-        eval_score = evaluate(board, position_history)
-        razor_margin = RAZOR_MARGIN_MULT * depth
-        if eval_score + razor_margin < alpha:
-            # Try quiescence to see if we can improve
-            q_score = quiescence(board, alpha - razor_margin, alpha - razor_margin + 1)
-            if q_score + razor_margin <= alpha:
-                return q_score, None
-    
-    # Futility pruning: at low depth, if we're far behind, skip quiet moves
-    futility_pruning = False
-    futility_margin = 0
-    if not in_check and depth <= 3:
-        eval_score = evaluate(board, position_history)
-        futility_margin = FUTILITY_MARGIN_MULT * depth
-        if eval_score + futility_margin <= alpha:
-            futility_pruning = True
-    
-    # Move ordering
-    def move_score(move):
-        score = 0
-        if depth in killer_moves and move in killer_moves[depth]:
-            score += 9000
-        move_key = (move.from_square, move.to_square)
-        if move_key in history_moves:
-            score += history_moves[move_key]
-        if move.promotion:
-            score += 10000
-        if board.is_capture(move):
-            victim = board.piece_at(move.to_square)
-            attacker = board.piece_at(move.from_square)
-            victim_value = PIECE_VALUES.get(victim.piece_type, 0) if victim else 0
-            attacker_value = PIECE_VALUES.get(attacker.piece_type, 0) if attacker else 0
-            score += 8000 + victim_value - attacker_value
+
+class SearchWorker:
+    """Search state for one thread or process: TT handle, killers, history and clock.
+
+    The pawn hash, move picker counters and tablebase handle default to the
+    module's; a worker on another thread of the same process needs its own.
+    """
+
+    def __init__(self, tt: TranspositionTable, pawn_table: PawnHashTable = None, move_stats: dict = None,
+                 tables: Tablebases = None):
+        self.tt = tt
+        self.pawn_table = pawn_table if pawn_table is not None else pawn_hash
+        self.move_stats = move_stats if move_stats is not None else movepick.stats
+        self.tablebases = tables if tables is not None else tablebases
+        self.killer_moves = {}  # Depth -> list of killer moves
+        self.history_moves = {}  # (from_square, to_square) -> count
+        self.time_manager = TimeManager(SearchLimits(), chess.WHITE)  # Replaced for every search
+        self.root_ply = 0  # len(board.move_stack) at the root of the current search
+        self.eval_cache = EvalCache()  # evaluate() results by Zobrist key, kept across searches
+        self.reset_eval_stats()
+        self.reset_qsearch_stats()
+
+    def new_game(self):
+        """Forget move-ordering state from the previous game."""
+        self.killer_moves.clear()
+        self.history_moves.clear()
+        self.eval_cache.clear()
+
+    def reset_eval_stats(self):
+        self.evals = 0  # Complete evaluate() calls
+        self.eval_cache_hits = 0  # Static evals served by the eval cache
+        self.tt_eval_hits = 0  # Static evals read from a TT entry
+        self.lazy_exits = 0  # Partial evals: outside the window after the cheap terms
+        self.light_evals = 0  # Partial evals: EVAL_LIGHT tier
+
+    def eval_stats(self) -> dict:
+        """Static evals needed during the last search and how many were not computed."""
+        avoided = self.eval_cache_hits + self.tt_eval_hits
+        partial = self.lazy_exits + self.light_evals
+        requested = self.evals + partial + avoided
+        return {
+            'evals': self.evals,
+            'eval_cache_hits': self.eval_cache_hits,
+            'tt_eval_hits': self.tt_eval_hits,
+            'evals_avoided': avoided,
+            'avoided_share': avoided / requested if requested else 0.0,
+            'lazy_exits': self.lazy_exits,
+            'light_evals': self.light_evals,
+            'partial_share': partial / requested if requested else 0.0,
+        }
+
+    def reset_qsearch_stats(self):
+        self.qnodes = 0  # Quiescence nodes visited
+        self.qnodes_by_depth = [0] * (QSEARCH_MAX_DEPTH + 2)  # The same, by plies into quiescence
+        self.qsearch_tt_cutoffs = 0  # Quiescence nodes answered by the TT
+        self.delta_prunes = 0  # Captures skipped because their victim can't reach alpha
+        self.see_prunes = 0  # Captures skipped because they lose material
+
+    def qsearch_stats(self) -> dict:
+        return {
+            'qnodes': self.qnodes,
+            'qnodes_by_depth': list(self.qnodes_by_depth),
+            'qsearch_tt_cutoffs': self.qsearch_tt_cutoffs,
+            'delta_prunes': self.delta_prunes,
+            'see_prunes': self.see_prunes,
+        }
+
+    def age_heuristics(self):
+        """Called before every search: killers are indexed by remaining depth, so they only
+        make sense within one search, while history is halved to favour recent cutoffs."""
+        self.killer_moves.clear()
+        for key, value in list(self.history_moves.items()):
+            if value > 1:
+                self.history_moves[key] = value // 2
+            else:
+                del self.history_moves[key]
+
+    def static_eval(self, board: chess.Board, alpha: int = None, beta: int = None, tier: int = EVAL_FULL) -> int:
+        """evaluate() from the side to move's point of view, with checkmates scored by distance from the root.
+
+        With a window (side to move's point of view) the result may be a lazy
+        estimate once it is clearly outside it; see evaluate_lazy.
+        """
+        key = board.zobrist_key
+        score = self.eval_cache.probe(key)
+        if score is None:
+            if board.turn == chess.BLACK:
+                alpha, beta = (None if beta is None else -beta), (None if alpha is None else -alpha)
+            score, complete = evaluate_lazy(board, alpha, beta, tier, pawn_table=self.pawn_table)
+            if complete:
+                self.evals += 1
+                self.eval_cache.store(key, score)
+            elif tier == EVAL_LIGHT:
+                self.light_evals += 1
+            else:
+                self.lazy_exits += 1
+        else:
+            self.eval_cache_hits += 1
+        if board.turn == chess.BLACK:
+            score = -score
+        if score <= -MATE_BOUND:
+            score += len(board.move_stack) - self.root_ply
         return score
-    
-    moves = sorted(board.legal_moves, key=move_score, reverse=True)
-    if not moves:
-        return evaluate(board, position_history), None
-    
-    best_move = None
-    best_score = -math.inf
-    new_history = position_history + [current_pos]
-    
-    # Principal Variation Search
-    for i, move in enumerate(moves):
-        # Futility pruning: skip quiet moves if position is hopeless
-        if futility_pruning and i > 0 and not board.is_capture(move) and not move.promotion:
-            continue
+
+    def quiescence(self, board: chess.Board, alpha: int, beta: int, depth: int = 0) -> int:
+        """Quiescence search over captures and queen promotions, or all evasions when in check.
+
+        Entries go to the TT at DEPTH_QS, so any main-search entry for the position
+        is deep enough to answer a probe here.
+        """
+        self.time_manager.tick()
+        self.qnodes += 1
+        self.qnodes_by_depth[depth] += 1
+        if depth > QSEARCH_MAX_DEPTH:
+            return self.static_eval(board, alpha, beta, QSEARCH_EVAL_TIER)
+
+        ply = len(board.move_stack) - self.root_ply
+        key = board.zobrist_key
+        alpha_orig = alpha
+        tt_move = None
+        tt_eval = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_depth, tt_score, tt_bound, tt_move, tt_eval = entry
+            if tt_depth >= DEPTH_QS:
+                tt_score = score_from_tt(tt_score, ply)
+                if (tt_bound == BOUND_EXACT or (tt_bound == BOUND_LOWER and tt_score >= beta)
+                        or (tt_bound == BOUND_UPPER and tt_score <= alpha)):
+                    self.qsearch_tt_cutoffs += 1
+                    return tt_score
+
+        in_check = board.is_check()
+        if in_check:
+            # No standing pat in check: every evasion is searched, none means mate
+            stand_pat = None
+            moves = board.generate_legal_moves()
+        else:
+            # Delta pruning: if we're too far behind even with a queen capture, prune
+            BIG_DELTA = 975  # Queen value + margin
+            if tt_eval is not None:
+                stand_pat = tt_eval
+                self.tt_eval_hits += 1
+            else:
+                stand_pat = self.static_eval(board, alpha - BIG_DELTA, beta, QSEARCH_EVAL_TIER)
+            if stand_pat >= beta:
+                return beta
+            if stand_pat < alpha - BIG_DELTA:
+                return alpha
+            if alpha < stand_pat:
+                alpha = stand_pat
+            # Queen promotions are the only non-captures worth resolving here
+            moves = itertools.chain(
+                board.generate_legal_captures(),
+                (move for move in board.generate_legal_moves(board.pawns, chess.BB_BACKRANKS & ~board.occupied)
+                 if move.promotion == chess.QUEEN))
+
+        # Hash move first, then captures and promotions by MVV/LVA, then (evasions only) quiet moves
+        ordered = []
+        for move in moves:
+            attacker = board.piece_type_at(move.from_square)
+            victim = board.piece_type_at(move.to_square)
+            if victim is None:
+                if attacker == chess.PAWN and move.to_square == board.ep_square:
+                    victim = chess.PAWN
+                elif move.promotion:
+                    victim = 0
+            if move == tt_move:
+                order = INFINITE
+            elif victim is not None:
+                order = MVV_LVA[victim][attacker]
+            else:
+                order = -INFINITE
+            ordered.append((order, move, attacker, victim))
+        if in_check and not ordered:
+            return -MATE + ply
+        ordered.sort(key=lambda item: item[0], reverse=True)
+
+        best_move = None
+        for _, move, attacker, victim in ordered:
+            if stand_pat is not None and victim is not None:
+                # Per-capture delta pruning: winning the victim can't lift us to alpha
+                if (DELTA_MARGIN is not None and not move.promotion
+                        and stand_pat + SEE_VALUES[victim] + DELTA_MARGIN <= alpha):
+                    self.delta_prunes += 1
+                    continue
+                if QSEARCH_SEE_PRUNING and not is_good_capture(board, move, attacker, victim, self.move_stats):
+                    self.see_prunes += 1
+                    continue
+            board.push(move)
+            score = -self.quiescence(board, -beta, -alpha, depth + 1)
+            board.pop()
+            if score >= beta:
+                self.tt.store(key, DEPTH_QS, score_to_tt(beta, ply), BOUND_LOWER, move)
+                return beta
+            if score > alpha:
+                alpha = score
+                best_move = move
+        self.tt.store(key, DEPTH_QS, score_to_tt(alpha, ply),
+                      BOUND_EXACT if alpha > alpha_orig else BOUND_UPPER, best_move)
+        return alpha
+
+    def pvs_search(self, board: chess.Board, depth: int, alpha: int, beta: int, null_move_allowed=True):
+        """Principal Variation Search with null move pruning and check extensions.
+
+        Expects an EvalBoard so the Zobrist key and material/PST sums are kept
+        incrementally and repetitions are found on its key stack.
+        """
+        self.time_manager.tick()
+        ply = len(board.move_stack) - self.root_ply
         
-        # Late move pruning: at low depth, prune moves late in the list
-        if not in_check and depth <= 3 and i >= (LATE_MOVE_PRUNING_BASE + depth * depth):
-            if not board.is_capture(move) and not move.promotion:
-                continue
+        # Mate distance pruning: nothing here can beat a shorter mate already found
+        if ply > 0:
+            alpha = max(alpha, -MATE + ply)
+            beta = min(beta, MATE - ply - 1)
+            if alpha >= beta:
+                return alpha, None
         
-        board.push(move)
+        key = board.zobrist_key
+        alpha_orig = alpha
         
-        if i == 0:
-            # Full window search for first move (PV)
-            score, _ = pvs_search(board, depth - 1, -beta, -alpha, new_history, True)
-            score = -score
-        else:
-            # Late Move Reduction (LMR): reduce depth for later moves
-            reduction = 0
-            if depth >= 3 and i >= LMR_THRESHOLD and not board.is_capture(move) and not move.promotion and not in_check:
-                reduction = LMR_REDUCTION_1
-                if i >= LMR_THRESHOLD_DEEP:
-                    reduction = LMR_REDUCTION_2
+        # Check transposition table
+        tt_move = None
+        tt_eval = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_depth, tt_score, tt_bound, tt_move, tt_eval = entry
+            tt_score = score_from_tt(tt_score, ply)
+            if tt_depth >= depth:
+                if tt_bound == BOUND_EXACT:
+                    return tt_score, tt_move
+                if tt_bound == BOUND_LOWER and tt_score >= beta:
+                    return tt_score, tt_move
+                if tt_bound == BOUND_UPPER and tt_score <= alpha:
+                    return tt_score, tt_move
+        
+        # Check for draw by repetition
+        if board.is_repetition_draw():
+            return 0, None
+        
+        # Endgame tables settle the position outright
+        if ply > 0 and chess.popcount(board.occupied) <= TB_MAX_PIECES:
+            probe = self.tablebases.probe(board)
+            if probe is not None:
+                return tablebase_score(probe[0], probe[1], ply), None
+        
+        # Terminal nodes
+        if board.is_game_over():
+            score = self.static_eval(board)
+            self.tt.store(key, depth, score_to_tt(score, ply), BOUND_EXACT)
+            return score, None
+        
+        # Check extension: extend search if in check
+        in_check = board.is_check()
+        if in_check:
+            depth += 1
+        
+        if depth == 0:
+            score = self.quiescence(board, alpha, beta)
+            if score <= alpha:
+                bound = BOUND_UPPER
+            elif score >= beta:
+                bound = BOUND_LOWER
+            else:
+                bound = BOUND_EXACT
+            self.tt.store(key, 0, score_to_tt(score, ply), bound)
+            return score, None
+        
+        # Null move pruning: if we can afford to pass, position is too good
+        if null_move_allowed and depth >= 3 and not in_check:
+            # Don't do null move if we're in zugzwang-prone endgame (only pawns+king)
+            has_pieces = any(board.piece_at(sq) and board.piece_at(sq).piece_type not in [chess.PAWN, chess.KING] 
+                            and board.piece_at(sq).color == board.turn for sq in chess.SQUARES)
+            if has_pieces:
+                board.push(chess.Move.null())
+                null_score, _ = self.pvs_search(board, depth - NULL_MOVE_R, -beta, -beta + 1, False)
+                null_score = -null_score
+                board.pop()
+                if null_score >= beta:
+                    return beta, None  # Beta cutoff
+        
+        # Static eval for razoring and futility: from the TT entry when it has one
+        eval_score = None
+        if not in_check and depth <= 3:
+            if tt_eval is not None:
+                eval_score = tt_eval
+                self.tt_eval_hits += 1
+            else:
+                eval_score = self.static_eval(board)
+        
+        # Razoring: if position is hopeless and depth is low, reduce search
+        if eval_score is not None:
+            razor_margin = RAZOR_MARGIN_MULT * depth
+            if eval_score + razor_margin < alpha:
+                # Try quiescence to see if we can improve
+                q_score = self.quiescence(board, alpha - razor_margin, alpha - razor_margin + 1)
+                if q_score + razor_margin <= alpha:
+                    return q_score, None
+        
+        # Futility pruning: at low depth, if we're far behind, skip quiet moves
+        futility_pruning = False
+        futility_margin = 0
+        if eval_score is not None:
+            futility_margin = FUTILITY_MARGIN_MULT * depth
+            if eval_score + futility_margin <= alpha:
+                futility_pruning = True
+        
+        # Staged move ordering: hash move, captures, killers, then quiets on demand
+        picker = MovePicker(board, tt_move, self.killer_moves.get(depth, ()), self.history_moves, self.move_stats)
+        
+        best_move = None
+        best_score = -INFINITE
+        
+        # Principal Variation Search
+        for i, (move, tactical) in enumerate(picker):
+            # Futility pruning: skip quiet moves if position is hopeless
+            if futility_pruning and i > 0 and not tactical:
+                continue
             
-            # Null window search for remaining moves
-            score, _ = pvs_search(board, depth - 1 - reduction, -alpha - 1, -alpha, new_history, True)
-            score = -score
+            # Late move pruning: at low depth, prune moves late in the list
+            if not in_check and depth <= 3 and i >= (LATE_MOVE_PRUNING_BASE + depth * depth):
+                if not tactical:
+                    continue
             
-            # If it fails high, re-search with full window
-            if alpha < score < beta:
-                score, _ = pvs_search(board, depth - 1, -beta, -alpha, new_history, True)
+            board.push(move)
+            
+            if i == 0:
+                # Full window search for first move (PV)
+                score, _ = self.pvs_search(board, depth - 1, -beta, -alpha)
+                score = -score
+            else:
+                # Late Move Reduction (LMR): reduce depth for later moves
+                reduction = 0
+                if depth >= 3 and i >= LMR_THRESHOLD and not tactical and not in_check:
+                    reduction = LMR_REDUCTION_1
+                    if i >= LMR_THRESHOLD_DEEP:
+                        reduction = LMR_REDUCTION_2
+                
+                # Null window search for remaining moves
+                score, _ = self.pvs_search(board, depth - 1 - reduction, -alpha - 1, -alpha)
                 score = -score
+                
+                # If it fails high, re-search with full window
+                if alpha < score < beta:
+                    score, _ = self.pvs_search(board, depth - 1, -beta, -alpha)
+                    score = -score
+            
+            board.pop()
+            
+            if score > best_score:
+                best_score = score
+                best_move = move
+            
+            if score > alpha:
+                alpha = score
+            
+            if alpha >= beta:
+                # Beta cutoff - update killer and history
+                picker.record_cutoff()
+                if not tactical:
+                    if depth not in self.killer_moves:
+                        self.killer_moves[depth] = []
+                    if move not in self.killer_moves[depth]:
+                        self.killer_moves[depth].insert(0, move)
+                        if len(self.killer_moves[depth]) > 2:
+                            self.killer_moves[depth] = self.killer_moves[depth][:2]
+                
+                move_key = (move.from_square, move.to_square)
+                self.history_moves[move_key] = self.history_moves.get(move_key, 0) + depth * depth
+                break
         
-        board.pop()
+        if best_move is None:
+            # No legal moves (game over is handled above, so this is only a safeguard)
+            return self.static_eval(board), None
         
-        if score > best_score:
-            best_score = score
-            best_move = move
+        if best_score <= alpha_orig:
+            bound = BOUND_UPPER
+        elif best_score >= beta:
+            bound = BOUND_LOWER
+        else:
+            bound = BOUND_EXACT
+        self.tt.store(key, depth, score_to_tt(best_score, ply), bound, best_move, eval_score)
+        return best_score, best_move
+
+    def iterative_deepening(self, board: chess.Board, limits: SearchLimits,
+                            start_depth: int = 1, on_iteration=None):
+        """Iterative deepening with aspiration windows under the given limits.
+
+        Returns (best_move, score, depth) of the last completed iteration. on_iteration,
+        if given, is called as on_iteration(depth, score, move) after every completed one.
+        """
+        self.time_manager = TimeManager(limits, board.turn)
+        self.age_heuristics()
+        self.reset_eval_stats()
+        self.reset_qsearch_stats()
         
-        if score > alpha:
-            alpha = score
+        best_move = None
+        prev_score = 0
+        completed_depth = 0
+        root_ply = len(board.move_stack)
+        self.root_ply = root_ply
         
-        if alpha >= beta:
-            # Beta cutoff - update killer and history
-            if not board.is_capture(move):
-                if depth not in killer_moves:
-                    killer_moves[depth] = []
-                if move not in killer_moves[depth]:
-                    killer_moves[depth].insert(0, move)
-                    if len(killer_moves[depth]) > 2:
-                        killer_moves[depth] = killer_moves[depth][:2]
+        d = start_depth
+        while d == start_depth or self.time_manager.should_start_iteration(d):
+            try:
+                if d == start_depth:
+                    # First iteration: full window
+                    score, move = self.pvs_search(board, d, -INFINITE, INFINITE)
+                else:
+                    # Aspiration window: narrow search around previous score
+                    alpha = prev_score - ASPIRATION_WINDOW
+                    beta = prev_score + ASPIRATION_WINDOW
+                    
+                    score, move = self.pvs_search(board, d, alpha, beta)
+                    
+                    # If we fall outside window, re-search with wider window
+                    if score <= alpha or score >= beta:
+                        score, move = self.pvs_search(board, d, -INFINITE, INFINITE)
+            except SearchAborted:
+                # Out of time mid-iteration: unwind to the root and keep the move from the last completed one
+                while len(board.move_stack) > root_ply:
+                    board.pop()
+                break
+            
+            if move is not None:
+                best_move = move
+                prev_score = score
+            completed_depth = d
+            if on_iteration is not None:
+                on_iteration(d, score, move)
             
-            move_key = (move.from_square, move.to_square)
-            history_moves[move_key] = history_moves.get(move_key, 0) + depth * depth
+            # If mate found, stop searching
+            if abs(score) >= MATE_BOUND:
+                break
+            d += 1
+        
+        return best_move, prev_score, completed_depth
+
+
+main_worker = SearchWorker(transposition_table)
+search_pool = None  # Set by smp.LazySMP to spread the search over helper workers
+last_search_stats = {}  # Transposition table, pawn hash and eval counters of the last choose_move search
+
+
+def new_game():
+    """Start a new game: wipe the transposition table, killers and history.
+
+    Between moves of one game everything is kept; the table ages its entries instead.
+    """
+    transposition_table.clear()
+    pawn_hash.clear()
+    main_worker.new_game()
+    if search_pool is not None:
+        search_pool.new_game()
+
+
+def set_transposition_table(tt: TranspositionTable):
+    """Swap the table used by choose_move (e.g. for a shared-memory one)."""
+    global transposition_table
+    transposition_table = tt
+    main_worker.tt = tt
+
+
+def quiescence(board: chess.Board, alpha: int, beta: int, depth: int = 0) -> int:
+    """Quiescence search on the main worker."""
+    return main_worker.quiescence(board, alpha, beta, depth)
+
+
+def pvs_search(board: chess.Board, depth: int, alpha: int, beta: int, null_move_allowed=True):
+    """Principal Variation Search on the main worker (board must be an EvalBoard)."""
+    return main_worker.pvs_search(board, depth, alpha, beta, null_move_allowed)
+
+
+def principal_variation(board: chess.Board, max_length: int = MAX_PV_LENGTH, tt: TranspositionTable = None) -> list:
+    """Follow the best moves stored in the transposition table from this position."""
+    tt = tt or transposition_table
+    walk_board = SearchBoard(board.fen())
+    pv = []
+    seen = set()
+    while len(pv) < max_length and walk_board.zobrist_key not in seen:
+        seen.add(walk_board.zobrist_key)
+        entry = tt.probe(walk_board.zobrist_key)
+        if entry is None or entry[3] is None or not walk_board.is_legal(entry[3]):
             break
+        pv.append(entry[3])
+        walk_board.push(entry[3])
+    return pv
+
+
+def choose_move(board: chess.Board, depth: int = 5, limits: SearchLimits = None, on_iteration=None) -> chess.Move:
+    """Iterative deepening with aspiration windows.
+
+    With only a depth this searches to that fixed depth. Pass SearchLimits to
+    search by time, clock, node budget or until an external stop event; the
+    move from the last completed iteration is returned. on_iteration is passed
+    on to SearchWorker.iterative_deepening (book and table moves call nothing).
+    """
+    if limits is None:
+        limits = SearchLimits(depth=depth)
     
-    transposition_table[key] = (depth, best_score, None)
-    return best_score, best_move
-
-# def choose_move(board: chess.Board, depth: int = 3) -> chess.Move:
-#     """Iterative deepening search with aspiration windows and opening book."""
-#     # Check opening book
-#     fen = board.fen()
-#     if fen in opening_book:
-#         return chess.Move.from_uci(opening_book[fen])
-    
-#     best_move = None
-#     prev_score = 0
-#     for d in range(1, depth + 1):
-#         alpha = prev_score - 50
-#         beta = prev_score + 50
-#         while True:
-#             score, move = minimax(board, d, alpha, beta, board.turn)
-#             if alpha < score < beta:
-#                 best_move = move
-#                 prev_score = score
-#                 break
-#             elif score <= alpha:
-#                 alpha = score - 50
-#             else:
-#                 beta = score + 50
-#     return best_move
-
-def choose_move(board: chess.Board, depth: int = 5) -> chess.Move:
-    """Iterative deepening with aspiration windows."""
-    global killer_moves, transposition_table
-    
-    # Clear old killer moves periodically
-    if len(killer_moves) > 100:
-        killer_moves.clear()
+    global last_search_stats
     
-    # Clear transposition table periodically
-    if len(transposition_table) > 100000:
-        transposition_table.clear()
+    # Age the transposition table instead of wiping it
+    transposition_table.new_search()
+    transposition_table.reset_stats()
+    pawn_hash.reset_stats()
+    tablebases.reset_stats()
+    opening_book.reset_stats()
+    movepick.reset_stats()
+    last_search_stats = {}
     
     # Check opening book
-    fen = board.fen()
-    if fen in opening_book:
-        return chess.Move.from_uci(opening_book[fen])
+    book_move = opening_book.choose(board)
+    if book_move is not None:
+        return book_move
     
-    # Build position history
-    position_history = []
-    temp_board = chess.Board()
-    for move in board.move_stack:
-        position_history.append(temp_board.fen().split(' ')[0])
-        temp_board.push(move)
+    # Endgame tables: play the fastest mate (or the best defence) without searching
+    if chess.popcount(board.occupied) <= TB_MAX_PIECES:
+        root = tablebases.root_move(board)
+        if root is not None:
+            return root[0]
     
-    best_move = None
-    prev_score = 0
+    # Search on a board that hashes and evaluates incrementally, seeded with the game since the last irreversible move
+    board = EvalBoard.from_game(board)
     
-    # Iterative deepening with aspiration windows
-    for d in range(1, depth + 1):
-        if d == 1:
-            # First iteration: full window
-            score, move = pvs_search(board, d, -math.inf, math.inf, position_history)
-        else:
-            # Aspiration window: narrow search around previous score
-            alpha = prev_score - ASPIRATION_WINDOW
-            beta = prev_score + ASPIRATION_WINDOW
-            
-            score, move = pvs_search(board, d, alpha, beta, position_history)
-            
-            # If we fall outside window, re-search with wider window
-            if score <= alpha or score >= beta:
-                score, move = pvs_search(board, d, -math.inf, math.inf, position_history)
-        
-        if move is not None:
-            best_move = move
-            prev_score = score
-        
-        # If mate found, stop searching
-        if abs(score) >= 50000:
-            break
+    if search_pool is not None:
+        best_move = search_pool.search(board, limits, on_iteration)
+    else:
+        best_move, _, _ = main_worker.iterative_deepening(board, limits, on_iteration=on_iteration)
+    
+    if best_move is None:
+        # Stopped before the first iteration finished: fall back to the best-ordered move
+        entry = transposition_table.probe(board.zobrist_key)
+        tt_move = entry[3] if entry is not None else None
+        best_move = next((move for move, _ in MovePicker(board, tt_move)), None)
     
+    last_search_stats = transposition_table.stats()
+    last_search_stats['pawn_hash'] = pawn_hash.stats()
+    last_search_stats['evals'] = main_worker.eval_stats()
+    last_search_stats['qsearch'] = main_worker.qsearch_stats()
+    last_search_stats['tablebase'] = tablebases.stats()
     return best_move
-
@@ -0,0 +1,535 @@
+import argparse
+import random
+import time
+
+import chess
+import numpy as np
+
+import engine
+from attacks import KING_ZONES, MOBILITY_EXCLUDE_PAWN_ATTACKS
+from endgame import ENDGAMES, MATERIAL_DELTAS
+from pawns import FILE_MASKS
+
+# Column order of features_batch: WEIGHTS terms as evaluate applies them (White minus Black)
+BATCH_FEATURES = (
+    'bishop_pair', 'mobility', 'center_control', 'development', 'castling',
+    'isolated_pawn', 'doubled_pawn', 'passed_pawn', 'backward_pawn',
+    'rook_open_file', 'rook_7th', 'rook_connected', 'pawn_shield',
+    'king_open_file', 'king_attack', 'tempo', 'contempt',
+)
+
+SIDES = (chess.BLACK, chess.WHITE)  # Per-color lists are indexed by color, as in python-chess
+BATCH_CHUNK = 1 << 14  # Boards per vectorized pass (bounds temporary memory)
+ENDGAME_KEYS = np.array(sorted(ENDGAMES), dtype=np.int64)
+
+U64 = np.uint64
+ALL = U64(chess.BB_ALL)
+NOT_FILE_A = U64(chess.BB_ALL & ~chess.BB_FILE_A)
+NOT_FILE_H = U64(chess.BB_ALL & ~chess.BB_FILE_H)
+NOT_FILE_AB = U64(chess.BB_ALL & ~chess.BB_FILE_A & ~chess.BB_FILE_B)
+NOT_FILE_GH = U64(chess.BB_ALL & ~chess.BB_FILE_G & ~chess.BB_FILE_H)
+
+# (shift, mask) per step: positive shifts go towards h8
+ORTHOGONAL = ((8, ALL), (-8, ALL), (1, NOT_FILE_A), (-1, NOT_FILE_H))
+DIAGONAL = ((9, NOT_FILE_A), (7, NOT_FILE_H), (-7, NOT_FILE_A), (-9, NOT_FILE_H))
+KNIGHT_STEPS = ((17, NOT_FILE_A), (15, NOT_FILE_H), (10, NOT_FILE_AB), (6, NOT_FILE_GH),
+                (-6, NOT_FILE_AB), (-10, NOT_FILE_GH), (-15, NOT_FILE_A), (-17, NOT_FILE_H))
+KING_STEPS = ORTHOGONAL + DIAGONAL
+
+KING_ZONE_TABLE = np.array(KING_ZONES, dtype=U64)
+KING_ATTACK_TABLE = np.array(chess.BB_KING_ATTACKS, dtype=U64)
+ORTHOGONAL_LINES = np.array([chess.BB_RANK_ATTACKS[sq][0] | chess.BB_FILE_ATTACKS[sq][0] for sq in chess.SQUARES],
+                            dtype=U64)
+DIAGONAL_LINES = np.array([chess.BB_DIAG_ATTACKS[sq][0] for sq in chess.SQUARES], dtype=U64)
+FILE_TABLE = np.array([FILE_MASKS[sq & 7] for sq in chess.SQUARES], dtype=U64)
+
+
+def _shelter_table(color: chess.Color):
+    """Per king square: the shield squares and the (up to three) files king_shelter looks at."""
+    shield = [0] * 64
+    files = [0] * 64
+    for sq in chess.SQUARES:
+        file, rank = sq & 7, sq >> 3
+        near = FILE_MASKS[file] | (FILE_MASKS[file - 1] if file > 0 else 0) | (FILE_MASKS[file + 1] if file < 7 else 0)
+        files[sq] = near & chess.BB_RANK_1
+        if color == chess.WHITE and rank >= 1:
+            shield[sq] = near & chess.BB_RANKS[rank - 1]
+        elif color == chess.BLACK and rank <= 6:
+            shield[sq] = near & chess.BB_RANKS[rank + 1]
+    return np.array(shield, dtype=U64), np.array(files, dtype=U64)
+
+
+SHELTER_TABLES = [_shelter_table(color) for color in SIDES]
+
+PLANE_ORDER = [(piece_type, color) for piece_type in chess.PIECE_TYPES for color in (chess.WHITE, chess.BLACK)]
+
+
+def _byte_table(scores):
+    """Material + PST sums per (plane byte, byte value): 12 piece planes of 8 bytes each."""
+    table = np.zeros((12 * 8, 256), dtype=np.int64)
+    for plane, (piece_type, color) in enumerate(PLANE_ORDER):
+        values = scores[color][piece_type]
+        for byte in range(8):
+            for bits in range(256):
+                table[plane * 8 + byte, bits] = sum(values[byte * 8 + bit] for bit in range(8) if bits >> bit & 1)
+    return table
+
+
+PLANE_BYTES = np.arange(12 * 8)
+MG_BYTES = _byte_table(engine.MG_SCORES)
+EG_BYTES = _byte_table(engine.EG_SCORES)
+
+
+def _shift(bb, step: int):
+    return bb << U64(step) if step > 0 else bb >> U64(-step)
+
+
+def _ray_attacks(sliders, empty, step: int, mask):
+    """Kogge-Stone occluded fill: squares the sliders reach in one direction, first blocker included.
+
+    Rays of different sliders in one direction never overlap (a slider blocks
+    the ray behind it), so popcounts of the union equal per-piece sums.
+    """
+    empty = empty & mask
+    sliders = sliders | (empty & _shift(sliders, step))
+    empty = empty & _shift(empty, step)
+    sliders = sliders | (empty & _shift(sliders, 2 * step))
+    empty = empty & _shift(empty, 2 * step)
+    sliders = sliders | (empty & _shift(sliders, 4 * step))
+    return _shift(sliders, step) & mask
+
+
+def _north_fill(bb):
+    bb = bb | (bb << U64(8))
+    bb = bb | (bb << U64(16))
+    return bb | (bb << U64(32))
+
+
+def _south_fill(bb):
+    bb = bb | (bb >> U64(8))
+    bb = bb | (bb >> U64(16))
+    return bb | (bb >> U64(32))
+
+
+def _sideways(bb):
+    return ((bb << U64(1)) & NOT_FILE_A) | ((bb >> U64(1)) & NOT_FILE_H)
+
+
+def _popcount(bb):
+    return np.bitwise_count(bb).astype(np.int64)
+
+
+def _square(bb):
+    """Index of the single set bit (0 for an empty mask)."""
+    return np.where(bb != 0, _popcount(bb - U64(1)), 0)
+
+
+def _pawn_attacks(pawns, color: chess.Color):
+    if color == chess.WHITE:
+        return (pawns << U64(7)) & NOT_FILE_H, (pawns << U64(9)) & NOT_FILE_A
+    return (pawns >> U64(9)) & NOT_FILE_H, (pawns >> U64(7)) & NOT_FILE_A
+
+
+def _attack_sets(pieces, occupied, color: chess.Color):
+    """Attack sets of one side, each contributing at most one attack per piece per square."""
+    pawns, knights, bishops, rooks, queens, kings = (pieces[piece_type][color] for piece_type in chess.PIECE_TYPES)
+    empty = ~occupied
+    sets = list(_pawn_attacks(pawns, color))
+    mobile = [_shift(knights, step) & mask for step, mask in KNIGHT_STEPS]
+    mobile += [_ray_attacks(bishops | queens, empty, step, mask) for step, mask in DIAGONAL]
+    mobile += [_ray_attacks(rooks | queens, empty, step, mask) for step, mask in ORTHOGONAL]
+    king = [_shift(kings, step) & mask for step, mask in KING_STEPS]
+    return sets, mobile, king
+
+
+def _union(sets):
+    result = sets[0]
+    for bb in sets[1:]:
+        result = result | bb
+    return result
+
+
+def _count_in(sets, mask):
+    """Sum of popcount(bb & mask) over the sets."""
+    return np.bitwise_count(np.stack(sets) & mask).sum(axis=0, dtype=np.int64)
+
+
+def _to_arrays(boards):
+    """Stack boards into an (N, 12) array: six piece-type bitboards, White and Black
+    occupancy, castling rights, then turn, move-stack and Chess960 flags."""
+    rows = [(b.pawns, b.knights, b.bishops, b.rooks, b.queens, b.kings, b.occupied_co[chess.WHITE],
+             b.occupied_co[chess.BLACK], b.castling_rights, b.turn, bool(b._stack), b.chess960) for b in boards]
+    return np.array(rows, dtype=U64).reshape(len(boards), 12)
+
+
+def _castling(castling_rights, has_stack, rooks, kings, white, black):
+    """has_castling_rights for both colors, cleaning the rights the way python-chess does for a fresh board."""
+    castling = castling_rights & rooks
+    white_castling = castling & U64(chess.BB_RANK_1) & white & U64(chess.BB_A1 | chess.BB_H1)
+    black_castling = castling & U64(chess.BB_RANK_8) & black & U64(chess.BB_A8 | chess.BB_H8)
+    white_castling = np.where((white & kings & U64(chess.BB_E1)) != 0, white_castling, U64(0))
+    black_castling = np.where((black & kings & U64(chess.BB_E8)) != 0, black_castling, U64(0))
+    rights = np.where(has_stack, castling_rights, white_castling | black_castling)
+    return (rights & U64(chess.BB_RANK_1)) != 0, (rights & U64(chess.BB_RANK_8)) != 0
+
+
+def _pawn_terms(own, enemy, all_pawns, king, color: chess.Color):
+    """pawn_king_terms for one side: counts, passed bitboard, shield and open files near the king."""
+    adjacent = _sideways(_north_fill(own) | _south_fill(own))
+    isolated_bb = own & ~adjacent
+    doubled = _popcount(own & ((_north_fill(own) << U64(8)) | (_south_fill(own) >> U64(8))))
+    west, east = _pawn_attacks(enemy, not color)
+    if color == chess.WHITE:
+        supported = _north_fill(_sideways(own) << U64(8))
+        stop_attacked = (west | east) >> U64(8)
+        blocked = _south_fill((enemy | _sideways(enemy)) >> U64(8))
+        advancement = sum(_popcount(own & ~blocked & U64(chess.BB_ALL << (8 * rank) & chess.BB_ALL))
+                          for rank in range(1, 8))
+    else:
+        supported = _south_fill(_sideways(own) >> U64(8))
+        stop_attacked = (west | east) << U64(8)
+        blocked = _north_fill((enemy | _sideways(enemy)) << U64(8))
+        advancement = sum(_popcount(own & ~blocked & U64(chess.BB_ALL >> (8 * rank)))
+                          for rank in range(1, 8))
+    backward = _popcount(own & ~isolated_bb & ~supported & stop_attacked)
+    passed = own & ~blocked
+
+    king_sq = _square(king)
+    shield_table, files_table = SHELTER_TABLES[color]
+    shield = _popcount(own & shield_table[king_sq])
+    pawn_files = _south_fill(all_pawns) & U64(chess.BB_RANK_1)
+    open_files = _popcount(files_table[king_sq] & ~pawn_files)
+    return _popcount(isolated_bb), doubled, backward, passed, advancement, shield, open_files
+
+
+def _batch_terms(boards):
+    """Everything evaluate computes, for a list of boards, as arrays.
+
+    Boards evaluate can't handle vectorized (Chess960, not exactly one king per
+    side, material with an entry in endgame.ENDGAMES) are marked in 'scalar';
+    callers evaluate those one by one.
+    """
+    n = len(boards)
+    bitboards = _to_arrays(boards)
+    turn, has_stack = bitboards[:, 9] != 0, bitboards[:, 10] != 0
+    occ = [bitboards[:, 7], bitboards[:, 6]]
+    occupied = occ[0] | occ[1]
+    pieces = {piece_type: [bitboards[:, piece_type - 1] & occ[color] for color in SIDES]
+              for piece_type in chess.PIECE_TYPES}
+    counts = [_popcount(occ[color]) for color in SIDES]
+    kings = pieces[chess.KING]
+    scalar = (_popcount(kings[chess.WHITE]) != 1) | (_popcount(kings[chess.BLACK]) != 1)
+    scalar |= bitboards[:, 11] != 0
+    material = sum(_popcount(pieces[piece_type][color]).astype(np.int64) * MATERIAL_DELTAS[color][piece_type]
+                   for piece_type in (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN)
+                   for color in chess.COLORS)
+    scalar |= np.isin(material, ENDGAME_KEYS)
+    kings_sq = [_square(kings[color]) for color in SIDES]
+    valid_king = [kings_sq[color] != 0 for color in SIDES]  # evaluate skips a king on a1
+    t = {'turn': turn, 'scalar': scalar}
+
+    # Material + PST from piece planes
+    planes = np.stack([pieces[piece_type][color] for piece_type, color in PLANE_ORDER], axis=1)
+    plane_bytes = planes.view(np.uint8).reshape(n, 12 * 8)
+    mg = MG_BYTES[PLANE_BYTES, plane_bytes].sum(axis=1)
+    eg = EG_BYTES[PLANE_BYTES, plane_bytes].sum(axis=1)
+    phase_count = sum(_popcount(bitboards[:, piece_type - 1]) * engine.PHASE_WEIGHTS[piece_type]
+                      for piece_type in chess.PIECE_TYPES)
+    phase = np.minimum(phase_count, engine.TOTAL_PHASE)
+    t['tapered'] = (mg * phase + eg * (engine.TOTAL_PHASE - phase)) // engine.TOTAL_PHASE
+    t['in_endgame'] = phase / engine.TOTAL_PHASE < 0.4
+    t['is_endgame'] = _popcount(occupied) - 2 <= 8
+
+    # Attack sets: (pawn, mobile pieces, king) per color
+    attacks = [_attack_sets(pieces, occupied, color) for color in SIDES]
+
+    # Terminal positions. A legal move exists if the king can step to a square the opponent
+    # doesn't attack (seen through the king), or, out of check with no enemy slider on the
+    # king's lines (so no pins), if any other piece has a pseudo-legal move. The few boards
+    # left are checked with python-chess.
+    own_occ = np.where(turn, occ[chess.WHITE], occ[chess.BLACK])
+    enemy_occ = np.where(turn, occ[chess.BLACK], occ[chess.WHITE])
+    own_king = np.where(turn, kings[chess.WHITE], kings[chess.BLACK])
+    own_king_sq = np.where(turn, kings_sq[chess.WHITE], kings_sq[chess.BLACK])
+    attacked = [_union(attacks[color][0] + attacks[color][1] + attacks[color][2]) for color in SIDES]
+    in_check = (own_king & np.where(turn, attacked[chess.BLACK], attacked[chess.WHITE])) != 0
+    xray = []
+    for color in SIDES:
+        sets, mobile, king = _attack_sets(pieces, occupied & ~own_king, color)
+        xray.append(_union(sets + mobile + king))
+    danger = np.where(turn, xray[chess.BLACK], xray[chess.WHITE])
+    has_move = (KING_ATTACK_TABLE[own_king_sq] & ~own_occ & ~danger) != 0
+
+    queens = bitboards[:, 4] & enemy_occ
+    pinners = (((bitboards[:, 3] & enemy_occ) | queens) & ORTHOGONAL_LINES[own_king_sq]
+               | ((bitboards[:, 2] & enemy_occ) | queens) & DIAGONAL_LINES[own_king_sq])
+    own_pawns = bitboards[:, 0] & own_occ
+    piece_moves = np.where(turn, _union(attacks[chess.WHITE][1]), _union(attacks[chess.BLACK][1])) & ~own_occ
+    pawn_moves = ((np.where(turn, own_pawns << U64(8), own_pawns >> U64(8)) & ~occupied)
+                  | (np.where(turn, _union(attacks[chess.WHITE][0]), _union(attacks[chess.BLACK][0])) & enemy_occ))
+    has_move |= ~in_check & (pinners == 0) & ((piece_moves | pawn_moves) != 0)
+    for i in np.flatnonzero(~has_move & ~scalar):
+        has_move[i] = any(boards[i].generate_legal_moves())
+    checkmate = in_check & ~has_move
+    stalemate = ~in_check & ~has_move
+    t['checkmate'] = checkmate
+
+    # Insufficient material, as python-chess decides it
+    insufficient = np.ones(n, dtype=bool)
+    all_pawns, knights, bishops = bitboards[:, 0], bitboards[:, 1], bitboards[:, 2]
+    heavy = all_pawns | bitboards[:, 3] | bitboards[:, 4]
+    same_color_bishops = ((bishops & U64(chess.BB_DARK_SQUARES)) == 0) | ((bishops & U64(chess.BB_LIGHT_SQUARES)) == 0)
+    for color in chess.COLORS:
+        own, other = occ[color], occ[not color]
+        side = np.where((own & knights) != 0,
+                        (counts[color] <= 2) & ((other & ~bitboards[:, 5] & ~bitboards[:, 4]) == 0),
+                        np.where((own & bishops) != 0, same_color_bishops & (all_pawns == 0) & (knights == 0), True))
+        insufficient &= ((own & heavy) == 0) & side
+    t['draw'] = ~checkmate & (stalemate | insufficient)
+
+    # Cheap terms
+    t['bishop_pair'] = [_popcount(pieces[chess.BISHOP][color]) >= 2 for color in chess.COLORS]
+    t['castling'] = _castling(bitboards[:, 8], has_stack, bitboards[:, 3], bitboards[:, 5],
+                              occ[chess.WHITE], occ[chess.BLACK])
+    t['pawns'] = [_pawn_terms(pieces[chess.PAWN][color], pieces[chess.PAWN][not color], all_pawns,
+                              kings[color], color) for color in SIDES]
+    t['valid_king'] = valid_king
+    wk, bk = kings_sq[chess.WHITE], kings_sq[chess.BLACK]
+    t['king_center'] = ((np.abs((bk & 7) - 3.5) + np.abs((bk >> 3) - 3.5))
+                        - (np.abs((wk & 7) - 3.5) + np.abs((wk >> 3) - 3.5))) * 20
+
+    # Square-by-square terms, in the order evaluate adds them
+    t['center'] = [((occ[chess.WHITE] >> U64(sq)) & U64(1) != 0, (occ[chess.BLACK] >> U64(sq)) & U64(1) != 0)
+                   for sq in (chess.D4, chess.E4, chess.D5, chess.E5)]
+    t['development'] = [((pieces[piece_type][color] >> U64(sq)) & U64(1) != 0, color)
+                        for color, squares in ((chess.WHITE, ((chess.KNIGHT, chess.B1), (chess.KNIGHT, chess.G1),
+                                                              (chess.BISHOP, chess.C1), (chess.BISHOP, chess.F1))),
+                                               (chess.BLACK, ((chess.KNIGHT, chess.B8), (chess.KNIGHT, chess.G8),
+                                                              (chess.BISHOP, chess.C8), (chess.BISHOP, chess.F8))))
+                        for piece_type, sq in squares]
+
+    # Rooks in scan order: (open file, 7th rank, connected to each later rook) per rook
+    pawn_files = _north_fill(_south_fill(all_pawns))
+    t['rooks'] = []
+    for color in SIDES:
+        remaining = pieces[chess.ROOK][color]
+        rooks = []
+        while np.any(remaining):
+            lowest = remaining & -remaining
+            remaining = remaining ^ lowest
+            square = _square(lowest)
+            rooks.append((lowest != 0, square))
+        seventh = 6 if color == chess.WHITE else 1
+        steps = []
+        for i, (present, square) in enumerate(rooks):
+            open_file = present & ((FILE_TABLE[square] & pawn_files) == 0)
+            connected = [present & other_present & (((square & 7) == (other & 7)) | ((square >> 3) == (other >> 3)))
+                         for other_present, other in rooks[i + 1:]]
+            steps.append((open_file, present & ((square >> 3) == seventh), connected))
+        t['rooks'].append(steps)
+
+    # Attack-map terms
+    area = [~occ[color] for color in SIDES]
+    if MOBILITY_EXCLUDE_PAWN_ATTACKS:
+        area = [area[color] & ~_union(attacks[not color][0]) for color in SIDES]
+    t['mobility'] = (_count_in(attacks[chess.WHITE][1], area[chess.WHITE])
+                     - _count_in(attacks[chess.BLACK][1], area[chess.BLACK]))
+    t['king_attack'] = []
+    for color in SIDES:
+        zone = KING_ZONE_TABLE[kings_sq[color]]
+        enemy = attacks[not color]
+        t['king_attack'].append(_count_in(enemy[0] + enemy[1] + enemy[2], zone))
+    return t
+
+
+def _weights(weights=None):
+    weights = {name: (engine.WEIGHTS if weights is None else weights)[name] for name in BATCH_FEATURES}
+    integral = all(float(value).is_integer() for value in weights.values())
+    return weights, integral
+
+
+def evaluate_batch(boards, weights: dict = None) -> np.ndarray:
+    """engine.evaluate for many boards at once; element i equals evaluate(boards[i]).
+
+    weights (WEIGHTS names to values) stands in for engine.WEIGHTS, as the tuners
+    pass the candidate they are scoring. Terms are added in evaluate's order so
+    float weights round the same way. The result is int64, or float64 when the
+    contempt weight isn't integral (evaluate returns it unrounded for draws).
+    """
+    boards = list(boards)
+    if not boards:
+        return np.zeros(0, dtype=np.int64)
+    if len(boards) > BATCH_CHUNK:
+        return np.concatenate([evaluate_batch(boards[i:i + BATCH_CHUNK], weights)
+                               for i in range(0, len(boards), BATCH_CHUNK)])
+    w, integral = _weights(weights)
+    t = _batch_terms(boards)
+    turn = t['turn']
+
+    score = t['tapered'].astype(np.float64)
+    white_bp, black_bp = t['bishop_pair']
+    score = np.where(white_bp, score + w['bishop_pair'], score)
+    score = np.where(black_bp, score - w['bishop_pair'], score)
+    white_castle, black_castle = t['castling']
+    score = np.where(white_castle, score + w['castling'], score)
+    score = np.where(black_castle, score - w['castling'], score)
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        isolated, doubled, backward, passed, advancement, shield, open_files = t['pawns'][color]
+        score = score - sign * (isolated * w['isolated_pawn'] + doubled * w['doubled_pawn']
+                                + backward * w['backward_pawn'])
+        score = score + sign * (_popcount(passed) * w['passed_pawn'] + advancement * 10)
+        valid = t['valid_king'][color]
+        score = np.where(valid, score + shield * w['pawn_shield'] * sign, score)
+        score = np.where(valid, score - open_files * w['king_open_file'] * sign, score)
+    score = score + np.where(turn, w['tempo'], -w['tempo'])
+    endgame = t['is_endgame']
+    both_kings = t['valid_king'][chess.WHITE] & t['valid_king'][chess.BLACK]
+    score = np.where(endgame & both_kings, score + t['king_center'], score)
+    white_adv, black_adv = t['pawns'][chess.WHITE][4], t['pawns'][chess.BLACK][4]
+    score = np.where(endgame, score + white_adv * 30, score)
+    score = np.where(endgame, score - black_adv * 30, score)
+
+    middlegame = ~t['in_endgame']
+    score = np.where(middlegame, score + w['mobility'] * t['mobility'], score)
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        hit = middlegame & t['valid_king'][color]
+        score = np.where(hit, score - w['king_attack'] * t['king_attack'][color] * sign, score)
+
+    for white_piece, black_piece in t['center']:
+        score = np.where(white_piece, score + w['center_control'], score)
+        score = np.where(black_piece, score - w['center_control'], score)
+    for on_start, color in t['development']:
+        sign = 1 if color == chess.WHITE else -1
+        score = np.where(on_start, score - w['development'] * sign, score)
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        for open_file, seventh, connected in t['rooks'][color]:
+            score = np.where(open_file, score + w['rook_open_file'] * sign, score)
+            score = np.where(seventh, score + w['rook_7th'] * sign, score)
+            for pair in connected:
+                score = np.where(pair, score + w['rook_connected'] * sign, score)
+
+    result = np.trunc(score)
+    contempt = np.where(turn, -w['contempt'], w['contempt'])
+    result = np.where(t['draw'], contempt, result)
+    result = np.where(t['checkmate'], np.where(turn, -engine.MATE, engine.MATE), result)
+    if integral or not np.any(t['draw']):
+        result = result.astype(np.int64)
+    scalar = np.flatnonzero(t['scalar'])
+    if len(scalar):
+        saved = engine.WEIGHTS
+        if weights is not None:
+            engine.WEIGHTS = weights
+        try:
+            for i in scalar:
+                result[i] = engine.evaluate(boards[i])
+        finally:
+            engine.WEIGHTS = saved
+    return result
+
+
+def features_batch(boards):
+    """Return (base, features): evaluate split into a weight-free part and raw term counts.
+
+    features has one column per BATCH_FEATURES name, signed White minus Black
+    and gated as evaluate gates them, so base + features @ weights reproduces
+    evaluate_batch for integral weights. Checkmates and specialised endings go
+    entirely into base; draws are a +-1 contempt count.
+    """
+    boards = list(boards)
+    n = len(boards)
+    if n > BATCH_CHUNK:
+        parts = [features_batch(boards[i:i + BATCH_CHUNK]) for i in range(0, n, BATCH_CHUNK)]
+        return np.concatenate([base for base, _ in parts]), np.concatenate([features for _, features in parts])
+    features = np.zeros((n, len(BATCH_FEATURES)), dtype=np.float64)
+    if not n:
+        return np.zeros(0, dtype=np.float64), features
+    column = {name: features[:, i] for i, name in enumerate(BATCH_FEATURES)}
+    t = _batch_terms(boards)
+
+    white_bp, black_bp = t['bishop_pair']
+    column['bishop_pair'] += white_bp.astype(int) - black_bp
+    white_castle, black_castle = t['castling']
+    column['castling'] += white_castle.astype(int) - black_castle
+    base = t['tapered'].astype(np.float64)
+    endgame = t['is_endgame']
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        isolated, doubled, backward, passed, advancement, shield, open_files = t['pawns'][color]
+        column['isolated_pawn'] -= sign * isolated
+        column['doubled_pawn'] -= sign * doubled
+        column['backward_pawn'] -= sign * backward
+        column['passed_pawn'] += sign * _popcount(passed)
+        base += sign * advancement * np.where(endgame, 40, 10)
+        valid = t['valid_king'][color]
+        column['pawn_shield'] += np.where(valid, sign * shield, 0)
+        column['king_open_file'] -= np.where(valid, sign * open_files, 0)
+    column['tempo'] += np.where(t['turn'], 1, -1)
+    both_kings = t['valid_king'][chess.WHITE] & t['valid_king'][chess.BLACK]
+    base += np.where(endgame & both_kings, t['king_center'], 0)
+    for white_piece, black_piece in t['center']:
+        column['center_control'] += white_piece.astype(int) - black_piece
+    for on_start, color in t['development']:
+        column['development'] -= np.where(on_start, 1 if color == chess.WHITE else -1, 0)
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        for open_file, seventh, connected in t['rooks'][color]:
+            column['rook_open_file'] += sign * open_file
+            column['rook_7th'] += sign * seventh
+            for pair in connected:
+                column['rook_connected'] += sign * pair
+    middlegame = ~t['in_endgame']
+    column['mobility'] += np.where(middlegame, t['mobility'], 0)
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        column['king_attack'] -= np.where(middlegame & t['valid_king'][color], sign * t['king_attack'][color], 0)
+
+    # Positions scored outside the weighted terms
+    special = t['draw'] | t['checkmate'] | t['scalar']
+    features[special] = 0
+    base = np.where(t['draw'], 0, base)
+    column['contempt'] += np.where(t['draw'], np.where(t['turn'], -1, 1), 0)
+    base = np.where(t['checkmate'], np.where(t['turn'], -engine.MATE, engine.MATE), base)
+    for i in np.flatnonzero(t['scalar']):
+        base[i] = engine.evaluate(boards[i])
+    return base, features
+
+
+def random_positions(count: int, seed: int = 0):
+    """Positions from random playouts, a cheap stand-in for a dataset."""
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board = chess.Board()
+        for _ in range(rng.randint(1, 150)):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+            boards.append(board.copy(stack=False))
+    return boards[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check evaluate_batch against evaluate and time both.")
+    parser.add_argument("--positions", type=int, default=20000, help="Random-playout positions to evaluate")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    boards = random_positions(args.positions, args.seed)
+    start = time.perf_counter()
+    batch = evaluate_batch(boards)
+    batch_time = time.perf_counter() - start
+    start = time.perf_counter()
+    scalar = [engine.evaluate(board) for board in boards]
+    scalar_time = time.perf_counter() - start
+    mismatches = sum(int(a != b) for a, b in zip(batch, scalar))
+    print(f"{len(boards)} positions, {mismatches} mismatches")
+    print(f"batch  {len(boards) / batch_time:>10.0f} positions/s")
+    print(f"scalar {len(boards) / scalar_time:>10.0f} positions/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import chess
 import chess.engine
-from engine import choose_move
+import engine
+from engine import choose_move, new_game
 import time
 
 # Path to Stockfish executable (download from https://stockfishchess.org/)
@@ -46,7 +47,13 @@ def play_game(white_player, black_player, game_num=0, time_limit=chess.engine.Li
 
 def evaluate_elo(num_games=10):
     # Our engine as white with reasonable depth
-    our_engine = lambda board: choose_move(board, depth=3)
+    warm_shares = []
+
+    def our_engine(board):
+        move = choose_move(board, depth=3)
+        if engine.last_search_stats:
+            warm_shares.append(engine.last_search_stats['warm_share'])
+        return move
 
     # Stockfish with time limit to simulate ~1200 ELO (adjust for strength)
     stockfish = chess.engine.SimpleEngine.popen_uci(STOCKFISH_PATH)
@@ -58,6 +65,8 @@ def evaluate_elo(num_games=10):
 
     for i in range(num_games):
         print(f"\n{'='*60}\nPlaying game {i+1}...")
+        new_game()
+        warm_shares.clear()
         # Alternate colors
         if i % 2 == 0:
             # Our engine white
@@ -79,6 +88,11 @@ def evaluate_elo(num_games=10):
         else:
             draws += 1
 
+        if warm_shares:
+            # How much each search reused the hash entries left by earlier moves
+            print(f"Hash warm start: {sum(warm_shares) / len(warm_shares) * 100:.1f}% of hits "
+                  f"from earlier searches (avg over {len(warm_shares)} searches)")
+
     stockfish.quit()
 
     total_games = wins + losses + draws
@@ -1,15 +1,21 @@
 import pygame
 import chess
-from engine import choose_move
+from engine import choose_move, new_game, principal_variation
+from timeman import SearchLimits
 import threading
+import time
 
 WIDTH, HEIGHT = 640, 640
 SQ_SIZE = WIDTH // 8
 LIGHT = (240, 217, 181)
 DARK = (181, 136, 99)
 
+BOT_CLOCK_MS = 30000  # Clock the bot budgets each move from (about 1s soft, 4s hard)
+PONDER = True  # Search the expected reply while the human is thinking
+
 pygame.init()
 FONT = pygame.font.SysFont("segoe ui symbol", 50)
+STATS_FONT = pygame.font.SysFont("segoe ui", 16)
 
 PIECE_SYMBOLS = {
     "P": "♙", "N": "♘", "B": "♗", "R": "♖", "Q": "♕", "K": "♔",
@@ -23,10 +29,121 @@ LEGAL_MOVE_COLOR = (0, 255, 0, 150)
 
 bot_move_result = None
 bot_thread = None
+bot_search_limits = None
+bot_search_started = 0.0
+bot_search_hit = False
+
+# Pondering: the search started on the predicted reply while the human thinks
+ponder_thread = None
+ponder_move = None
+ponder_limits = None
+ponder_stats = {'ponders': 0, 'hits': 0, 'bot_moves': 0, 'time_saved': 0.0, 'searches': 0, 'search_time': 0.0}
+
+def bot_limits(ponder=False):
+    """Time-based limits for one bot move; a ponder search starts its deadlines at ponderhit()."""
+    return SearchLimits(btime=BOT_CLOCK_MS, ponder=ponder, stop_event=threading.Event())
+
+
+def compute_bot_move(board, limits):
+    global bot_move_result
+    bot_move_result = choose_move(board, limits=limits)
+
 
-def compute_bot_move(board, depth):
+def compute_ponder_move(board, limits):
     global bot_move_result
-    bot_move_result = choose_move(board, depth)
+    result = choose_move(board, limits=limits)
+    if not limits.stop_event.is_set():
+        bot_move_result = result
+
+
+def start_pondering(board):
+    """After the bot has moved, search the reply the principal variation expects."""
+    global ponder_thread, ponder_move, ponder_limits, bot_move_result
+    pv = principal_variation(board, max_length=1)
+    if not pv:
+        return
+    ponder_board = board.copy()
+    ponder_board.push(pv[0])
+    if ponder_board.is_game_over():
+        return
+    ponder_move = pv[0]
+    ponder_limits = bot_limits(ponder=True)
+    bot_move_result = None
+    ponder_stats['ponders'] += 1
+    ponder_thread = threading.Thread(target=compute_ponder_move, args=(ponder_board, ponder_limits))
+    ponder_thread.start()
+
+
+def stop_pondering():
+    """Cancel a ponder search; whatever it stored in the transposition table stays."""
+    global ponder_thread, ponder_move, ponder_limits, bot_move_result
+    if ponder_thread:
+        ponder_limits.stop_event.set()
+        ponder_thread.join()
+    ponder_thread = None
+    ponder_move = None
+    ponder_limits = None
+    bot_move_result = None
+
+
+def start_bot_search(board, human_move):
+    """Reply to the human: keep the ponder search on a hit, otherwise search from scratch."""
+    global bot_thread, bot_move_result, bot_search_limits, bot_search_started, bot_search_hit
+    global ponder_thread, ponder_move, ponder_limits
+    ponder_stats['bot_moves'] += 1
+    bot_search_started = time.monotonic()
+    if ponder_thread and human_move == ponder_move:
+        ponder_stats['hits'] += 1
+        ponder_limits.ponderhit()  # The bot's own deadlines run from here
+        bot_thread = ponder_thread
+        bot_search_limits = ponder_limits
+        bot_search_hit = True
+        ponder_thread = None
+        ponder_move = None
+        ponder_limits = None
+        return
+    stop_pondering()
+    bot_move_result = None
+    bot_search_limits = bot_limits()
+    bot_search_hit = False
+    bot_thread = threading.Thread(target=compute_bot_move, args=(board.copy(), bot_search_limits))
+    bot_thread.start()
+
+
+def finish_bot_search():
+    """Time the finished reply; a ponder hit saves the average from-scratch search time minus its own."""
+    global bot_thread, bot_search_limits
+    elapsed = time.monotonic() - bot_search_started
+    if not bot_search_hit:
+        ponder_stats['searches'] += 1
+        ponder_stats['search_time'] += elapsed
+    elif ponder_stats['searches']:
+        ponder_stats['time_saved'] += ponder_stats['search_time'] / ponder_stats['searches'] - elapsed
+    bot_thread = None
+    bot_search_limits = None
+
+
+def stop_bot_search():
+    global bot_thread, bot_search_limits
+    if bot_thread:
+        bot_search_limits.stop_event.set()
+        bot_thread.join()
+    bot_thread = None
+    bot_search_limits = None
+
+
+def draw_ponder_stats(screen):
+    ponders = ponder_stats['ponders']
+    if not ponders:
+        return
+    hit_rate = ponder_stats['hits'] / ponders * 100
+    saved = ponder_stats['time_saved'] / max(1, ponder_stats['bot_moves'])
+    text = STATS_FONT.render(f"Ponder hits {ponder_stats['hits']}/{ponders} ({hit_rate:.0f}%)  "
+                             f"saved {saved:.2f}s/move", True, (255, 255, 255))
+    background = pygame.Surface((text.get_width() + 8, text.get_height() + 4), pygame.SRCALPHA)
+    background.fill((0, 0, 0, 140))
+    screen.blit(background, (0, 0))
+    screen.blit(text, (4, 2))
 
 
 def draw_promotion_dialog(screen, color):
@@ -228,18 +345,21 @@ def run_gui():
                 animating_move = None
                 animation_progress = 0.0
                 if not board.is_game_over() and not board.turn:
-                    bot_move_result = None
-                    bot_thread = threading.Thread(target=compute_bot_move, args=(board.copy(), 3))
-                    bot_thread.start()
+                    start_bot_search(board, last_move)
+                elif PONDER and not board.is_game_over():
+                    start_pondering(board)
+                else:
+                    stop_pondering()  # The game is over: no reply to search
         if bot_thread and not bot_thread.is_alive():
             if bot_move_result:
                 animating_move = bot_move_result
                 animation_progress = 0.0
-            bot_thread = None
+            finish_bot_search()
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+                stop_pondering()
 
             elif event.type == pygame.KEYDOWN:
                 if board.is_game_over():
@@ -253,9 +373,9 @@ def run_gui():
                     animation_progress = 0.0
                     promotion_dialog_active = False
                     promotion_move = None
-                    if bot_thread:
-                        bot_thread.join()
-                    bot_thread = None
+                    stop_bot_search()
+                    stop_pondering()
+                    new_game()
 
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 if promotion_dialog_active:
@@ -302,6 +422,7 @@ def run_gui():
                                 legal_moves = None
 
         draw_board(screen, board, selected_square, last_move, board.is_check(), board.is_game_over(), legal_moves, check_flash_timer, game_over_fade, animating_move, animation_progress)
+        draw_ponder_stats(screen)
         
         if promotion_dialog_active:
             draw_promotion_dialog(screen, board.turn)
@@ -0,0 +1,152 @@
+import chess
+
+from attacks import SEE_VALUES, see
+
+# Stages in the order moves are produced
+STAGE_TT = 0
+STAGE_CAPTURES = 1  # Captures and promotions that don't lose material (SEE >= 0)
+STAGE_KILLERS = 2
+STAGE_QUIETS = 3
+STAGE_BAD_CAPTURES = 4  # Losing captures and promotions, still by MVV-LVA
+
+# MVV_LVA[victim][attacker]: most valuable victim first, then least valuable attacker
+MVV_LVA = [[0] * 7 for _ in range(7)]
+for _victim in chess.PIECE_TYPES:
+    for _attacker in chess.PIECE_TYPES:
+        MVV_LVA[_victim][_attacker] = _victim * 10 - _attacker
+
+PROMOTION_BONUS = 100
+
+# Counters for judging how much generation work the staging saves
+stats = {
+    'nodes': 0,                  # Move pickers started
+    'cutoffs': 0,                # Beta cutoffs
+    'cutoffs_before_quiets': 0,  # Beta cutoffs without ever generating quiet moves
+    'quiet_generations': 0,      # Times the quiet stage was reached
+    'see_calls': 0,              # Captures that needed a full exchange evaluation
+    'bad_captures': 0,           # Captures deferred until after the quiets
+}
+
+
+def new_stats() -> dict:
+    """Zeroed counters for a worker that keeps its own (the module's stats serve the main search)."""
+    return dict.fromkeys(stats, 0)
+
+
+def reset_stats():
+    for name in stats:
+        stats[name] = 0
+
+
+def format_stats() -> str:
+    cutoffs = stats['cutoffs']
+    early = stats['cutoffs_before_quiets'] / cutoffs * 100 if cutoffs else 0.0
+    return (f"move picker: {stats['nodes']} nodes, {cutoffs} cutoffs, "
+            f"{early:.1f}% before quiet generation, {stats['quiet_generations']} quiet generations, "
+            f"{stats['bad_captures']} bad captures ({stats['see_calls']} SEE calls)")
+
+
+def is_good_capture(board: chess.Board, move: chess.Move, attacker: chess.PieceType, victim: int,
+                    counters: dict = None) -> bool:
+    """SEE >= 0, skipping the exchange evaluation when the victim is worth at least the attacker."""
+    if SEE_VALUES[victim] >= SEE_VALUES[attacker] and not move.promotion:
+        return True
+    (stats if counters is None else counters)['see_calls'] += 1
+    return see(board, move) >= 0
+
+
+class MovePicker:
+    """Yields legal moves lazily: hash move, good captures/promotions by MVV-LVA, killers, quiets by history,
+    then the captures and promotions that lose material by SEE.
+
+    Iterating yields (move, tactical) pairs where tactical means capture or promotion.
+    counters defaults to the module's stats.
+    """
+
+    def __init__(self, board: chess.Board, tt_move=None, killers=(), history=None, counters=None):
+        self.board = board
+        self.tt_move = tt_move
+        self.killers = killers
+        self.history = history if history is not None else {}
+        self.counters = counters if counters is not None else stats
+        self.stage = STAGE_TT
+        self.quiets_generated = False
+
+    def __iter__(self):
+        board = self.board
+        tt_move = self.tt_move
+        counters = self.counters
+        counters['nodes'] += 1
+
+        # 1. Hash move, if it is legal here (the entry may come from a key collision)
+        if tt_move is not None and board.is_legal(tt_move):
+            yield tt_move, bool(tt_move.promotion) or board.is_capture(tt_move)
+        else:
+            tt_move = None
+
+        # 2. Captures and promotions
+        self.stage = STAGE_CAPTURES
+        them = board.occupied_co[not board.turn]
+        tactical_mask = them | chess.BB_BACKRANKS
+        if board.ep_square is not None:
+            tactical_mask |= chess.BB_SQUARES[board.ep_square]
+        scored = []
+        bad = []
+        for move in board.generate_legal_moves(chess.BB_ALL, tactical_mask):
+            attacker = board.piece_type_at(move.from_square)
+            victim = board.piece_type_at(move.to_square)
+            if victim is None:
+                if move.promotion:
+                    victim = 0
+                elif attacker == chess.PAWN and move.to_square == board.ep_square:
+                    victim = chess.PAWN
+                else:
+                    continue  # Quiet move to the back rank
+            score = MVV_LVA[victim][attacker]
+            if move.promotion:
+                score += PROMOTION_BONUS + move.promotion
+            if move == tt_move:
+                continue
+            if is_good_capture(board, move, attacker, victim, counters):
+                scored.append((score, move))
+            else:
+                bad.append((score, move))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        for _, move in scored:
+            yield move, True
+
+        # 3. Killers (quiet moves that caused cutoffs at this depth elsewhere)
+        self.stage = STAGE_KILLERS
+        tried_killers = []
+        for move in self.killers:
+            if move != tt_move and not move.promotion and not board.is_capture(move) and board.is_legal(move):
+                tried_killers.append(move)
+                yield move, False
+
+        # 4. Quiet moves, only generated once everything above failed to cut off
+        self.stage = STAGE_QUIETS
+        self.quiets_generated = True
+        counters['quiet_generations'] += 1
+        history = self.history
+        quiets = []
+        for move in board.generate_legal_moves(chess.BB_ALL, ~them):
+            if move.promotion or move == tt_move or move in tried_killers:
+                continue
+            if move.to_square == board.ep_square and board.piece_type_at(move.from_square) == chess.PAWN:
+                continue
+            quiets.append((history.get((move.from_square, move.to_square), 0), move))
+        quiets.sort(key=lambda item: item[0], reverse=True)
+        for _, move in quiets:
+            yield move, False
+
+        # 5. Captures that lose material
+        self.stage = STAGE_BAD_CAPTURES
+        counters['bad_captures'] += len(bad)
+        bad.sort(key=lambda item: item[0], reverse=True)
+        for _, move in bad:
+            yield move, True
+
+    def record_cutoff(self):
+        self.counters['cutoffs'] += 1
+        if not self.quiets_generated:
+            self.counters['cutoffs_before_quiets'] += 1
@@ -0,0 +1,171 @@
+import chess
+
+from zobrist import PIECE_KEYS
+
+PAWN_HASH_ENTRIES = 1 << 14  # Default pawn hash size (entries, power of two)
+
+# FILE_MASKS[file], ADJACENT_FILES[file]
+FILE_MASKS = list(chess.BB_FILES)
+ADJACENT_FILES = [(chess.BB_FILES[f - 1] if f > 0 else 0) | (chess.BB_FILES[f + 1] if f < 7 else 0)
+                  for f in range(8)]
+
+
+def _ranks_ahead(color: chess.Color, rank: int) -> int:
+    """All squares on ranks strictly in front of rank, from color's point of view."""
+    mask = 0
+    for r in (range(rank + 1, 8) if color == chess.WHITE else range(rank)):
+        mask |= chess.BB_RANKS[r]
+    return mask
+
+
+def _ranks_behind(color: chess.Color, rank: int) -> int:
+    return _ranks_ahead(not color, rank)
+
+
+# Per [color][square] masks for a pawn of that color on that square
+FRONT_SPANS = [[0] * 64, [0] * 64]      # Same file, in front
+PASSED_MASKS = [[0] * 64, [0] * 64]     # Same and adjacent files, in front: no enemy pawn here = passed
+SUPPORT_MASKS = [[0] * 64, [0] * 64]    # Adjacent files, behind: an own pawn here can support it
+BACKWARD_MASKS = [[0] * 64, [0] * 64]   # Enemy pawns here attack the square in front of it
+for _color in chess.COLORS:
+    for _sq in chess.SQUARES:
+        _file, _rank = chess.square_file(_sq), chess.square_rank(_sq)
+        FRONT_SPANS[_color][_sq] = _ranks_ahead(_color, _rank) & FILE_MASKS[_file]
+        PASSED_MASKS[_color][_sq] = _ranks_ahead(_color, _rank) & (FILE_MASKS[_file] | ADJACENT_FILES[_file])
+        SUPPORT_MASKS[_color][_sq] = _ranks_behind(_color, _rank) & ADJACENT_FILES[_file]
+        _stop_rank = _rank + (1 if _color == chess.WHITE else -1)
+        _attacker_rank = _stop_rank + (1 if _color == chess.WHITE else -1)
+        if 0 <= _stop_rank < 8 and 0 <= _attacker_rank < 8:
+            BACKWARD_MASKS[_color][_sq] = chess.BB_RANKS[_attacker_rank] & ADJACENT_FILES[_file]
+
+
+def pawn_structure(board: chess.Board, color: chess.Color):
+    """Return (isolated, doubled, backward, passed) for color's pawns.
+
+    The first three are counts (every pawn of a doubled pair counts), passed
+    is a bitboard of the passed pawns. Isolated pawns are never backward.
+    """
+    ours = board.pawns & board.occupied_co[color]
+    theirs = board.pawns & board.occupied_co[not color]
+    isolated = doubled = backward = 0
+    passed = 0
+    for sq in chess.scan_forward(ours):
+        file = sq & 7
+        if not ours & ADJACENT_FILES[file]:
+            isolated += 1
+        elif not ours & SUPPORT_MASKS[color][sq] and theirs & BACKWARD_MASKS[color][sq]:
+            backward += 1
+        if ours & FILE_MASKS[file] & ~chess.BB_SQUARES[sq]:
+            doubled += 1
+        if not theirs & PASSED_MASKS[color][sq]:
+            passed |= chess.BB_SQUARES[sq]
+    return isolated, doubled, backward, passed
+
+
+def advancement(passed: int, color: chess.Color) -> int:
+    """Sum over the given pawns of how many ranks each has advanced (0-7 from its own back rank)."""
+    total = 0
+    for sq in chess.scan_forward(passed):
+        total += sq >> 3 if color == chess.WHITE else 7 - (sq >> 3)
+    return total
+
+
+def open_file(board: chess.Board, file: int) -> bool:
+    """No pawn of either color on the file."""
+    return not board.pawns & FILE_MASKS[file]
+
+
+def king_shelter(board: chess.Board, color: chess.Color, king_sq: int):
+    """Return (shield, open_files) for color's king: own pawns directly in front of it, and
+    files among its own and the two adjacent ones that hold no pawn at all."""
+    file = king_sq & 7
+    rank = king_sq >> 3
+    shield = 0
+    if color == chess.WHITE and rank >= 1:
+        shield_rank = chess.BB_RANKS[rank - 1]
+    elif color == chess.BLACK and rank <= 6:
+        shield_rank = chess.BB_RANKS[rank + 1]
+    else:
+        shield_rank = 0
+    if shield_rank:
+        shield = chess.popcount(board.pawns & board.occupied_co[color] & shield_rank
+                                & (FILE_MASKS[file] | ADJACENT_FILES[file]))
+    open_files = 0
+    for f in (file - 1, file, file + 1):
+        if 0 <= f < 8 and open_file(board, f):
+            open_files += 1
+    return shield, open_files
+
+
+def pawn_king_key(board: chess.Board) -> int:
+    """Zobrist key of the pawns and kings only (EvalBoard keeps it incrementally)."""
+    key = 0
+    for color in chess.COLORS:
+        keys = PIECE_KEYS[color]
+        for piece_type in (chess.PAWN, chess.KING):
+            for sq in chess.scan_forward(board.pieces_mask(piece_type, color)):
+                key ^= keys[piece_type][sq]
+    return key
+
+
+def pawn_king_terms(board: chess.Board, color: chess.Color):
+    """Everything evaluate needs that depends only on pawns and kings, for one side:
+    (isolated, doubled, backward, passed, shield, open_files). The king terms are
+    None for a king on square 0, which evaluate skips."""
+    isolated, doubled, backward, passed = pawn_structure(board, color)
+    king_sq = board.king(color)
+    if king_sq:
+        shield, open_files = king_shelter(board, color, king_sq)
+    else:
+        shield = open_files = None
+    return isolated, doubled, backward, passed, shield, open_files
+
+
+class PawnHashTable:
+    """Direct-mapped cache of pawn_king_terms for both sides, keyed by pawn_king_key.
+
+    Entries hold raw counts rather than weighted scores, so changing WEIGHTS
+    (as the tuners do) never leaves stale values behind.
+    """
+
+    def __init__(self, num_entries: int = PAWN_HASH_ENTRIES, enabled: bool = True):
+        size = 1
+        while size * 2 <= num_entries:
+            size *= 2
+        self.mask = size - 1
+        self.entries = [None] * size
+        self.enabled = enabled
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+
+    def clear(self):
+        self.entries = [None] * len(self.entries)
+        self.reset_stats()
+
+    def probe(self, board: chess.Board, key: int = None):
+        """Return (white_terms, black_terms), computing and storing them on a miss."""
+        if not self.enabled:
+            return pawn_king_terms(board, chess.WHITE), pawn_king_terms(board, chess.BLACK)
+        if key is None:
+            key = pawn_king_key(board)
+        self.probes += 1
+        index = key & self.mask
+        entry = self.entries[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1], entry[2]
+        white = pawn_king_terms(board, chess.WHITE)
+        black = pawn_king_terms(board, chess.BLACK)
+        self.entries[index] = (key, white, black)
+        return white, black
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self.entries),
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+        }
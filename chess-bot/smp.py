@@ -0,0 +1,255 @@
+import argparse
+import multiprocessing as mp
+import queue
+import sys
+import threading
+import time
+
+import chess
+
+import engine
+import movepick
+from pawns import PAWN_HASH_ENTRIES, PawnHashTable
+from tablebase import Tablebases
+from timeman import SearchLimits
+from transposition import TranspositionTable
+
+HELPER_RESULT_TIMEOUT = 10  # Seconds to wait for a stopped helper to report back
+
+# Middlegame positions outside the opening book, for the scaling report
+BENCH_FENS = [
+    "r2q1rk1/ppp2ppp/2np1n2/2b1p1B1/2B1P1b1/2NP1N2/PPP2PPP/R2Q1RK1 w - - 0 8",
+    "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8",
+    "2r2rk1/pp1bqppp/2n1pn2/3p4/3P4/2PBPN2/P1Q2PPP/R4RK1 w - - 0 14",
+]
+
+
+def free_threaded() -> bool:
+    """True on free-threaded CPython builds (3.13t) running without the GIL."""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def helper_start_depth(index: int) -> int:
+    """Stagger helpers: odd helpers start one ply deeper so workers don't all search the same depth."""
+    return 1 + index % 2
+
+
+def _run_helper(worker, index, search_id, fen, moves, generation, stop_event):
+    """Search until stopped; returns (search_id, index, nodes, depth, move_uci, score).
+
+    fen is the position after the last irreversible move and moves lead from it
+    to the root, so the helper sees the same repetition history as the main search.
+    search_id tags the result with the search it belongs to.
+    """
+    worker.tt.generation = generation
+    board = engine.EvalBoard(fen)
+    for move in moves:
+        board.push(chess.Move.from_uci(move))
+    limits = SearchLimits(infinite=True, stop_event=stop_event)
+    move, score, depth = worker.iterative_deepening(board, limits, start_depth=helper_start_depth(index))
+    return search_id, index, worker.time_manager.nodes, depth, move.uci() if move else None, score
+
+
+def _thread_worker(tt: TranspositionTable) -> engine.SearchWorker:
+    """Helper for a thread of this process, with its own pawn hash, move picker counters
+    and tablebase handle (a helper process gets its own copies of the module's)."""
+    return engine.SearchWorker(tt, PawnHashTable(PAWN_HASH_ENTRIES, engine.pawn_hash.enabled), movepick.new_stats(),
+                               Tablebases(engine.tablebases.directory, engine.tablebases.enabled))
+
+
+def _helper_process(index, shm_name, tasks, results, stop_event):
+    """Helper process main loop: attach to the shared TT and search every task it gets."""
+    tt = TranspositionTable.attach_shared(shm_name)
+    worker = engine.SearchWorker(tt)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            results.put(_run_helper(worker, index, *task, stop_event))
+    finally:
+        tt.close()
+
+
+class LazySMP:
+    """Lazy SMP search pool.
+
+    The calling thread runs the main search under the real limits while N-1
+    helpers search the same root at staggered depths until it finishes. All
+    workers share one lock-free transposition table (shared memory across
+    processes, or a plain table for threads on free-threaded builds) and keep
+    their own killers, history, pawn hash and counters. While open,
+    engine.choose_move uses the pool.
+    """
+
+    def __init__(self, num_workers: int, tt_size_mb: float = engine.TT_SIZE_MB, use_threads: bool = None):
+        self.num_workers = max(1, num_workers)
+        self.use_threads = free_threaded() if use_threads is None else use_threads
+        self.last_stats = {}
+        self.search_id = 0  # Tags tasks and results, so a late helper result can't leak into the next search
+        self.outstanding = 0  # Process helper tasks not yet answered
+
+        if self.use_threads:
+            self.tt = TranspositionTable(tt_size_mb)
+            self.stop_event = threading.Event()
+            self.helpers = [_thread_worker(self.tt) for _ in range(1, self.num_workers)]
+        else:
+            self.tt = TranspositionTable.create_shared(tt_size_mb)
+            ctx = mp.get_context()
+            self.stop_event = ctx.Event()
+            self.results = ctx.Queue()
+            self.task_queues = []
+            self.processes = []
+            for index in range(1, self.num_workers):
+                tasks = ctx.Queue()
+                process = ctx.Process(target=_helper_process, daemon=True,
+                                      args=(index, self.tt.shm.name, tasks, self.results, self.stop_event))
+                process.start()
+                self.task_queues.append(tasks)
+                self.processes.append(process)
+
+        self._previous_tt = engine.transposition_table
+        engine.set_transposition_table(self.tt)
+        engine.search_pool = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def new_game(self):
+        """Reset helper move ordering (process helpers age theirs at every search)."""
+        if self.use_threads:
+            for worker in self.helpers:
+                worker.new_game()
+                worker.pawn_table.clear()
+
+    def search(self, board: engine.EvalBoard, limits: SearchLimits, on_iteration=None):
+        """Run one Lazy SMP search and return the best move (on_iteration follows the main worker)."""
+        self.search_id += 1
+        search_id = self.search_id
+        task = (search_id, board.root().fen(), [move.uci() for move in board.move_stack], self.tt.generation)
+        helper_results = []
+        threads = []
+        start = time.monotonic()
+
+        if self.use_threads:
+            self.stop_event.clear()  # The previous search joined its helper threads
+            for index, worker in enumerate(self.helpers, start=1):
+                thread = threading.Thread(target=lambda w=worker, i=index: helper_results.append(
+                    _run_helper(w, i, *task, self.stop_event)), daemon=True)
+                thread.start()
+                threads.append(thread)
+        else:
+            # Wait for helpers an earlier search gave up on: clearing the stop flag
+            # while one is still on its old task would let it search on
+            deadline = time.monotonic() + HELPER_RESULT_TIMEOUT
+            while self.outstanding > 0:
+                try:
+                    self.results.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                self.outstanding -= 1
+            self.stop_event.clear()
+            for tasks in self.task_queues:
+                tasks.put(task)
+            self.outstanding += len(self.task_queues)
+
+        try:
+            move, score, depth = engine.main_worker.iterative_deepening(board, limits, on_iteration=on_iteration)
+        finally:
+            self.stop_event.set()
+            if self.use_threads:
+                for thread in threads:
+                    thread.join()
+            else:
+                deadline = time.monotonic() + HELPER_RESULT_TIMEOUT
+                while len(helper_results) < len(self.task_queues):
+                    try:
+                        result = self.results.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    self.outstanding -= 1
+                    if result[0] == search_id:
+                        helper_results.append(result)
+        elapsed = time.monotonic() - start
+
+        nodes = engine.main_worker.time_manager.nodes + sum(result[2] for result in helper_results)
+        if move is None:
+            # Main search never finished an iteration; take the deepest legal helper result
+            finished = [result for result in helper_results if result[4] is not None]
+            for result in sorted(finished, key=lambda result: -result[3]):
+                helper_move = chess.Move.from_uci(result[4])
+                if board.is_legal(helper_move):
+                    move = helper_move
+                    break
+        self.last_stats = {
+            'workers': self.num_workers,
+            'depth': depth,
+            'score': score,
+            'nodes': nodes,
+            'time': elapsed,
+            'nps': nodes / elapsed if elapsed > 0 else 0.0,
+            'helper_depths': [result[3] for result in sorted(helper_results)],
+        }
+        return move
+
+    def close(self):
+        """Stop helpers, release the shared table and give choose_move its old table back."""
+        if engine.search_pool is self:
+            engine.search_pool = None
+            engine.set_transposition_table(self._previous_tt)
+        if not self.use_threads:
+            for tasks in self.task_queues:
+                tasks.put(None)
+            for process in self.processes:
+                process.join(timeout=HELPER_RESULT_TIMEOUT)
+                if process.is_alive():
+                    process.terminate()
+            self.task_queues = []
+            self.processes = []
+            self.tt.close(unlink=True)
+
+
+def scaling_report(fens, depth: int, worker_counts, tt_size_mb: float = engine.TT_SIZE_MB, use_threads: bool = None):
+    """Time-to-depth and NPS for each worker count (fresh table per position)."""
+    rows = []
+    for num_workers in worker_counts:
+        total_time = 0.0
+        total_nodes = 0
+        with LazySMP(num_workers, tt_size_mb, use_threads) as pool:
+            for fen in fens:
+                pool.tt.clear()
+                engine.choose_move(chess.Board(fen), limits=SearchLimits(depth=depth))
+                total_time += pool.last_stats['time']
+                total_nodes += pool.last_stats['nodes']
+        rows.append((num_workers, total_time, total_nodes))
+
+    base_time = rows[0][1]
+    print(f"{'workers':>7} {'time-to-depth':>14} {'speedup':>8} {'nodes':>10} {'nps':>10}")
+    for num_workers, total_time, total_nodes in rows:
+        speedup = base_time / total_time if total_time > 0 else 0.0
+        nps = total_nodes / total_time if total_time > 0 else 0.0
+        print(f"{num_workers:>7} {total_time:>13.2f}s {speedup:>7.2f}x {total_nodes:>10} {nps:>10.0f}")
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lazy SMP scaling report (time-to-depth and NPS).")
+    parser.add_argument("--depth", type=int, default=3, help="Search depth per position")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker counts to compare")
+    parser.add_argument("--hash", type=float, default=engine.TT_SIZE_MB, help="Transposition table size in MB")
+    parser.add_argument("--threads", action="store_true", help="Use threads instead of processes")
+    parser.add_argument("--fen", action="append", help="Position(s) to search (default: built-in set)")
+    args = parser.parse_args()
+
+    use_threads = True if args.threads else None
+    mode = "threads" if (use_threads or free_threaded()) else "processes"
+    print(f"Lazy SMP scaling at depth {args.depth} using {mode}")
+    scaling_report(args.fen or BENCH_FENS, args.depth, args.workers, args.hash, use_threads)
+
+
+if __name__ == "__main__":
+    main()
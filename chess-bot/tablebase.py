@@ -0,0 +1,772 @@
+import argparse
+import mmap
+import os
+import random
+import time
+
+import chess
+import numpy as np
+
+# Endgame tables built by retrograde analysis, one file per material signature.
+#
+# A file is a 16-byte header followed by one byte per position index:
+#   0        draw (also illegal or unreachable indices)
+#   1..127   side to move mates in that many moves (2n - 1 plies)
+#   128..255 side to move is mated in (byte - 128) moves (2n plies, 128 = checkmated)
+# Distances count plies to mate and ignore the fifty-move rule.
+#
+# Index: ((stm * 32 + white_king) * 64 + black_king) * 64 + other pieces..., where
+# stm is 0 with White to move and positions are mirrored so the white king stands
+# on files a-d (white_king = rank * 4 + file). Other pieces follow the table's
+# piece order: White's then Black's, most valuable first.
+
+TB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebases')
+TB_MAGIC = b'CBTB'
+TB_VERSION = 1
+HEADER_BYTES = 16
+TB_SUFFIX = '.tb'
+MAX_PIECES = 4
+DEFAULT_TABLES = ('KPK', 'KQK', 'KRK', 'KBNK', 'KQKR')
+
+WDL_LOSS = -1
+WDL_DRAW = 0
+WDL_WIN = 1
+
+GEN_CHUNK = 1 << 20  # Positions per vectorized pass during generation
+
+# Material values only decide which side a table calls White
+MATERIAL_VALUES = [0, 1, 3, 3, 5, 9, 0]
+
+# Materials where no sequence of moves mates: never stored, always a draw
+DRAWN_MATERIAL = {'KK', 'KBK', 'KNK', 'KKB', 'KKN'}
+
+_UNDECIDED, _WIN, _LOSS = 0, 1, 2
+_NONE = 255  # "no such move" marker in the uint8 capture arrays
+
+
+def material_name(white, black) -> str:
+    """'KQKR' style name for the non-king piece types of each side."""
+    def side(types):
+        return 'K' + ''.join(chess.piece_symbol(t).upper() for t in sorted(types, reverse=True))
+    return side(white) + side(black)
+
+
+def parse_material(name: str):
+    """(white_types, black_types) of a name like 'KBNK'; raises ValueError on bad names."""
+    name = name.upper()
+    if name.count('K') != 2 or not name.startswith('K'):
+        raise ValueError(f"bad material {name!r}: expected two kings, e.g. KQKR")
+    split = name.index('K', 1)
+    try:
+        white = tuple(sorted((chess.PIECE_SYMBOLS.index(c.lower()) for c in name[1:split]), reverse=True))
+        black = tuple(sorted((chess.PIECE_SYMBOLS.index(c.lower()) for c in name[split + 1:]), reverse=True))
+    except ValueError:
+        raise ValueError(f"bad material {name!r}") from None
+    if 0 in white or 0 in black or chess.KING in white or chess.KING in black:
+        raise ValueError(f"bad material {name!r}")
+    return white, black
+
+
+def _strength(types):
+    return sum(MATERIAL_VALUES[t] for t in types), tuple(sorted(types, reverse=True))
+
+
+def canonical_material(white, black):
+    """(name, flipped): the stored table for this material and whether colors are swapped in it."""
+    if _strength(black) > _strength(white):
+        return material_name(black, white), True
+    return material_name(white, black), False
+
+
+def board_material(board: chess.Board):
+    types = []
+    for color in (chess.WHITE, chess.BLACK):
+        ours = board.occupied_co[color] & ~board.kings
+        types.append([board.piece_type_at(sq) for sq in chess.scan_forward(ours)])
+    return types[0], types[1]
+
+
+# --- Square tables shared by generation and probing ---
+
+KING_INDEX = [-1] * 64  # White king square (files a-d) -> 0..31
+KING_SQUARES = []
+for _sq in chess.SQUARES:
+    if chess.square_file(_sq) < 4:
+        KING_INDEX[_sq] = len(KING_SQUARES)
+        KING_SQUARES.append(_sq)
+
+U64 = np.uint64
+BB = np.array([1 << sq for sq in chess.SQUARES], dtype=U64)
+KING_INDEX_TABLE = np.array(KING_INDEX, dtype=np.int64)
+KING_SQUARE_TABLE = np.array(KING_SQUARES, dtype=np.int64)
+BETWEEN = np.array([[chess.between(a, b) for b in chess.SQUARES] for a in chess.SQUARES], dtype=U64)
+SLIDERS = (chess.BISHOP, chess.ROOK, chess.QUEEN)
+
+# HITS[piece_type][a, b]: a piece on a attacks b on an empty board (pawns: PAWN_HITS[color])
+HITS = np.zeros((7, 64, 64), dtype=bool)
+PAWN_HITS = np.zeros((2, 64, 64), dtype=bool)
+for _a in chess.SQUARES:
+    for _b in chess.SQUARES:
+        HITS[chess.KNIGHT, _a, _b] = bool(chess.BB_KNIGHT_ATTACKS[_a] & chess.BB_SQUARES[_b])
+        HITS[chess.KING, _a, _b] = bool(chess.BB_KING_ATTACKS[_a] & chess.BB_SQUARES[_b])
+        HITS[chess.BISHOP, _a, _b] = bool(chess.BB_DIAG_ATTACKS[_a][0] & chess.BB_SQUARES[_b])
+        HITS[chess.ROOK, _a, _b] = bool((chess.BB_RANK_ATTACKS[_a][0] | chess.BB_FILE_ATTACKS[_a][0])
+                                        & chess.BB_SQUARES[_b])
+        for _color in chess.COLORS:
+            PAWN_HITS[int(_color), _a, _b] = bool(chess.BB_PAWN_ATTACKS[_color][_a] & chess.BB_SQUARES[_b])
+HITS[chess.QUEEN] = HITS[chess.BISHOP] | HITS[chess.ROOK]
+
+
+def _step_table(steps):
+    """[step][square] -> target square, -1 off the board."""
+    table = np.full((len(steps), 64), -1, dtype=np.int64)
+    for i, (df, dr) in enumerate(steps):
+        for sq in chess.SQUARES:
+            f, r = chess.square_file(sq) + df, chess.square_rank(sq) + dr
+            if 0 <= f < 8 and 0 <= r < 8:
+                table[i, sq] = chess.square(f, r)
+    return table
+
+
+ROOK_DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+BISHOP_DIRECTIONS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+KING_TARGETS = _step_table(ROOK_DIRECTIONS + BISHOP_DIRECTIONS)
+KNIGHT_TARGETS = _step_table(((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)))
+# RAYS[direction][distance - 1][square], directions as in KING_TARGETS
+RAYS = np.stack([_step_table([(df * k, dr * k) for k in range(1, 8)]) for df, dr in ROOK_DIRECTIONS + BISHOP_DIRECTIONS])
+SLIDER_DIRECTIONS = {chess.ROOK: range(4), chess.BISHOP: range(4, 8), chess.QUEEN: range(8)}
+PAWN_CAPTURES = [_step_table(((-1, -1), (1, -1))), _step_table(((-1, 1), (1, 1)))]  # Indexed by color
+
+
+# --- Vectorized generation ---
+
+class _Layout:
+    """Piece order and index arithmetic of one table."""
+
+    def __init__(self, name: str):
+        self.white, self.black = parse_material(name)
+        self.name = material_name(self.white, self.black)
+        # (color, piece_type) per index slot: kings first
+        self.pieces = ([(chess.WHITE, chess.KING), (chess.BLACK, chess.KING)]
+                       + [(chess.WHITE, t) for t in self.white] + [(chess.BLACK, t) for t in self.black])
+        self.count = len(self.pieces)
+        self.half = 32 * 64 ** (self.count - 1)
+        self.size = 2 * self.half
+
+    def decode(self, indices):
+        """Squares per slot of the given indices."""
+        rest = indices.copy()
+        squares = [None] * self.count
+        for slot in range(self.count - 1, 0, -1):
+            squares[slot] = rest & 63
+            rest >>= 6
+        squares[0] = KING_SQUARE_TABLE[rest & 31]
+        return squares
+
+    def encode(self, stm: int, squares):
+        """Indices of positions given squares per slot (mirrored as needed); stm 0 is White."""
+        mirror = np.where((squares[0] & 7) >= 4, 7, 0)
+        index = KING_INDEX_TABLE[squares[0] ^ mirror] + stm * 32
+        for slot in range(1, self.count):
+            index = (index << 6) | (squares[slot] ^ mirror)
+        return index
+
+    def slot_order(self, pieces):
+        """Permutation putting (color, piece_type) pieces into this table's slot order."""
+        free = list(range(len(pieces)))
+        order = []
+        for slot_piece in self.pieces:
+            for i in free:
+                if pieces[i] == slot_piece:
+                    order.append(i)
+                    free.remove(i)
+                    break
+            else:
+                raise ValueError(f"pieces don't match {self.name}")
+        return order
+
+
+def _attacked(target, attackers, occupied):
+    """Mask of positions where target is attacked by one of attackers [(color, piece_type, squares)]."""
+    hit = np.zeros(target.shape, dtype=bool)
+    for color, piece_type, squares in attackers:
+        if piece_type == chess.PAWN:
+            hit |= PAWN_HITS[int(color)][squares, target]
+        elif piece_type in SLIDERS:
+            hit |= HITS[piece_type][squares, target] & ((BETWEEN[squares, target] & occupied) == 0)
+        else:
+            hit |= HITS[piece_type][squares, target]
+    return hit
+
+
+def _targets(piece_type, origin, occupied):
+    """Yield (target, reachable) for a non-pawn piece: sliders stop at the first occupied square,
+    which is yielded (capture or own piece, the caller decides)."""
+    if piece_type == chess.KING or piece_type == chess.KNIGHT:
+        table = KING_TARGETS if piece_type == chess.KING else KNIGHT_TARGETS
+        for step in table:
+            target = step[origin]
+            yield np.maximum(target, 0), target >= 0
+        return
+    for direction in SLIDER_DIRECTIONS[piece_type]:
+        open_ray = np.ones(origin.shape, dtype=bool)
+        for distance in range(7):
+            target = RAYS[direction, distance][origin]
+            open_ray &= target >= 0
+            if not open_ray.any():
+                break
+            target = np.maximum(target, 0)
+            yield target, open_ray.copy()
+            open_ray &= (BB[target] & occupied) == 0
+
+
+class _Source:
+    """Read access to a finished table, possibly with colors swapped."""
+
+    def __init__(self, data, layout: _Layout):
+        self.data = data
+        self.layout = layout
+
+    def values(self, stm: chess.Color, pieces, squares):
+        """(wdl, plies) arrays for positions with pieces [(color, type)] on squares, stm to move."""
+        name, flipped = canonical_material(*_split_types(pieces))
+        if name in DRAWN_MATERIAL:
+            zeros = np.zeros(squares[0].shape, dtype=np.int64)
+            return zeros, zeros
+        if flipped:
+            pieces = [(not color, piece_type) for color, piece_type in pieces]
+            squares = [sq ^ 56 for sq in squares]
+            stm = not stm
+        order = self.layout.slot_order(pieces)
+        index = self.layout.encode(0 if stm == chess.WHITE else 1, [squares[i] for i in order])
+        return decode_values(np.asarray(self.data[index], dtype=np.int64))
+
+
+def _split_types(pieces):
+    white = [t for color, t in pieces if color == chess.WHITE and t != chess.KING]
+    black = [t for color, t in pieces if color == chess.BLACK and t != chess.KING]
+    return white, black
+
+
+def decode_values(codes):
+    """(wdl, plies) arrays from stored bytes."""
+    win = (codes >= 1) & (codes <= 127)
+    loss = codes >= 128
+    wdl = np.where(win, WDL_WIN, np.where(loss, WDL_LOSS, WDL_DRAW))
+    plies = np.where(win, 2 * codes - 1, np.where(loss, 2 * (codes - 128), 0))
+    return wdl, plies
+
+
+def table_path(name: str, directory: str = TB_DIR) -> str:
+    return os.path.join(directory, name + TB_SUFFIX)
+
+
+def _dependencies(layout: _Layout):
+    """Materials reachable by one capture or promotion."""
+    names = set()
+    for slot, (color, piece_type) in enumerate(layout.pieces):
+        if piece_type == chess.KING:
+            continue
+        rest = layout.pieces[:slot] + layout.pieces[slot + 1:]
+        names.add(canonical_material(*_split_types(rest))[0])
+        if piece_type == chess.PAWN:
+            for promotion in (chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+                promoted = layout.pieces[:slot] + [(color, promotion)] + layout.pieces[slot + 1:]
+                names.add(canonical_material(*_split_types(promoted))[0])
+                # Promotion with a capture
+                for other, (other_color, other_type) in enumerate(promoted):
+                    if other_color != color and other_type != chess.KING:
+                        names.add(canonical_material(*_split_types(promoted[:other] + promoted[other + 1:]))[0])
+    return sorted(names - DRAWN_MATERIAL)
+
+
+def generate(name: str, directory: str = TB_DIR, verbose: bool = True, force: bool = False) -> str:
+    """Build the table for a material (and, first, every smaller table it depends on).
+
+    Existing files are kept unless force is set. Returns the path of the table.
+    """
+    layout = _Layout(name)
+    canonical, _ = canonical_material(layout.white, layout.black)
+    if canonical != layout.name:
+        layout = _Layout(canonical)
+    if layout.name in DRAWN_MATERIAL:
+        raise ValueError(f"{layout.name} is a draw and needs no table")
+    if layout.count > MAX_PIECES:
+        raise ValueError(f"{layout.name}: at most {MAX_PIECES} pieces are supported")
+    pawn_colors = {color for color, piece_type in layout.pieces if piece_type == chess.PAWN}
+    if len(pawn_colors) > 1:
+        raise ValueError(f"{layout.name}: pawns on both sides (en passant) are not supported")
+    path = table_path(layout.name, directory)
+    if os.path.exists(path) and not force:
+        return path
+
+    sources = {}
+    for dependency in _dependencies(layout):
+        generate(dependency, directory, verbose)
+        sources[dependency] = _Source(open_table(table_path(dependency, directory))[1], _Layout(dependency))
+
+    start = time.perf_counter()
+    data = _Generator(layout, sources).run()
+    os.makedirs(directory, exist_ok=True)
+    header = TB_MAGIC + bytes([TB_VERSION, layout.count, 0, 0]) + layout.name.encode('ascii').ljust(8, b'\0')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        data.tofile(f)
+    os.replace(tmp_path, path)
+    if verbose:
+        wins = int(np.count_nonzero((data >= 1) & (data <= 127)))
+        losses = int(np.count_nonzero(data >= 128))
+        longest = int(data[data <= 127].max()) if wins else 0
+        print(f"{layout.name}: {layout.size} positions, {wins} wins, {losses} losses, "
+              f"longest mate {longest} moves, {time.perf_counter() - start:.1f}s -> {path}")
+    return path
+
+
+def open_table(path: str):
+    """(mmap, uint8 array view of the positions) of a table file; raises ValueError if it isn't one."""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:4] != TB_MAGIC or mapped[4] != TB_VERSION:
+        mapped.close()
+        raise ValueError(f"{path}: not a version {TB_VERSION} table")
+    return mapped, np.frombuffer(mapped, dtype=np.uint8, offset=HEADER_BYTES)
+
+
+class _Generator:
+    """Retrograde analysis of one table: find mates and stalemates, then walk
+    backwards one ply at a time from every newly decided position."""
+
+    def __init__(self, layout: _Layout, sources):
+        self.layout = layout
+        self.sources = sources
+        size = layout.size
+        self.legal = np.zeros(size, dtype=bool)
+        self.in_check = np.zeros(size, dtype=bool)
+        self.quiet_moves = np.zeros(size, dtype=np.int16)
+        self.capture_moves = np.zeros(size, dtype=np.uint8)  # Captures and promotions
+        self.capture_win = np.full(size, _NONE, dtype=np.uint8)  # Fastest win by a capture, in plies
+        self.capture_draw = np.zeros(size, dtype=bool)
+        self.capture_losses = np.zeros(size, dtype=np.uint8)
+        self.capture_loss_plies = np.zeros(size, dtype=np.uint8)  # Slowest loss by a capture
+        self.result = np.zeros(size, dtype=np.uint8)
+        self.plies = np.zeros(size, dtype=np.uint8)
+
+    def chunks(self):
+        step = min(GEN_CHUNK, self.layout.half)
+        for start in range(0, self.layout.size, step):
+            yield start, min(start + step, self.layout.size)
+
+    def run(self):
+        for start, stop in self.chunks():
+            self._legality(start, stop)
+        for start, stop in self.chunks():
+            self._moves(start, stop)
+        self._retrograde()
+        return self._encode()
+
+    def _side(self, start):
+        """(side to move, its slots, the other side's slots) for indices from start."""
+        stm = chess.WHITE if start < self.layout.half else chess.BLACK
+        ours = [slot for slot, (color, _) in enumerate(self.layout.pieces) if color == stm]
+        theirs = [slot for slot, (color, _) in enumerate(self.layout.pieces) if color != stm]
+        return stm, ours, theirs
+
+    def _legality(self, start, stop):
+        layout = self.layout
+        squares = layout.decode(np.arange(start, stop, dtype=np.int64))
+        stm, ours, theirs = self._side(start)
+        occupied = np.zeros(stop - start, dtype=U64)
+        ok = np.ones(stop - start, dtype=bool)
+        for slot, (color, piece_type) in enumerate(layout.pieces):
+            ok &= (occupied & BB[squares[slot]]) == 0
+            occupied |= BB[squares[slot]]
+            if piece_type == chess.PAWN:
+                ok &= (squares[slot] >= 8) & (squares[slot] < 56)
+        their_king = squares[1 if stm == chess.WHITE else 0]
+        our_king = squares[0 if stm == chess.WHITE else 1]
+        ok &= ~_attacked(their_king, [(stm, layout.pieces[s][1], squares[s]) for s in ours], occupied)
+        self.legal[start:stop] = ok
+        self.in_check[start:stop] = ok & _attacked(
+            our_king, [(not stm, layout.pieces[s][1], squares[s]) for s in theirs], occupied)
+
+    def _moves(self, start, stop):
+        """Count quiet moves to legal positions and settle captures and promotions through smaller tables."""
+        layout = self.layout
+        positions = np.nonzero(self.legal[start:stop])[0]
+        if not len(positions):
+            return
+        index = positions + start
+        squares = [sq[positions] for sq in layout.decode(np.arange(start, stop, dtype=np.int64))]
+        stm, ours, theirs = self._side(start)
+        child_stm = 0 if stm == chess.BLACK else 1
+        occupied = np.zeros(len(positions), dtype=U64)
+        for sq in squares:
+            occupied |= BB[sq]
+        own = np.zeros(len(positions), dtype=U64)
+        for slot in ours:
+            own |= BB[squares[slot]]
+        quiet = np.zeros(len(positions), dtype=np.int16)
+
+        for slot in ours:
+            piece_type = layout.pieces[slot][1]
+            origin = squares[slot]
+            for target, ok, promotions in self._piece_moves(stm, piece_type, origin, occupied):
+                ok &= (own & BB[target]) == 0
+                captured = (occupied & BB[target]) != 0
+                if promotions is None:
+                    moved = list(squares)
+                    moved[slot] = target
+                    child = layout.encode(child_stm, moved)
+                    quiet_ok = ok & ~captured
+                    quiet += quiet_ok & self.legal[np.where(quiet_ok, child, 0)]
+                    for other in theirs:
+                        if layout.pieces[other][1] != chess.KING:
+                            self._transition(index, squares, slot, target, ok & (squares[other] == target),
+                                             other, piece_type, stm)
+                else:
+                    self._transition(index, squares, slot, target, ok & ~captured, None, promotions, stm)
+                    for other in theirs:
+                        if layout.pieces[other][1] != chess.KING:
+                            self._transition(index, squares, slot, target, ok & (squares[other] == target),
+                                             other, promotions, stm)
+        self.quiet_moves[index] = quiet
+
+    def _piece_moves(self, stm, piece_type, origin, occupied):
+        """Yield (target, ok, promotions) per move direction: promotions is None for moves that keep
+        the piece type, else the tuple of promotion types (pawn moves to the last rank)."""
+        if piece_type != chess.PAWN:
+            for target, ok in _targets(piece_type, origin, occupied):
+                yield target, ok, None
+            return
+        forward = 8 if stm == chess.WHITE else -8
+        last_rank = 7 if stm == chess.WHITE else 0
+        start_rank = 1 if stm == chess.WHITE else 6
+        promotions = (chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT)
+        single = origin + forward
+        single_ok = (occupied & BB[single]) == 0
+        promoting = (single >> 3) == last_rank
+        # Pushes (empty targets: "captured" is always false for them)
+        yield single, single_ok & ~promoting, None
+        yield single, single_ok & promoting, promotions
+        double = np.clip(origin + 2 * forward, 0, 63)
+        yield double, single_ok & ((origin >> 3) == start_rank) & ((occupied & BB[double]) == 0), None
+        for step in PAWN_CAPTURES[stm]:
+            target = step[origin]
+            ok = (target >= 0) & ((occupied & BB[np.maximum(target, 0)]) != 0)
+            target = np.maximum(target, 0)
+            lands_last = (target >> 3) == last_rank
+            # Pawn captures onto empty squares are filtered by _transition's victim mask
+            yield target, ok & ~lands_last, _PAWN_CAPTURE
+            yield target, ok & lands_last, promotions
+
+    def _transition(self, index, squares, slot, target, mask, victim, new_types, stm):
+        """Settle moves that leave this table: a capture of victim's slot and/or a promotion
+        into each of new_types (a piece type, or a tuple of promotion types)."""
+        if new_types is _PAWN_CAPTURE:
+            new_types = chess.PAWN
+            if victim is None:
+                return
+        selected = np.nonzero(mask)[0]
+        if not len(selected):
+            return
+        layout = self.layout
+        for new_type in (new_types if isinstance(new_types, tuple) else (new_types,)):
+            pieces = []
+            child_squares = []
+            for other, (color, piece_type) in enumerate(layout.pieces):
+                if other == victim:
+                    continue
+                if other == slot:
+                    pieces.append((color, new_type))
+                    child_squares.append(target[selected])
+                else:
+                    pieces.append((color, piece_type))
+                    child_squares.append(squares[other][selected])
+            occupied = np.zeros(len(selected), dtype=U64)
+            for sq in child_squares:
+                occupied |= BB[sq]
+            king = child_squares[pieces.index((stm, chess.KING))]
+            attackers = [(color, piece_type, sq) for (color, piece_type), sq in zip(pieces, child_squares)
+                         if color != stm]
+            legal = ~_attacked(king, attackers, occupied)
+            if not legal.any():
+                continue
+            moves = selected[legal]
+            child_squares = [sq[legal] for sq in child_squares]
+            name = canonical_material(*_split_types(pieces))[0]
+            if name in DRAWN_MATERIAL:
+                wdl = np.zeros(len(moves), dtype=np.int64)
+                plies = wdl
+            else:
+                wdl, plies = self.sources[name].values(not stm, pieces, child_squares)
+            positions = index[moves]
+            self.capture_moves[positions] += 1
+            self.capture_draw[positions] |= wdl == WDL_DRAW
+            wins = wdl == WDL_LOSS  # The opponent is mated: a win for us
+            if wins.any():
+                won = positions[wins]
+                self.capture_win[won] = np.minimum(self.capture_win[won], plies[wins] + 1)
+            losses = wdl == WDL_WIN
+            if losses.any():
+                lost = positions[losses]
+                self.capture_losses[lost] += 1
+                self.capture_loss_plies[lost] = np.maximum(self.capture_loss_plies[lost], plies[losses] + 1)
+
+    def _predecessors(self, frontier):
+        """Legal, undecided positions one reversible (non-capture, non-promotion) move before the
+        frontier positions, one entry per move (so the same position can repeat)."""
+        layout = self.layout
+        found = []
+        for start in range(0, len(frontier), GEN_CHUNK // 4):
+            chunk = frontier[start:start + GEN_CHUNK // 4]
+            for half in (0, 1):
+                part = chunk[(chunk >= layout.half) == bool(half)]
+                if not len(part):
+                    continue
+                squares = layout.decode(part)
+                mover = chess.BLACK if half == 0 else chess.WHITE
+                occupied = np.zeros(len(part), dtype=U64)
+                for sq in squares:
+                    occupied |= BB[sq]
+                for slot, (color, piece_type) in enumerate(layout.pieces):
+                    if color != mover:
+                        continue
+                    for origin, ok in self._unmoves(mover, piece_type, squares[slot], occupied):
+                        ok &= (occupied & BB[origin]) == 0
+                        if not ok.any():
+                            continue
+                        moved = [sq[ok] for sq in squares]
+                        moved[slot] = origin[ok]
+                        pred = layout.encode(1 - half, moved)
+                        pred = pred[self.legal[pred] & (self.result[pred] == _UNDECIDED)]
+                        if len(pred):
+                            found.append(pred)
+        return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+    def _unmoves(self, mover, piece_type, square, occupied):
+        """Yield (origin, ok): squares the piece could have come from by a quiet move."""
+        if piece_type != chess.PAWN:
+            yield from _targets(piece_type, square, occupied)
+            return
+        back = -8 if mover == chess.WHITE else 8
+        push_rank = 3 if mover == chess.WHITE else 4
+        single = np.clip(square + back, 0, 63)
+        yield single, (square + back >= 0) & (square + back < 64)
+        double = np.clip(square + 2 * back, 0, 63)
+        yield double, ((square >> 3) == push_rank) & ((occupied & BB[single]) == 0)
+
+    def _retrograde(self):
+        legal = self.legal
+        result, plies = self.result, self.plies
+        total = self.quiet_moves + self.capture_moves
+        mated = legal & (total == 0) & self.in_check
+        result[mated] = _LOSS
+        # Stalemates and positions with a drawing capture are never lost
+        remaining = (self.quiet_moves + self.capture_losses).astype(np.int16)
+        never_lost = ~legal | (total == 0) | self.capture_draw | (self.capture_win != _NONE)
+        remaining[never_lost] = -1
+        last_capture_event = int(max(self.capture_win[self.capture_win != _NONE].max(initial=0),
+                                     self.capture_loss_plies.max(initial=0)))
+
+        ply = 1
+        frontier_loss = np.nonzero(mated)[0]
+        frontier_win = np.zeros(0, dtype=np.int64)
+        while len(frontier_loss) or len(frontier_win) or ply <= last_capture_event:
+            if ply > 254:
+                raise OverflowError(f"{self.layout.name}: distances beyond 254 plies don't fit")
+            # Wins: one move into a position lost for the opponent
+            pred = self._predecessors(frontier_loss)
+            won = np.unique(pred)
+            by_capture = np.nonzero((self.capture_win == ply) & (result == _UNDECIDED) & legal)[0]
+            won = np.union1d(won, by_capture)
+            result[won] = _WIN
+            plies[won] = ply
+            # Losses: every move leads to a position won for the opponent
+            pred = self._predecessors(frontier_win)
+            touched, counts = np.unique(pred, return_counts=True)
+            remaining[touched] -= counts.astype(np.int16)
+            events = np.nonzero((self.capture_loss_plies == ply) & (self.capture_losses > 0))[0]
+            remaining[events] -= self.capture_losses[events].astype(np.int16)
+            candidates = np.union1d(touched, events)
+            lost = candidates[(remaining[candidates] == 0) & (result[candidates] == _UNDECIDED)]
+            result[lost] = _LOSS
+            plies[lost] = ply
+            frontier_win, frontier_loss = won, lost
+            ply += 1
+
+    def _encode(self):
+        data = np.zeros(self.layout.size, dtype=np.uint8)
+        win = self.result == _WIN
+        loss = self.result == _LOSS
+        data[win] = (self.plies[win].astype(np.int64) + 1) // 2
+        data[loss] = 128 + self.plies[loss] // 2
+        return data
+
+
+_PAWN_CAPTURE = object()  # _piece_moves marker: pawn capture without promotion
+
+
+# --- Probing ---
+
+class Tablebases:
+    """Memory-mapped endgame tables found in a directory, opened on first use.
+
+    probe(board) gives (wdl, plies) for the side to move. Positions with castling
+    rights, more than MAX_PIECES pieces, not one king per side or no table on
+    disk return None.
+    """
+
+    def __init__(self, directory: str = TB_DIR, enabled: bool = True):
+        self.directory = directory
+        self.enabled = enabled
+        self.tables = {}  # Material name -> (mmap, _Layout), None when the file is missing
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+
+    def close(self):
+        for entry in self.tables.values():
+            if entry is not None:
+                entry[0].close()
+        self.tables.clear()
+
+    def available(self) -> list:
+        """Names of the tables on disk."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(f[:-len(TB_SUFFIX)] for f in os.listdir(self.directory) if f.endswith(TB_SUFFIX))
+
+    def _table(self, name: str):
+        if name not in self.tables:
+            path = table_path(name, self.directory)
+            try:
+                mapped, _ = open_table(path)
+                self.tables[name] = mapped, _Layout(name)
+            except (OSError, ValueError):
+                self.tables[name] = None
+        return self.tables[name]
+
+    def probe(self, board: chess.Board):
+        """(wdl, plies to mate) for the side to move, or None if no table covers the position."""
+        if not self.enabled or board.castling_rights or chess.popcount(board.occupied) > MAX_PIECES:
+            return None
+        kings = board.kings
+        if chess.popcount(kings & board.occupied_co[chess.WHITE]) != 1 or chess.popcount(kings) != 2:
+            return None
+        self.probes += 1
+        white, black = board_material(board)
+        name, flipped = canonical_material(white, black)
+        if name in DRAWN_MATERIAL:
+            self.hits += 1
+            return WDL_DRAW, 0
+        entry = self._table(name)
+        if entry is None:
+            return None
+        mapped, layout = entry
+        pieces = []
+        squares = []
+        for sq in chess.scan_forward(board.occupied):
+            piece = board.piece_at(sq)
+            pieces.append((piece.color != flipped, piece.piece_type))
+            squares.append(sq ^ 56 if flipped else sq)
+        order = layout.slot_order(pieces)
+        squares = [squares[i] for i in order]
+        mirror = 7 if squares[0] & 7 >= 4 else 0
+        index = KING_INDEX[squares[0] ^ mirror] + (0 if (board.turn != flipped) == chess.WHITE else 32)
+        for sq in squares[1:]:
+            index = (index << 6) | (sq ^ mirror)
+        code = mapped[HEADER_BYTES + index]
+        self.hits += 1
+        if code == 0:
+            return WDL_DRAW, 0
+        if code < 128:
+            return WDL_WIN, 2 * code - 1
+        return WDL_LOSS, 2 * (code - 128)
+
+    def root_move(self, board: chess.Board):
+        """(move, wdl, plies) of the best move by the tables: the fastest mate, a move that
+        keeps a draw, or the slowest loss. None unless every move can be probed."""
+        if self.probe(board) is None:
+            return None
+        best = None
+        best_key = None
+        for move in board.legal_moves:
+            board.push(move)
+            try:
+                child = self.probe(board)
+            finally:
+                board.pop()
+            if child is None:
+                return None
+            wdl, plies = -child[0], child[1] + 1
+            # Prefer wins (shortest first), then draws, then losses (longest first)
+            key = (wdl, -plies if wdl == WDL_WIN else plies if wdl == WDL_LOSS else 0)
+            if best_key is None or key > best_key:
+                best, best_key = (move, wdl, plies if wdl != WDL_DRAW else 0), key
+        return best
+
+    def stats(self) -> dict:
+        return {
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+        }
+
+
+def verify(name: str, samples: int, directory: str = TB_DIR, seed: int = 0) -> int:
+    """Check random positions of a table against a one-ply search over its own and smaller
+    tables. Returns the number of inconsistent positions (0 for a correct table)."""
+    white, black = parse_material(name)
+    tablebases = Tablebases(directory)
+    rng = random.Random(seed)
+    errors = checked = 0
+    while checked < samples:
+        board = chess.Board(None)
+        squares = rng.sample(chess.SQUARES, 2 + len(white) + len(black))
+        board.set_piece_at(squares[0], chess.Piece(chess.KING, chess.WHITE))
+        board.set_piece_at(squares[1], chess.Piece(chess.KING, chess.BLACK))
+        for sq, piece_type in zip(squares[2:], white):
+            board.set_piece_at(sq, chess.Piece(piece_type, chess.WHITE))
+        for sq, piece_type in zip(squares[2 + len(white):], black):
+            board.set_piece_at(sq, chess.Piece(piece_type, chess.BLACK))
+        board.turn = rng.choice(chess.COLORS)
+        if not board.is_valid():
+            continue
+        checked += 1
+        stored = tablebases.probe(board)
+        if board.is_checkmate():
+            expected = (WDL_LOSS, 0)
+        elif board.is_stalemate():
+            expected = (WDL_DRAW, 0)
+        else:
+            best = tablebases.root_move(board)
+            expected = best[1:] if best is not None else None
+        if stored != expected:
+            errors += 1
+            print(f"{board.fen()}: table {stored}, search {expected}")
+    tablebases.close()
+    return errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate endgame tables by retrograde analysis.")
+    parser.add_argument("materials", nargs="*", default=list(DEFAULT_TABLES),
+                        help=f"Tables to build, e.g. KQKR (default: {' '.join(DEFAULT_TABLES)})")
+    parser.add_argument("--dir", default=TB_DIR, help="Output directory")
+    parser.add_argument("--force", action="store_true", help="Rebuild tables that already exist")
+    parser.add_argument("--verify", type=int, metavar="N", default=0,
+                        help="Check N random positions of each table after building it")
+    args = parser.parse_args()
+
+    for name in args.materials:
+        generate(name, args.dir, force=args.force)
+        if args.verify:
+            errors = verify(canonical_material(*parse_material(name))[0], args.verify, args.dir)
+            print(f"{name}: {args.verify} positions checked, {errors} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import chess
+
+MAX_SEARCH_DEPTH = 64
+DEFAULT_MOVES_TO_GO = 30   # Assume this many moves remain when the clock has no movestogo
+MOVE_OVERHEAD_MS = 30      # Safety margin for GUI/protocol latency
+HARD_LIMIT_FACTOR = 4      # Hard limit as a multiple of the soft limit
+MAX_TIME_FRACTION = 0.4    # Never plan to use more than this share of the remaining clock
+CHECK_INTERVAL = 32        # Nodes between clock checks (Python nodes are slow)
+
+
+class SearchAborted(Exception):
+    """Raised inside the search once a hard limit or an external stop is hit."""
+
+
+@dataclass
+class SearchLimits:
+    """Limits for one search. Times are in milliseconds, as in UCI."""
+    depth: Optional[int] = None
+    movetime: Optional[int] = None
+    wtime: Optional[int] = None
+    btime: Optional[int] = None
+    winc: int = 0
+    binc: int = 0
+    movestogo: Optional[int] = None
+    nodes: Optional[int] = None
+    infinite: bool = False
+    stop_event: Optional[threading.Event] = None
+    ponder: bool = False  # Searching on the opponent's time: deadlines start at ponderhit()
+
+    def ponderhit(self):
+        """The predicted move was played: let the running search switch to its normal deadlines."""
+        self.ponder = False
+
+
+class TimeManager:
+    """Turns SearchLimits into soft/hard deadlines and polls them cheaply during the search."""
+
+    def __init__(self, limits: SearchLimits, turn: chess.Color):
+        self.limits = limits
+        self.start_time = time.monotonic()
+        self.nodes = 0
+        self.stopped = False
+        self.max_depth = limits.depth or MAX_SEARCH_DEPTH
+        self.soft_limit, self.hard_limit = self._allocate(limits, turn)
+        self.pondering = limits.ponder
+        self.node_limit = limits.nodes
+        self._next_check = self._next_check_at()
+
+    @staticmethod
+    def _allocate(limits: SearchLimits, turn: chess.Color):
+        """Return (soft, hard) limits in seconds, None meaning unlimited."""
+        if limits.infinite:
+            return None, None
+        if limits.movetime is not None:
+            movetime = max(1, limits.movetime - MOVE_OVERHEAD_MS) / 1000
+            return movetime, movetime
+        time_left = limits.wtime if turn == chess.WHITE else limits.btime
+        if time_left is None:
+            return None, None
+        inc = limits.winc if turn == chess.WHITE else limits.binc
+        moves_to_go = limits.movestogo or DEFAULT_MOVES_TO_GO
+        usable = max(1, time_left - MOVE_OVERHEAD_MS)
+        soft = usable / moves_to_go + inc * 0.75
+        hard = min(soft * HARD_LIMIT_FACTOR, usable * MAX_TIME_FRACTION)
+        soft = min(soft, hard)
+        return soft / 1000, hard / 1000
+
+    def _next_check_at(self) -> int:
+        next_check = self.nodes + CHECK_INTERVAL
+        if self.node_limit is not None:
+            next_check = min(next_check, self.node_limit)
+        return next_check
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+
+    def tick(self):
+        """Count a node; every CHECK_INTERVAL nodes poll the clock and stop flag."""
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self.check()
+            self._next_check = self._next_check_at()
+
+    def _update_ponder(self):
+        """On ponderhit, start the deadlines from now; the search itself carries on."""
+        if self.pondering and not self.limits.ponder:
+            self.pondering = False
+            offset = self.elapsed()
+            if self.soft_limit is not None:
+                self.soft_limit += offset
+            if self.hard_limit is not None:
+                self.hard_limit += offset
+
+    def check(self):
+        if self.stopped:
+            raise SearchAborted()
+        self._update_ponder()
+        stop_event = self.limits.stop_event
+        if ((stop_event is not None and stop_event.is_set())
+                or (self.node_limit is not None and self.nodes >= self.node_limit)
+                or (not self.pondering and self.hard_limit is not None and self.elapsed() >= self.hard_limit)):
+            self.stopped = True
+            raise SearchAborted()
+
+    def should_start_iteration(self, depth: int) -> bool:
+        """Soft limit: only start another iteration if it is likely to be worth it."""
+        if self.stopped or depth > self.max_depth:
+            return False
+        if self.limits.stop_event is not None and self.limits.stop_event.is_set():
+            return False
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            return False
+        self._update_ponder()
+        return self.pondering or self.soft_limit is None or self.elapsed() < self.soft_limit
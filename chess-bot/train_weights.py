@@ -9,7 +9,9 @@ import chess
 import chess.pgn
 
 # Reuse engine constants
-from engine import PIECE_VALUES, PIECE_TABLES, WEIGHTS
+from engine import PIECE_VALUES, WEIGHTS
+from attacks import AttackMap
+from pawns import open_file, pawn_structure
 
 FEATURE_NAMES = [
     "bishop_pair",
@@ -92,12 +94,9 @@ def feature_vector(board: chess.Board) -> Dict[str, float]:
     if len(board.pieces(chess.BISHOP, chess.BLACK)) >= 2:
         feats["bishop_pair"] -= 1
 
-    # Mobility (as in engine evaluate: side-to-move full, other via null move)
-    white_mob = len(list(board.legal_moves)) if board.turn == chess.WHITE else 0
-    board.push(chess.Move.null())
-    black_mob = len(list(board.legal_moves)) if board.turn == chess.BLACK else 0
-    board.pop()
-    feats["mobility"] += white_mob - black_mob
+    # Mobility (as in engine evaluate: attacked squares of both sides' pieces, no move generation)
+    attack_map = AttackMap(board)
+    feats["mobility"] += attack_map.mobility(board, chess.WHITE) - attack_map.mobility(board, chess.BLACK)
 
     # Center control
     for sq in CENTER_SQUARES:
@@ -127,57 +126,18 @@ def feature_vector(board: chess.Board) -> Dict[str, float]:
 
     # Pawn structure
     for color in (chess.WHITE, chess.BLACK):
-        pawns = board.pieces(chess.PAWN, color)
-        for pawn_sq in pawns:
-            file = chess.square_file(pawn_sq)
-            rank = chess.square_rank(pawn_sq)
-            # Isolated
-            isolated = True
-            for f in (file - 1, file + 1):
-                if 0 <= f < 8:
-                    for r in range(8):
-                        if board.piece_at(chess.square(f, r)) == chess.Piece(chess.PAWN, color):
-                            isolated = False
-                            break
-                if not isolated:
-                    break
-            if isolated:
-                feats["isolated_pawn"] += 1 if color == chess.WHITE else -1
-            # Doubled
-            doubled = False
-            for r in range(8):
-                if r != rank and board.piece_at(chess.square(file, r)) == chess.Piece(chess.PAWN, color):
-                    doubled = True
-                    break
-            if doubled:
-                feats["doubled_pawn"] += 1 if color == chess.WHITE else -1
-            # Passed
-            passed = True
-            direction = 1 if color == chess.WHITE else -1
-            for r in range(rank + direction, 8 if color == chess.WHITE else -1, direction):
-                for f in (file - 1, file, file + 1):
-                    if 0 <= f < 8:
-                        piece = board.piece_at(chess.square(f, r))
-                        if piece and piece.piece_type == chess.PAWN and piece.color != color:
-                            passed = False
-                            break
-                if not passed:
-                    break
-            if passed:
-                feats["passed_pawn"] += 1 if color == chess.WHITE else -1
+        sign = 1 if color == chess.WHITE else -1
+        isolated, doubled, _, passed = pawn_structure(board, color)
+        feats["isolated_pawn"] += sign * isolated
+        feats["doubled_pawn"] += sign * doubled
+        feats["passed_pawn"] += sign * chess.popcount(passed)
 
     # Rooks on open files and 7th
     for color in (chess.WHITE, chess.BLACK):
         for rook_sq in board.pieces(chess.ROOK, color):
             file = chess.square_file(rook_sq)
             rank = chess.square_rank(rook_sq)
-            open_file = True
-            for r in range(8):
-                piece = board.piece_at(chess.square(file, r))
-                if piece and piece.piece_type == chess.PAWN:
-                    open_file = False
-                    break
-            if open_file:
+            if open_file(board, file):
                 feats["rook_open_file"] += 1 if color == chess.WHITE else -1
             if (color == chess.WHITE and rank == 6) or (color == chess.BLACK and rank == 1):
                 feats["rook_7th"] += 1 if color == chess.WHITE else -1
@@ -196,15 +156,8 @@ def feature_vector(board: chess.Board) -> Dict[str, float]:
         else:
             feats["pawn_shield"] -= shield_count
         for f in (file - 1, file, file + 1):
-            if 0 <= f < 8:
-                open_near = True
-                for r in range(8):
-                    piece = board.piece_at(chess.square(f, r))
-                    if piece and piece.piece_type == chess.PAWN:
-                        open_near = False
-                        break
-                if open_near:
-                    feats["king_open_file"] += -1 if color == chess.WHITE else 1
+            if 0 <= f < 8 and open_file(board, f):
+                feats["king_open_file"] += -1 if color == chess.WHITE else 1
 
     # Tempo
     feats["tempo"] += 1 if board.turn == chess.WHITE else -1
@@ -0,0 +1,292 @@
+import chess
+
+# Bound types stored with every entry
+BOUND_NONE = 0   # Empty slot
+BOUND_UPPER = 1  # Fail-low: true score <= stored score
+BOUND_LOWER = 2  # Fail-high: true score >= stored score
+BOUND_EXACT = 3
+
+SLOTS_PER_BUCKET = 2  # Slot 0: depth-preferred, slot 1: always-replace
+ENTRY_BYTES = 16      # 64-bit key + 64-bit packed data
+BUCKET_BYTES = SLOTS_PER_BUCKET * ENTRY_BYTES
+
+# Packed data word layout (low to high bits):
+#   score  18 bits (offset binary, fits mate scores)
+#   move   15 bits (from | to << 6 | promotion << 12)
+#   depth   7 bits (offset by DEPTH_OFFSET so quiescence depths fit)
+#   bound   2 bits
+#   age     5 bits (generation of the last store or probe)
+#   carried 1 bit  (written by an earlier search, then probed in this one)
+#   eval   16 bits (static eval, offset binary; 0 means none stored)
+SCORE_OFFSET = 1 << 17
+SCORE_CLAMP = (1 << 17) - 1
+MOVE_SHIFT = 18
+MOVE_MASK = 0x7FFF
+DEPTH_SHIFT = 33
+DEPTH_MASK = 0x7F
+DEPTH_OFFSET = 32
+MAX_DEPTH = DEPTH_MASK - DEPTH_OFFSET
+DEPTH_QS = -1  # Depth of quiescence entries: below every main-search entry
+BOUND_SHIFT = 40
+AGE_SHIFT = 42
+AGE_MASK = 0x1F
+CARRIED_BIT = 1 << 47
+EVAL_SHIFT = 48
+EVAL_OFFSET = 1 << 15
+EVAL_CLAMP = (1 << 15) - 1  # Larger static evals (mates) are not stored
+EVAL_CACHE_ENTRIES = 1 << 14  # Default size of a search worker's eval cache
+
+
+def encode_move(move) -> int:
+    """Pack a move into 15 bits (0 means no move)."""
+    if move is None or not move:
+        return 0
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(code: int):
+    """Unpack a 15-bit move, returning None for the empty move."""
+    if not code:
+        return None
+    promotion = code >> 12
+    return chess.Move(code & 0x3F, (code >> 6) & 0x3F, promotion if promotion else None)
+
+
+class TranspositionTable:
+    """Preallocated, bucketed transposition table sized in megabytes.
+
+    Each slot stores key ^ data next to data, so a slot torn by a concurrent
+    writer simply fails verification (lock-free sharing between workers).
+    """
+
+    def __init__(self, size_mb: float = 16):
+        self.generation = 0
+        self.shm = None
+        self.resize(size_mb)
+
+    @staticmethod
+    def buckets_for(size_mb: float) -> int:
+        """Largest power-of-two bucket count fitting in size_mb."""
+        num_buckets = 1
+        while num_buckets * 2 * BUCKET_BYTES <= size_mb * 1024 * 1024:
+            num_buckets *= 2
+        return num_buckets
+
+    def resize(self, size_mb: float):
+        """Reallocate the table (private memory) to fit size_mb."""
+        self.close()
+        self._attach(bytearray(self.buckets_for(size_mb) * BUCKET_BYTES))
+
+    def _attach(self, buffer):
+        num_buckets = 1
+        while num_buckets * 2 * BUCKET_BYTES <= len(buffer):
+            num_buckets *= 2
+        self.num_buckets = num_buckets
+        self.bucket_mask = num_buckets - 1
+        self._buffer = buffer
+        # Flat view of 64-bit words: [key0 ^ data0, data0, key1 ^ data1, data1] per bucket
+        self._table = memoryview(buffer)[:num_buckets * BUCKET_BYTES].cast('Q')
+        self.reset_stats()
+
+    @classmethod
+    def create_shared(cls, size_mb: float):
+        """Allocate the table in multiprocessing shared memory for other processes to attach to."""
+        from multiprocessing import shared_memory
+        tt = cls.__new__(cls)
+        tt.generation = 0
+        tt.shm = shared_memory.SharedMemory(create=True, size=cls.buckets_for(size_mb) * BUCKET_BYTES)
+        tt._attach(tt.shm.buf)
+        tt.clear()
+        return tt
+
+    @classmethod
+    def attach_shared(cls, name: str):
+        """Open a table created by create_shared in another process."""
+        from multiprocessing import shared_memory
+        tt = cls.__new__(cls)
+        tt.generation = 0
+        tt.shm = shared_memory.SharedMemory(name=name)
+        tt._attach(tt.shm.buf)
+        return tt
+
+    def close(self, unlink: bool = False):
+        """Release shared memory (unlink=True frees it for every process)."""
+        if getattr(self, 'shm', None) is None:
+            return
+        self._table.release()
+        self._table = None
+        self._buffer = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+        self.shm = None
+
+    @property
+    def size_mb(self) -> float:
+        return self.num_buckets * BUCKET_BYTES / (1024 * 1024)
+
+    @property
+    def num_entries(self) -> int:
+        return self.num_buckets * SLOTS_PER_BUCKET
+
+    def clear(self):
+        """Wipe every entry (e.g. for a new game)."""
+        self._table[:] = memoryview(bytes(self.num_buckets * BUCKET_BYTES)).cast('Q')
+        self.generation = 0
+        self.reset_stats()
+
+    def new_search(self):
+        """Advance the age tag so entries from earlier searches become replaceable."""
+        self.generation = (self.generation + 1) & AGE_MASK
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.warm_hits = 0   # Hits on entries written by an earlier search (previous moves)
+        self.stores = 0
+        self.collisions = 0  # Stores that evicted a different position
+
+    def probe(self, key: int):
+        """Return (depth, score, bound, move, static_eval) for key, or None on a miss.
+
+        static_eval is None when the entry holds none.
+        """
+        self.probes += 1
+        table = self._table
+        index = (key & self.bucket_mask) << 2
+        for i in (index, index + 2):
+            data = table[i + 1]
+            if table[i] ^ data == key:
+                bound = (data >> BOUND_SHIFT) & 0x3
+                if bound == BOUND_NONE:
+                    break
+                self.hits += 1
+                if (data >> AGE_SHIFT) & AGE_MASK != self.generation:
+                    # Entry from an earlier search: refresh its age so it survives, and mark it
+                    # carried over so later hits in this search still count as warm
+                    self.warm_hits += 1
+                    data = (data & ~(AGE_MASK << AGE_SHIFT)) | (self.generation << AGE_SHIFT) | CARRIED_BIT
+                    table[i] = key ^ data
+                    table[i + 1] = data
+                elif data & CARRIED_BIT:
+                    self.warm_hits += 1
+                score = (data & 0x3FFFF) - SCORE_OFFSET
+                move = decode_move((data >> MOVE_SHIFT) & MOVE_MASK)
+                depth = ((data >> DEPTH_SHIFT) & DEPTH_MASK) - DEPTH_OFFSET
+                static_eval = data >> EVAL_SHIFT
+                return depth, score, bound, move, static_eval - EVAL_OFFSET if static_eval else None
+        return None
+
+    def store(self, key: int, depth: int, score, bound: int, move=None, static_eval=None):
+        """Store a search result using depth-preferred / always-replace buckets."""
+        self.stores += 1
+        table = self._table
+        index = (key & self.bucket_mask) << 2
+        move_code = encode_move(move)
+
+        old_data = table[index + 1]
+        old_key = table[index] ^ old_data
+        alt_data = table[index + 3]
+        alt_key = table[index + 2] ^ alt_data
+
+        eval_code = 0
+        if static_eval is not None and -EVAL_CLAMP <= static_eval <= EVAL_CLAMP:
+            eval_code = static_eval + EVAL_OFFSET
+
+        # Keep the previous best move and static eval if this result has none
+        if not move_code or not eval_code:
+            same = old_data if old_key == key else alt_data if alt_key == key else 0
+            if not move_code:
+                move_code = (same >> MOVE_SHIFT) & MOVE_MASK
+            if not eval_code:
+                eval_code = same >> EVAL_SHIFT
+
+        score = int(max(-SCORE_CLAMP, min(SCORE_CLAMP, score)))
+        depth = max(-DEPTH_OFFSET, min(MAX_DEPTH, depth))
+        data = ((score + SCORE_OFFSET)
+                | (move_code << MOVE_SHIFT)
+                | ((depth + DEPTH_OFFSET) << DEPTH_SHIFT)
+                | (bound << BOUND_SHIFT)
+                | (self.generation << AGE_SHIFT)
+                | (eval_code << EVAL_SHIFT))
+
+        # Depth-preferred slot: same position, stale, empty or shallower entries get replaced
+        old_bound = (old_data >> BOUND_SHIFT) & 0x3
+        old_age = (old_data >> AGE_SHIFT) & AGE_MASK
+        old_depth = ((old_data >> DEPTH_SHIFT) & DEPTH_MASK) - DEPTH_OFFSET
+        if (old_key == key or old_bound == BOUND_NONE or old_age != self.generation
+                or depth >= old_depth):
+            if old_key != key and old_bound != BOUND_NONE:
+                # Demote the evicted entry to the always-replace slot
+                if alt_key != key and (alt_data >> BOUND_SHIFT) & 0x3:
+                    self.collisions += 1
+                table[index + 2] = old_key ^ old_data
+                table[index + 3] = old_data
+            table[index] = key ^ data
+            table[index + 1] = data
+            return
+
+        # Always-replace slot
+        if alt_key != key and (alt_data >> BOUND_SHIFT) & 0x3:
+            self.collisions += 1
+        table[index + 2] = key ^ data
+        table[index + 3] = data
+
+    def hashfull(self) -> int:
+        """Permille of sampled entries written during the current search generation."""
+        table = self._table
+        sample = min(1000, self.num_entries)
+        used = 0
+        for slot in range(sample):
+            data = table[slot * 2 + 1]
+            if (data >> BOUND_SHIFT) & 0x3 and (data >> AGE_SHIFT) & AGE_MASK == self.generation:
+                used += 1
+        return used * 1000 // sample
+
+    def stats(self) -> dict:
+        """Counters for sizing the table on a given host."""
+        return {
+            'size_mb': round(self.size_mb, 2),
+            'entries': self.num_entries,
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+            'warm_hits': self.warm_hits,
+            'warm_share': self.warm_hits / self.hits if self.hits else 0.0,
+            'stores': self.stores,
+            'collisions': self.collisions,
+            'hashfull': self.hashfull(),
+        }
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        return (f"hash: {stats['probes']} probes, {stats['hit_rate'] * 100:.1f}% hits, "
+                f"{stats['warm_share'] * 100:.1f}% of hits from earlier searches, "
+                f"{stats['collisions']} collisions, hashfull {stats['hashfull']}")
+
+
+class EvalCache:
+    """Small direct-mapped cache of evaluate() results keyed by Zobrist key."""
+
+    def __init__(self, num_entries: int = EVAL_CACHE_ENTRIES):
+        size = 1
+        while size * 2 <= num_entries:
+            size *= 2
+        self.mask = size - 1
+        self.keys = [None] * size
+        self.scores = [0] * size
+
+    def clear(self):
+        self.keys = [None] * len(self.keys)
+
+    def probe(self, key: int):
+        """Cached score for key, or None."""
+        index = key & self.mask
+        if self.keys[index] == key:
+            return self.scores[index]
+        return None
+
+    def store(self, key: int, score: int):
+        index = key & self.mask
+        self.keys[index] = key
+        self.scores[index] = score
@@ -4,20 +4,13 @@ import math
 import random
 import engine
 import json
+from evalbatch import evaluate_batch
 from scipy.optimize import minimize
 import numpy as np
 
 # Path to Stockfish
 STOCKFISH_PATH = r"C:\Users\Tarek\Desktop\Personal Projects\Chess AI\Chess-AI\stockfish\stockfish-windows-x86-64-avx2.exe"
 
-def evaluate_with_weights(board, weights):
-    """Evaluate board with given weights."""
-    old_weights = engine.WEIGHTS.copy()
-    engine.WEIGHTS = {k: v for k, v in zip(engine.WEIGHTS.keys(), weights)}
-    score = engine.evaluate(board)
-    engine.WEIGHTS = old_weights
-    return score
-
 def generate_training_data(num_games=10, skill_levels=[7, 10, 13, 16, 19]):
     """Play games against Stockfish at various skill levels and collect positions with outcomes."""
     training_data = []
@@ -65,13 +58,11 @@ def generate_training_data(num_games=10, skill_levels=[7, 10, 13, 16, 19]):
     return training_data
 
 def loss_function(weights, data):
-    """Mean squared error."""
-    total_loss = 0
-    for fen, target in data:
-        board = chess.Board(fen)
-        pred = evaluate_with_weights(board, weights)
-        total_loss += (pred - target * 100) ** 2
-    return total_loss / len(data)
+    """Mean squared error of the evaluation with the candidate weights."""
+    candidate = {k: v for k, v in zip(engine.WEIGHTS.keys(), weights)}
+    preds = evaluate_batch([chess.Board(fen) for fen, _ in data], candidate)
+    targets = np.array([target for _, target in data], dtype=float)
+    return float(np.sum((preds - targets * 100) ** 2)) / len(data)
 
 def tune_weights(data):
     """Use scipy to minimize loss."""
@@ -4,6 +4,7 @@ import math
 import random
 import engine
 import json
+from evalbatch import evaluate_batch
 from scipy.optimize import minimize, differential_evolution
 import numpy as np
 import time
@@ -200,18 +201,19 @@ def loss_function(params, data, optimizer):
     engine.WEIGHTS = weights
     optimizer.apply_search_params(search_params)
     
-    total_loss = 0
     sample_size = min(3000, len(data))  # Sample for faster evaluation
     sampled_data = random.sample(data, sample_size)
     
+    boards, targets = [], []
     for fen, target in sampled_data:
         try:
-            board = chess.Board(fen)
-            pred = engine.evaluate(board, [])
-            # Scale target to centipawns
-            total_loss += (pred - target * 100) ** 2
-        except:
+            boards.append(chess.Board(fen))
+            targets.append(target)
+        except ValueError:
             continue
+    preds = evaluate_batch(boards)
+    # Scale target to centipawns
+    total_loss = float(np.sum((preds - np.array(targets, dtype=float) * 100) ** 2))
     
     # Restore
     engine.WEIGHTS = old_weights
@@ -0,0 +1,232 @@
+import os
+import sys
+import threading
+
+import chess
+
+import engine
+from timeman import SearchLimits
+
+ENGINE_NAME = "chess-bot"
+ENGINE_AUTHOR = "chess-bot authors"
+MAX_HASH_MB = 1024
+MAX_THREADS = os.cpu_count() or 1
+
+# go parameters that take a number, named as the SearchLimits fields they set
+GO_NUMBERS = ('depth', 'movetime', 'nodes', 'movestogo', 'wtime', 'btime', 'winc', 'binc')
+
+
+def format_score(score: int) -> str:
+    """UCI score of a side-to-move search score: cp, or mate in moves (negative when mated)."""
+    if score >= engine.MATE_BOUND:
+        return f"mate {(engine.MATE - score + 1) // 2}"
+    if score <= -engine.MATE_BOUND:
+        return f"mate -{(engine.MATE + score) // 2}"
+    return f"cp {score}"
+
+
+def parse_position(tokens: list) -> chess.Board:
+    """Board of 'position [startpos | fen <fen>] [moves ...]' (tokens after 'position')."""
+    if 'moves' in tokens:
+        split = tokens.index('moves')
+        setup, moves = tokens[:split], tokens[split + 1:]
+    else:
+        setup, moves = tokens, []
+    if setup and setup[0] == 'fen':
+        board = chess.Board(' '.join(setup[1:]))
+    else:
+        board = chess.Board()
+    for uci in moves:
+        board.push_uci(uci)
+    return board
+
+
+def parse_go(tokens: list) -> SearchLimits:
+    """SearchLimits of a go command (tokens after 'go'); searchmoves and mate are ignored."""
+    limits = SearchLimits()
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in GO_NUMBERS and i + 1 < len(tokens):
+            try:
+                setattr(limits, token, int(tokens[i + 1]))
+            except ValueError:
+                pass
+            i += 1
+        elif token == 'infinite':
+            limits.infinite = True
+        elif token == 'ponder':
+            limits.ponder = True
+        i += 1
+    if limits.depth is not None:
+        limits.depth = max(1, limits.depth)
+    return limits
+
+
+class UciEngine:
+    """UCI front-end: commands are read on the calling thread, searches run on a
+    background thread so stop, ponderhit and isready are answered at once."""
+
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.board = chess.Board()
+        self.hash_mb = engine.TT_SIZE_MB
+        self.threads = 1
+        self.ponder = False  # Ponder option: suggest a move to ponder on with bestmove
+        self.pool = None
+        self.search_thread = None
+        self.limits = None
+        self.release = threading.Event()  # Lets an infinite or ponder search report its move
+
+    def send(self, line: str):
+        with self.output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    # Search thread
+
+    def _search(self, board: chess.Board, limits: SearchLimits):
+        worker = engine.main_worker
+
+        def report(depth, score, move):
+            nodes = worker.time_manager.nodes
+            elapsed = worker.time_manager.elapsed()
+            nps = int(nodes / elapsed) if elapsed > 0 else 0
+            pv = engine.principal_variation(board) or ([move] if move else [])
+            self.send(f"info depth {depth} score {format_score(score)} nodes {nodes} nps {nps} "
+                      f"time {int(elapsed * 1000)} pv {' '.join(m.uci() for m in pv)}")
+
+        move = engine.choose_move(board, limits=limits, on_iteration=report)
+        # UCI: an infinite or pondering search only reports after stop (or ponderhit)
+        if limits.infinite or limits.ponder:
+            self.release.wait()
+        if move is None:
+            self.send("bestmove 0000")
+            return
+        ponder = ""
+        if self.ponder:
+            board.push(move)
+            pv = engine.principal_variation(board, max_length=1)
+            board.pop()
+            ponder = f" ponder {pv[0].uci()}" if pv else ""
+        self.send(f"bestmove {move.uci()}{ponder}")
+
+    def wait(self):
+        """Stop the running search, if any, and wait for its bestmove."""
+        if self.search_thread is not None:
+            self.limits.stop_event.set()
+            self.release.set()
+            self.search_thread.join()
+            self.search_thread = None
+
+    # Commands
+
+    def go(self, tokens: list):
+        self.wait()
+        limits = parse_go(tokens)
+        limits.stop_event = threading.Event()
+        self.limits = limits
+        self.release.clear()
+        self.search_thread = threading.Thread(target=self._search, args=(self.board.copy(), limits), daemon=True)
+        self.search_thread.start()
+
+    def stop(self):
+        self.wait()
+
+    def ponderhit(self):
+        if self.limits is not None:
+            self.limits.ponderhit()
+            self.release.set()
+
+    def setoption(self, tokens: list):
+        # setoption name <name> [value <value>]; names may contain spaces
+        if 'value' in tokens:
+            split = tokens.index('value')
+            name, value = ' '.join(tokens[1:split]), ' '.join(tokens[split + 1:])
+        else:
+            name, value = ' '.join(tokens[1:]), ''
+        name = name.lower()
+        try:
+            if name == 'hash':
+                self.hash_mb = min(max(1, int(value)), MAX_HASH_MB)
+                self._configure()
+            elif name == 'threads':
+                self.threads = min(max(1, int(value)), MAX_THREADS)
+                self._configure()
+            elif name == 'ponder':
+                self.ponder = value.lower() == 'true'
+            elif name == 'ownbook':
+                engine.opening_book.enabled = value.lower() == 'true'
+        except ValueError:
+            self.send(f"info string invalid value for {name}: {value}")
+
+    def _configure(self):
+        """Apply Hash and Threads: a plain table for one thread, a Lazy SMP pool for more."""
+        self.wait()
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        if self.threads > 1:
+            from smp import LazySMP
+            self.pool = LazySMP(self.threads, self.hash_mb)
+        else:
+            engine.transposition_table.resize(self.hash_mb)
+
+    def handle(self, line: str) -> bool:
+        """Run one command; False after quit."""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == 'uci':
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {engine.TT_SIZE_MB} min 1 max {MAX_HASH_MB}")
+            self.send(f"option name Threads type spin default 1 min 1 max {MAX_THREADS}")
+            self.send("option name Ponder type check default false")
+            self.send("option name OwnBook type check default true")
+            self.send("uciok")
+        elif command == 'isready':
+            self.send("readyok")
+        elif command == 'ucinewgame':
+            self.wait()
+            engine.new_game()
+        elif command == 'position':
+            self.wait()
+            try:
+                self.board = parse_position(args)
+            except ValueError as error:
+                self.send(f"info string invalid position: {error}")
+        elif command == 'go':
+            self.go(args)
+        elif command == 'stop':
+            self.stop()
+        elif command == 'ponderhit':
+            self.ponderhit()
+        elif command == 'setoption':
+            self.setoption(args)
+        elif command == 'quit':
+            self.wait()
+            return False
+        return True
+
+    def close(self):
+        self.wait()
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+
+def main() -> None:
+    uci = UciEngine()
+    try:
+        for line in sys.stdin:
+            if not uci.handle(line):
+                break
+    finally:
+        uci.close()
+
+
+if __name__ == "__main__":
+    main()
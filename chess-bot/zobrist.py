@@ -0,0 +1,236 @@
+import argparse
+import time
+
+import chess
+import chess.polyglot
+
+# Polyglot random numbers, so our keys match chess.polyglot.zobrist_hash
+RANDOM_ARRAY = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+
+# PIECE_KEYS[color][piece_type][square]
+PIECE_KEYS = [
+    [None] + [[RANDOM_ARRAY[64 * ((piece_type - 1) * 2 + color) + sq] for sq in chess.SQUARES]
+              for piece_type in chess.PIECE_TYPES]
+    for color in (chess.BLACK, chess.WHITE)
+]
+EP_KEYS = [RANDOM_ARRAY[772 + f] for f in range(8)]
+TURN_KEY = RANDOM_ARRAY[780]
+
+CASTLING_CORNERS = [
+    (chess.BB_H1, RANDOM_ARRAY[768]),
+    (chess.BB_A1, RANDOM_ARRAY[769]),
+    (chess.BB_H8, RANDOM_ARRAY[770]),
+    (chess.BB_A8, RANDOM_ARRAY[771]),
+]
+
+
+def castling_hash(castling_rights: int) -> int:
+    """Hash contribution of (cleaned, standard chess) castling rights."""
+    h = 0
+    for corner, key in CASTLING_CORNERS:
+        if castling_rights & corner:
+            h ^= key
+    return h
+
+
+def ep_hash(board: chess.Board) -> int:
+    """Hash contribution of the en passant square, only if a capture is possible (polyglot rule)."""
+    ep_square = board.ep_square
+    if ep_square is None:
+        return 0
+    if chess.BB_PAWN_ATTACKS[not board.turn][ep_square] & board.pawns & board.occupied_co[board.turn]:
+        return EP_KEYS[ep_square & 7]
+    return 0
+
+
+def zobrist_hash(board: chess.Board) -> int:
+    """Full (non-incremental) Zobrist key of a position."""
+    return chess.polyglot.zobrist_hash(board)
+
+
+class SearchBoard(chess.Board):
+    """Board that keeps its Zobrist key up to date incrementally on push/pop.
+
+    Only meant for standard chess inside the search. key_stack holds the key of
+    every position from the seed position to the current one, so it can be
+    shared by the transposition table, repetition detection and eval caches.
+    """
+
+    # When True, every push/pop is checked against a full recomputation
+    verify_keys = False
+
+    def __init__(self, fen=chess.STARTING_FEN, *, chess960: bool = False):
+        super().__init__(fen, chess960=chess960)
+        self.reset_keys()
+
+    @classmethod
+    def from_game(cls, board: chess.Board):
+        """Search board for the current position of a game.
+
+        Only the moves since the last irreversible one are replayed, since no
+        earlier position can repeat; the cost is bounded by the halfmove clock
+        rather than the length of the game.
+        """
+        plies = min(board.halfmove_clock, len(board.move_stack))
+        start = board.copy(stack=plies)
+        moves = [start.pop() for _ in range(plies)]
+        search_board = cls(start.fen())
+        for move in reversed(moves):
+            search_board.push(move)
+        return search_board
+
+    def reset_keys(self):
+        """Recompute the key from scratch and forget the key history."""
+        self.castling_rights = self.clean_castling_rights()
+        self.key_stack = [zobrist_hash(self)]
+        self.null_plies = []  # key_stack indices reached by a null move
+
+    def is_repetition_draw(self, count: int = 2) -> bool:
+        """True if the current position already occurred count times.
+
+        Scans the key stack two plies at a time, back to the last irreversible
+        move or null move at most.
+        """
+        keys = self.key_stack
+        current = len(keys) - 1
+        stop = max(0, current - self.halfmove_clock)
+        if self.null_plies:
+            stop = max(stop, self.null_plies[-1])
+        key = keys[current]
+        found = 0
+        for i in range(current - 4, stop - 1, -2):
+            if keys[i] == key:
+                found += 1
+                if found >= count:
+                    return True
+        return False
+
+    @property
+    def zobrist_key(self) -> int:
+        return self.key_stack[-1]
+
+    def copy(self, *, stack=True):
+        board = super().copy(stack=stack)
+        board.reset_keys()
+        return board
+
+    def push(self, move: chess.Move) -> None:
+        key = self.key_stack[-1] ^ TURN_KEY
+        if self.ep_square is not None:
+            key ^= ep_hash(self)
+        rights = self.castling_rights
+
+        if move:
+            turn = self.turn
+            from_sq = move.from_square
+            to_sq = move.to_square
+            keys = PIECE_KEYS[turn]
+            piece_type = self.piece_type_at(from_sq)
+
+            if piece_type == chess.KING and (abs(to_sq - from_sq) == 2 or
+                                             self.rooks & self.occupied_co[turn] & chess.BB_SQUARES[to_sq]):
+                # Castling: move both the king and the rook
+                rank_base = from_sq & ~7
+                kingside = to_sq > from_sq
+                if self.rooks & self.occupied_co[turn] & chess.BB_SQUARES[to_sq]:
+                    rook_from = to_sq
+                else:
+                    rook_from = rank_base + (7 if kingside else 0)
+                king_to = rank_base + (6 if kingside else 2)
+                rook_to = rank_base + (5 if kingside else 3)
+                key ^= keys[chess.KING][from_sq] ^ keys[chess.KING][king_to]
+                key ^= keys[chess.ROOK][rook_from] ^ keys[chess.ROOK][rook_to]
+            else:
+                captured = self.piece_type_at(to_sq)
+                if captured:
+                    key ^= PIECE_KEYS[not turn][captured][to_sq]
+                elif piece_type == chess.PAWN and to_sq == self.ep_square:
+                    # En passant: the captured pawn sits behind the target square
+                    key ^= PIECE_KEYS[not turn][chess.PAWN][to_sq - 8 if turn else to_sq + 8]
+                key ^= keys[piece_type][from_sq] ^ keys[move.promotion or piece_type][to_sq]
+
+        super().push(move)
+
+        if self.castling_rights != rights:
+            key ^= castling_hash(rights) ^ castling_hash(self.castling_rights)
+        if self.ep_square is not None:
+            key ^= ep_hash(self)
+        self.key_stack.append(key)
+        if not move:
+            self.null_plies.append(len(self.key_stack) - 1)
+
+        if self.verify_keys:
+            self._check_key(move)
+
+    def pop(self) -> chess.Move:
+        move = super().pop()
+        if self.null_plies and self.null_plies[-1] == len(self.key_stack) - 1:
+            self.null_plies.pop()
+        if len(self.key_stack) > 1:
+            self.key_stack.pop()
+        else:
+            # Popping past the position the keys were seeded from
+            self.key_stack[-1] = zobrist_hash(self)
+        if self.verify_keys:
+            self._check_key(move)
+        return move
+
+    def _check_key(self, move):
+        expected = zobrist_hash(self)
+        if self.key_stack[-1] != expected:
+            raise AssertionError(
+                f"Incremental Zobrist key mismatch after {move} in {self.fen()}: "
+                f"{self.key_stack[-1]:016x} != {expected:016x}")
+
+
+def verify_incremental_hash(board: chess.Board, depth: int, null_moves: bool = True) -> int:
+    """Perft-style walk comparing incremental keys to full recomputation.
+
+    Raises AssertionError on the first mismatch, returns the number of nodes checked.
+    """
+    search_board = SearchBoard(board.fen())
+    search_board.verify_keys = True
+
+    def walk(d: int) -> int:
+        if d == 0:
+            return 1
+        nodes = 0
+        moves = list(search_board.legal_moves)
+        if null_moves and not search_board.is_check():
+            moves.append(chess.Move.null())
+        for move in moves:
+            search_board.push(move)
+            nodes += walk(d - 1)
+            search_board.pop()
+        return nodes
+
+    return walk(depth)
+
+
+VERIFY_FENS = [
+    chess.STARTING_FEN,
+    # Castling rights, en passant and promotions all show up within a few plies
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verify incremental Zobrist hashing against full recomputation.")
+    parser.add_argument("--depth", type=int, default=3, help="Perft depth per position")
+    parser.add_argument("--fen", action="append", help="Position(s) to walk (default: built-in set)")
+    args = parser.parse_args()
+
+    total = 0
+    start = time.time()
+    for fen in args.fen or VERIFY_FENS:
+        nodes = verify_incremental_hash(chess.Board(fen), args.depth)
+        total += nodes
+        print(f"{nodes:>10} nodes OK  {fen}")
+    print(f"All {total} keys matched in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()